@@ -17,6 +17,7 @@ class FellowInline(admin.StackedInline):
     model = Fellow
     can_delete = False
     verbose_name_plural = 'Fellowship Details'
+    autocomplete_fields = ('mentor', 'assigned_sector')
 
 # unregister the default User admin before registering our customized version
 admin.site.unregister(User)
@@ -27,6 +28,10 @@ class UserAdmin(BaseUserAdmin):
     
     # Add the Role to the User list view
     list_display = ('username', 'email', 'first_name', 'last_name', 'get_role', 'is_staff')
+    # get_role reads the profile: join it instead of one query per row
+    list_select_related = ('userprofile',)
+    show_full_result_count = False
+    changelist_query_budget = 5
     
     def get_role(self, obj):
         # Access the linked UserProfile to show the role
@@ -0,0 +1,88 @@
+from asgiref.sync import sync_to_async
+from rest_framework import permissions
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .roles import ACTIVE, MISSING, UserRole, get_account_state
+from .tokens import ROLE_CLAIMS
+
+
+class RoleTokenUser(TokenUser):
+    """
+    Stateless user built from a validated access token.
+    Its UserRole is pre-filled from the token claims, so permission helpers
+    (get_user_role) never hit the database for this request.
+    """
+
+    def __init__(self, token):
+        super().__init__(token)
+        # simplejwt stores str(user.pk) in the token: same int id as a real User
+        self.id = self.pk = int(token[api_settings.USER_ID_CLAIM])
+        self._user_role = UserRole(
+            user_id=self.id,
+            **{attr: token.get(claim) for claim, attr in ROLE_CLAIMS.items()}
+        )
+
+    @property
+    def first_name(self):
+        return ''
+
+    @property
+    def last_name(self):
+        return ''
+
+    def get_full_name(self):
+        return self.username
+
+
+class RoleClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that skips the User lookup on read-only requests.
+    - GET/HEAD/OPTIONS with a token carrying role claims -> RoleTokenUser, once the
+      cached account state (roles.get_account_state) says the user still exists and
+      is active: 0 queries while cached
+    - Writes, or tokens issued before role claims existed -> the real User row
+      (simplejwt checks is_active there)
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        if request.method in permissions.SAFE_METHODS and 'role' in validated_token:
+            user = RoleTokenUser(validated_token)
+            state = get_account_state(user.id)
+            if state == MISSING:
+                raise AuthenticationFailed('User not found', code='user_not_found')
+            if state != ACTIVE:
+                raise AuthenticationFailed('User is inactive', code='user_inactive')
+            return user, validated_token
+
+        return self.get_user(validated_token), validated_token
+
+
+async def aauthenticate_api_request(request):
+    """
+    Authentication for plain Django async views (DRF views are sync-only).
+    Accepts the same credentials as the REST API: a session, or a JWT bearer token
+    (stateless RoleTokenUser on GET). Returns the user, or None when unauthenticated.
+    """
+    try:
+        result = await sync_to_async(RoleClaimsJWTAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    if result is not None:
+        request.user = result[0]
+        return request.user
+
+    user = await request.auser()
+    return user if user.is_authenticated else None
@@ -0,0 +1,162 @@
+"""
+In-process Bloom filter of blacklisted refresh-token JTIs.
+A refresh/logout only queries BlacklistedToken when the filter says the JTI
+*might* be blacklisted; most requests skip the query.
+
+A negative answer means "not blacklisted as far as this worker has synced", not
+an exact answer:
+- Rows blacklisted by other processes are pulled in at most every
+  TOKEN_BLACKLIST_FILTER_SYNC_SECONDS (0 = before every check); until then a token
+  revoked elsewhere is still accepted here.
+- The sync scans ids above (last seen id - TOKEN_BLACKLIST_FILTER_SYNC_OVERLAP).
+  Ids are allocated at INSERT but become visible at COMMIT, so on PostgreSQL a row
+  can appear below the watermark; the overlap re-scans that window (JTIs already in
+  the filter are skipped). A row committed further behind is only picked up by the
+  next full rebuild (TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS).
+
+Syncs and full rebuilds query the table WITHOUT holding the lock and merge or swap
+the result in at the end: checks keep using the current filter meanwhile (or, on
+the very first build, fall through to the database).
+
+Pruned JTIs (prune_tokens) stay in each worker's filter until its next rebuild;
+they only cost a database check for tokens that have expired anyway.
+"""
+
+# accounts/blacklist.py
+
+import threading
+import time
+
+from django.conf import settings
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .bloom import BloomFilter
+
+MIN_CAPACITY = 1024
+
+
+class BlacklistFilter:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._last_id = 0
+        self._built_at = 0.0
+        self._synced_at = 0.0
+        self._rebuilding = False
+        self._syncing = False
+        # JTIs added while a rebuild is loading, replayed into the new filter
+        self._added_during_rebuild = []
+
+    @property
+    def sync_seconds(self):
+        return getattr(settings, 'TOKEN_BLACKLIST_FILTER_SYNC_SECONDS', 5)
+
+    @property
+    def sync_overlap(self):
+        return getattr(settings, 'TOKEN_BLACKLIST_FILTER_SYNC_OVERLAP', 1000)
+
+    @property
+    def rebuild_seconds(self):
+        # Full rebuilds drop JTIs that were pruned from the blacklist
+        return getattr(settings, 'TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS', 3600)
+
+    def _needs_rebuild(self, now):
+        return self._bloom is None or self._bloom.is_full or now - self._built_at >= self.rebuild_seconds
+
+    def _rebuild(self):
+        """Loads every blacklisted JTI into a new filter (lock not held), then swaps it in."""
+        try:
+            rows = list(BlacklistedToken.objects.values_list('id', 'token__jti').order_by('id'))
+            bloom = BloomFilter(
+                capacity=max(len(rows) * 2, MIN_CAPACITY),
+                error_rate=getattr(settings, 'TOKEN_BLACKLIST_FILTER_ERROR_RATE', 0.001),
+            )
+            for _, jti in rows:
+                bloom.add(jti)
+        except Exception:
+            with self._lock:
+                self._rebuilding = False
+                self._added_during_rebuild = []
+            raise
+
+        with self._lock:
+            for jti in self._added_during_rebuild:
+                bloom.add(jti)
+            self._added_during_rebuild = []
+            self._rebuilding = False
+            self._bloom = bloom
+            self._last_id = rows[-1][0] if rows else 0
+            self._built_at = self._synced_at = time.monotonic()
+
+    def _sync(self, since):
+        """Reads rows above `since` (lock not held), then merges them into the filter."""
+        try:
+            rows = list(BlacklistedToken.objects.filter(
+                id__gt=since
+            ).values_list('id', 'token__jti').order_by('id'))
+        except Exception:
+            with self._lock:
+                self._syncing = False
+            raise
+
+        with self._lock:
+            for row_id, jti in rows:
+                if jti not in self._bloom:
+                    self._bloom.add(jti)
+                self._last_id = max(self._last_id, row_id)
+            self._syncing = False
+            self._synced_at = time.monotonic()
+
+    def might_contain(self, jti):
+        with self._lock:
+            now = time.monotonic()
+            rebuild = not self._rebuilding and self._needs_rebuild(now)
+            sync = (
+                not rebuild and not self._syncing and self._bloom is not None
+                and now - self._synced_at >= self.sync_seconds
+            )
+            if rebuild:
+                self._rebuilding = True
+            elif sync:
+                self._syncing = True
+                # Re-scans the overlap window below the watermark for rows committed out of id order
+                since = self._last_id - self.sync_overlap
+
+        if rebuild:
+            self._rebuild()
+        elif sync:
+            self._sync(since)
+
+        with self._lock:
+            # No filter yet (first build still loading in another thread): ask the database
+            return self._bloom is None or jti in self._bloom
+
+    def add(self, jti):
+        """Fast path for tokens blacklisted by this process (called from a signal)."""
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+            if self._rebuilding:
+                self._added_during_rebuild.append(jti)
+
+    def reset(self):
+        """Forces a full rebuild on the next check, in THIS process only (tests, benchmarks)."""
+        with self._lock:
+            self._bloom = None
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class FilteredRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist check consults the Bloom filter first."""
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if not blacklist_filter.might_contain(jti):
+            # Not blacklisted as of the last sync: no database query needed
+            return
+        super().check_blacklist()
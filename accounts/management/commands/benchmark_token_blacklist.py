@@ -0,0 +1,124 @@
+"""
+Growth & latency benchmark for the JWT token blacklist.
+
+Simulates a growing OutstandingToken/BlacklistedToken table (as produced by
+ROTATE_REFRESH_TOKENS + logouts) and, at each size, measures:
+  - the stock blacklist lookup (BlacklistedToken ... .exists())
+  - the Bloom filter check used by FilteredRefreshToken
+  - the Bloom filter's observed false-positive rate
+Finally it times `prune_tokens` on the largest table.
+
+Everything runs inside a transaction that is rolled back: no data is kept.
+
+Usage:
+    python manage.py benchmark_token_blacklist
+    python manage.py benchmark_token_blacklist --sizes 1000 10000 50000 --lookups 2000
+"""
+
+# accounts/management/commands/benchmark_token_blacklist.py
+
+import io
+import random
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from accounts.blacklist import blacklist_filter
+
+
+class Rollback(Exception):
+    """Raised to discard all benchmark rows."""
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks blacklist lookups (DB vs Bloom filter) as the token tables grow.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000],
+                            help='Outstanding-token table sizes to measure.')
+        parser.add_argument('--blacklisted-ratio', type=float, default=0.2,
+                            help='Share of tokens that are blacklisted (logouts/rotations).')
+        parser.add_argument('--expired-ratio', type=float, default=0.5,
+                            help='Share of tokens that are already expired (pruning target).')
+        parser.add_argument('--lookups', type=int, default=1000,
+                            help='Lookups measured per size.')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback()
+        except Rollback:
+            pass
+        finally:
+            blacklist_filter.reset()
+
+    def insert_tokens(self, count, options):
+        now = aware_utcnow()
+        outstanding = []
+        for _ in range(count):
+            expired = random.random() < options['expired_ratio']
+            outstanding.append(OutstandingToken(
+                jti=uuid.uuid4().hex,
+                token='benchmark',
+                created_at=now,
+                expires_at=now - timedelta(days=1) if expired else now + timedelta(days=7),
+            ))
+        created = OutstandingToken.objects.bulk_create(outstanding, batch_size=1000)
+
+        # bulk_create does not return ids on every backend; re-read the new rows
+        jtis = [token.jti for token in created]
+        blacklisted = [
+            BlacklistedToken(token_id=token_id)
+            for token_id in OutstandingToken.objects.filter(jti__in=jtis).values_list('id', flat=True)
+            if random.random() < options['blacklisted_ratio']
+        ]
+        BlacklistedToken.objects.bulk_create(blacklisted, batch_size=1000)
+
+    def time_lookups(self, jtis, check):
+        started = time.perf_counter()
+        for jti in jtis:
+            check(jti)
+        return (time.perf_counter() - started) / len(jtis) * 1_000_000  # microseconds
+
+    def run(self, options):
+        self.stdout.write(self.style.NOTICE(
+            f"{'tokens':>8} {'blacklisted':>12} {'db_us':>10} {'bloom_us':>10} {'speedup':>8} {'false_pos':>10}"
+        ))
+
+        current = OutstandingToken.objects.count()
+        for size in sorted(options['sizes']):
+            if size > current:
+                self.insert_tokens(size - current, options)
+                current = size
+
+            blacklist_filter.reset()
+            blacklist_filter.might_contain('warm-up')  # builds the filter
+
+            # Fresh JTIs: the common case (a valid token being refreshed)
+            probes = [uuid.uuid4().hex for _ in range(options['lookups'])]
+            db_us = self.time_lookups(
+                probes, lambda jti: BlacklistedToken.objects.filter(token__jti=jti).exists()
+            )
+            bloom_us = self.time_lookups(probes, blacklist_filter.might_contain)
+            false_pos = sum(1 for jti in probes if blacklist_filter.might_contain(jti)) / len(probes)
+
+            self.stdout.write(
+                f'{size:>8} {BlacklistedToken.objects.count():>12} {db_us:>10.1f} '
+                f'{bloom_us:>10.2f} {db_us / max(bloom_us, 1e-9):>7.0f}x {false_pos:>10.4f}'
+            )
+
+        # Pruning cost on the largest table
+        started = time.perf_counter()
+        out = io.StringIO()
+        call_command('prune_tokens', stdout=out)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'prune_tokens on {current} tokens: {elapsed:.2f}s -> {out.getvalue().strip()}'
+        ))
@@ -0,0 +1,36 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+
+from .roles import get_user_role
+
+
+class UserRoleMiddleware:
+    """
+    Attaches `request.user_role` (role, fellow_id, mentor_id) to every request.
+    Resolution is lazy: the joined query only runs the first time a view,
+    permission class or template actually needs the role.
+    Must be placed after AuthenticationMiddleware.
+    Sync and async capable, so ASGI requests don't pay a thread switch here.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def attach_role(self, request):
+        # request.user is read at access time, so DRF's JWT user (set later
+        # on the same HttpRequest) is picked up as well as the session user.
+        request.user_role = SimpleLazyObject(lambda: get_user_role(request.user))
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.attach_role(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.attach_role(request)
+        return await self.get_response(request)
@@ -1,4 +1,5 @@
 from rest_framework import permissions
+from .roles import get_user_role
 
 class IsCoordinatorOrReadOnly(permissions.BasePermission):
     """
@@ -11,7 +12,7 @@ class IsCoordinatorOrReadOnly(permissions.BasePermission):
             return True
         
         # Check if user has a profile and the right role
-        return request.user.is_authenticated and request.user.userprofile.role in ['ADMIN', 'COORDINATOR']
+        return get_user_role(request.user).is_coordinator_role
 
 class IsOwnerOrCoordinator(permissions.BasePermission):
     """
@@ -23,9 +24,11 @@ class IsOwnerOrCoordinator(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
 
+        role = get_user_role(request.user)
+
         # Check if the user is a Coordinator/Admin
-        if request.user.userprofile.role in ['ADMIN', 'COORDINATOR']:
+        if role.is_coordinator_role:
             return True
 
         # Fellows can only edit if they are the 'owner' of the record
-        return obj.fellow.user == request.user
\ No newline at end of file
+        return role.fellow_id is not None and obj.fellow_id == role.fellow_id
@@ -0,0 +1,153 @@
+"""
+Request-scoped role resolution.
+Loads the user's role, Fellow id and Mentor id with ONE joined query and keeps the
+result on the user object, so every permission check in the same request reuses it.
+"""
+
+# accounts/roles.py
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+
+User = get_user_model()
+
+ROLE_CACHE_KEY = 'accounts:role:{}'
+ACCOUNT_STATE_CACHE_KEY = 'accounts:state:{}'
+
+# Cached account states (see get_account_state)
+ACTIVE, INACTIVE, MISSING = 'active', 'inactive', 'missing'
+
+
+class UserRole:
+    """Lightweight, read-only summary of who the current user is."""
+
+    def __init__(self, user_id=None, role=None, fellow_id=None, mentor_id=None,
+                 is_staff=False, is_superuser=False, in_coordinator_group=False):
+        self.user_id = user_id
+        self.role = role
+        self.fellow_id = fellow_id
+        self.mentor_id = mentor_id
+        self.is_staff = is_staff
+        self.is_superuser = is_superuser
+        self.in_coordinator_group = in_coordinator_group
+
+    @property
+    def is_authenticated(self):
+        return self.user_id is not None
+
+    @property
+    def is_fellow(self):
+        return self.fellow_id is not None
+
+    @property
+    def is_viewer(self):
+        return self.role == 'VIEWER'
+
+    @property
+    def is_coordinator_role(self):
+        """ADMIN or COORDINATOR role in UserProfile."""
+        return self.role in ['ADMIN', 'COORDINATOR']
+
+    @property
+    def is_mentor(self):
+        """Admins, Mentors and Coordinators: the users allowed to review reports."""
+        return (
+            self.is_staff or self.is_superuser
+            or self.mentor_id is not None
+            or self.is_coordinator_role
+        )
+
+    @property
+    def is_admin_or_coordinator(self):
+        """Staff members or members of the 'Coordinator' group."""
+        return self.is_staff or self.in_coordinator_group
+
+    def as_dict(self):
+        return {
+            'user_id': self.user_id,
+            'role': self.role,
+            'fellow_id': self.fellow_id,
+            'mentor_id': self.mentor_id,
+            'is_staff': self.is_staff,
+            'is_superuser': self.is_superuser,
+            'in_coordinator_group': self.in_coordinator_group,
+        }
+
+
+ANONYMOUS_ROLE = UserRole()
+
+
+def load_user_role(user_id):
+    """Resolves role, fellow id, mentor id and the Coordinator group in a single query."""
+    row = User.objects.filter(pk=user_id).annotate(
+        in_coordinator_group=Exists(
+            Group.objects.filter(user=OuterRef('pk'), name='Coordinator')
+        )
+    ).values(
+        'is_staff', 'is_superuser', 'in_coordinator_group',
+        'userprofile__role', 'fellow_profile__id', 'mentor_profile__id',
+    ).first()
+
+    if row is None:
+        return ANONYMOUS_ROLE
+
+    return UserRole(
+        user_id=user_id,
+        role=row['userprofile__role'],
+        fellow_id=row['fellow_profile__id'],
+        mentor_id=row['mentor_profile__id'],
+        is_staff=row['is_staff'],
+        is_superuser=row['is_superuser'],
+        in_coordinator_group=row['in_coordinator_group'],
+    )
+
+
+def get_user_role(user):
+    """
+    Returns the UserRole for a user, resolving it at most once per request.
+    The result is memoised on the user instance (which lives for one request); when
+    ROLE_CACHE_TIMEOUT is set, hot users are also served from the shared cache.
+    """
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS_ROLE
+
+    user_role = getattr(user, '_user_role', None)
+    if user_role is not None:
+        return user_role
+
+    timeout = getattr(settings, 'ROLE_CACHE_TIMEOUT', 0)
+    if timeout:
+        cached = cache.get(ROLE_CACHE_KEY.format(user.pk))
+        if cached is not None:
+            user_role = UserRole(**cached)
+        else:
+            user_role = load_user_role(user.pk)
+            cache.set(ROLE_CACHE_KEY.format(user.pk), user_role.as_dict(), timeout)
+    else:
+        user_role = load_user_role(user.pk)
+
+    user._user_role = user_role
+    return user_role
+
+
+def get_account_state(user_id):
+    """
+    ACTIVE, INACTIVE or MISSING for a user id: one indexed lookup, then cached for
+    ACCOUNT_STATE_CACHE_SECONDS. Lets stateless JWT reads (RoleTokenUser) reject
+    deactivated and deleted accounts without loading the User row every request.
+    """
+    key = ACCOUNT_STATE_CACHE_KEY.format(user_id)
+    state = cache.get(key)
+    if state is None:
+        is_active = User.objects.filter(pk=user_id).values_list('is_active', flat=True).first()
+        state = MISSING if is_active is None else (ACTIVE if is_active else INACTIVE)
+        cache.set(key, state, settings.ACCOUNT_STATE_CACHE_SECONDS)
+    return state
+
+
+def invalidate_user_role(user_id):
+    """Drops the cross-request cache entries after a role/profile/account change."""
+    cache.delete_many([ROLE_CACHE_KEY.format(user_id), ACCOUNT_STATE_CACHE_KEY.format(user_id)])
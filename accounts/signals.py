@@ -1,8 +1,12 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from .models import UserProfile
+from .roles import invalidate_user_role
+from .blacklist import blacklist_filter
 from fellows.models import Fellow
+from mentors.models import Mentor
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -18,4 +22,37 @@ def create_user_profile(sender, instance, created, **kwargs):
                 last_name=instance.last_name or "",
                 email=instance.email,
                 status='active'
-            )
\ No newline at end of file
+            )
+
+# --- ROLE CACHE INVALIDATION ---
+# Any change to the records that define a user's role drops the cached UserRole.
+
+@receiver([post_save, post_delete], sender=User)
+def clear_role_cache_for_user(sender, instance, **kwargs):
+    invalidate_user_role(instance.pk)
+
+@receiver([post_save, post_delete], sender=UserProfile)
+@receiver([post_save, post_delete], sender=Fellow)
+@receiver([post_save, post_delete], sender=Mentor)
+def clear_role_cache_for_profile(sender, instance, **kwargs):
+    invalidate_user_role(instance.user_id)
+
+@receiver(m2m_changed, sender=User.groups.through)
+def clear_role_cache_for_groups(sender, instance, action, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, User):
+        invalidate_user_role(instance.pk)
+    else:
+        # Reverse side: group.user_set.add(...)
+        for user_id in pk_set or []:
+            invalidate_user_role(user_id)
+
+
+# --- TOKEN BLACKLIST FILTER ---
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_to_blacklist_filter(sender, instance, created, **kwargs):
+    # Tokens blacklisted by this process are in its Bloom filter at once (others sync)
+    if created:
+        blacklist_filter.add(instance.token.jti)
@@ -0,0 +1,17 @@
+"""Background tasks of the accounts app (see taskqueue/)."""
+
+# accounts/tasks.py
+
+from io import StringIO
+
+from django.core.management import call_command
+
+from taskqueue.registry import task
+
+
+@task(cron='30 2 * * *')
+def prune_tokens():
+    """Nightly deletion of expired JWT refresh tokens, in small batches."""
+    output = StringIO()
+    call_command('prune_tokens', stdout=output)
+    return output.getvalue()[-2000:]
@@ -1,3 +1,350 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from bridge2Rwanda_fellowship_management_system.test_utils import (
+    create_activity, create_fellow, create_locations, create_mentor, create_user,
+)
+from . import blacklist
+from .authentication import RoleClaimsJWTAuthentication, RoleTokenUser
+from .blacklist import BlacklistFilter, FilteredRefreshToken, blacklist_filter
+from .roles import UserRole, get_user_role
+from .throttling import TokenBucketStore, buckets, client_ip, get_rate, parse_rate, throttle_role
+from .tokens import RoleTokenObtainPairSerializer
+
+
+class RoleClaimsJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.fellow = create_fellow('ann@example.com', create_locations())
+        self.user = self.fellow.user
+        self.factory = RequestFactory()
+
+    def request(self, method='get', user=None):
+        token = RoleTokenObtainPairSerializer.get_token(user or self.user).access_token
+        return getattr(self.factory, method)('/api/activities/logs/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def authenticate(self, request):
+        return RoleClaimsJWTAuthentication().authenticate(request)
+
+    def test_read_builds_user_from_role_claims(self):
+        user, _ = self.authenticate(self.request())
+        self.assertIsInstance(user, RoleTokenUser)
+        role = get_user_role(user)
+        self.assertEqual(role.role, 'FELLOW')
+        self.assertEqual(role.fellow_id, self.fellow.id)
+        self.assertIsNone(role.mentor_id)
+        self.assertFalse(role.is_staff)
+
+    def test_token_user_id_is_int(self):
+        user, _ = self.authenticate(self.request())
+        self.assertEqual(user.id, self.user.id)
+        self.assertIsInstance(user.id, int)
+        self.assertIsInstance(get_user_role(user).user_id, int)
+
+    def test_account_state_is_cached_between_reads(self):
+        request = self.request()
+        with self.assertNumQueries(1):
+            self.authenticate(request)
+        with self.assertNumQueries(0):
+            self.authenticate(request)
+
+    def test_deactivated_user_is_rejected_on_read(self):
+        request = self.request()
+        self.authenticate(request)
+        # save() drops the cached account state (accounts/signals.py)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaisesMessage(AuthenticationFailed, 'User is inactive'):
+            self.authenticate(request)
+
+    def test_deleted_user_is_rejected_on_read(self):
+        request = self.request()
+        User.objects.filter(pk=self.user.pk).delete()
+        cache.clear()
+        with self.assertRaisesMessage(AuthenticationFailed, 'User not found'):
+            self.authenticate(request)
+
+    def test_write_loads_the_user(self):
+        user, _ = self.authenticate(self.request('post'))
+        self.assertIsInstance(user, User)
+
+    def test_deactivated_user_is_rejected_on_write(self):
+        request = self.request('post')
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(request)
+
+
+def blacklist_jti(user, jti, row_id=None):
+    now = timezone.now()
+    token = OutstandingToken.objects.create(
+        user=user, jti=jti, token=jti, created_at=now, expires_at=now + timedelta(days=1),
+    )
+    return BlacklistedToken.objects.create(id=row_id, token=token)
+
+
+@override_settings(TOKEN_BLACKLIST_FILTER_SYNC_SECONDS=0)
+class BlacklistFilterTests(TestCase):
+    def setUp(self):
+        self.user = create_fellow('ann@example.com', create_locations()).user
+        self.filter = BlacklistFilter()
+
+    def test_blacklisted_refresh_token_is_rejected(self):
+        blacklist_filter.reset()
+        refresh = FilteredRefreshToken.for_user(self.user)
+        refresh.blacklist()
+        with self.assertRaises(TokenError):
+            FilteredRefreshToken(str(refresh))
+
+    def test_unknown_jti_skips_the_blacklist_query(self):
+        blacklist_jti(self.user, 'revoked')
+        self.filter.might_contain('warm-up')
+        # One overlap re-scan (sync every check here), no BlacklistedToken lookup by jti
+        with self.assertNumQueries(1):
+            self.assertFalse(self.filter.might_contain('never-revoked'))
+        self.assertTrue(self.filter.might_contain('revoked'))
+
+    def test_sync_picks_up_rows_committed_below_the_watermark(self):
+        blacklist_jti(self.user, 'first', row_id=100)
+        self.filter.might_contain('warm-up')
+        # Allocated a lower id but committed after the last sync (out-of-order commit)
+        blacklist_jti(self.user, 'late', row_id=60)
+        self.assertTrue(self.filter.might_contain('late'))
+
+    @override_settings(TOKEN_BLACKLIST_FILTER_SYNC_OVERLAP=10)
+    def test_rows_behind_the_overlap_wait_for_the_rebuild(self):
+        blacklist_jti(self.user, 'first', row_id=100)
+        self.filter.might_contain('warm-up')
+        blacklist_jti(self.user, 'very-late', row_id=5)
+        self.assertFalse(self.filter.might_contain('very-late'))
+        self.filter.reset()
+        self.assertTrue(self.filter.might_contain('very-late'))
+
+    def test_rescanned_rows_do_not_fill_the_filter(self):
+        blacklist_jti(self.user, 'revoked')
+        self.filter.might_contain('warm-up')
+        for _ in range(5):
+            self.filter.might_contain('other')
+        self.assertEqual(len(self.filter._bloom), 1)
+
+    def test_rebuild_loads_without_the_lock_and_keeps_concurrent_adds(self):
+        blacklist_jti(self.user, 'stored')
+        filter_ = self.filter
+        real_bloom = blacklist.BloomFilter
+
+        def bloom_factory(*args, **kwargs):
+            # Runs while the rebuild is loading: the lock must be free
+            self.assertTrue(filter_._lock.acquire(blocking=False))
+            filter_._lock.release()
+            self.assertTrue(filter_.might_contain('anything'))  # no filter yet: the database decides
+            filter_.add('added-meanwhile')
+            return real_bloom(*args, **kwargs)
+
+        with mock.patch.object(blacklist, 'BloomFilter', bloom_factory):
+            filter_.might_contain('warm-up')
+        self.assertTrue(filter_.might_contain('stored'))
+        self.assertTrue(filter_.might_contain('added-meanwhile'))
+
+    def test_sync_queries_without_the_lock(self):
+        blacklist_jti(self.user, 'stored', row_id=10)
+        filter_ = self.filter
+        filter_.might_contain('warm-up')
+        blacklist_jti(self.user, 'later', row_id=11)
+        real_filter = BlacklistedToken.objects.filter
+
+        def filter_rows(*args, **kwargs):
+            # Runs while the sync is querying: other checks use the current filter
+            self.assertTrue(filter_._lock.acquire(blocking=False))
+            filter_._lock.release()
+            self.assertFalse(filter_.might_contain('later'))
+            return real_filter(*args, **kwargs)
+
+        with mock.patch.object(BlacklistedToken.objects, 'filter', filter_rows):
+            filter_.might_contain('anything')
+        self.assertTrue(filter_.might_contain('later'))
+
+
+class RoleResolutionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        buckets.clear()
+        self.sector = create_locations()
+        self.mentor = create_mentor('mentor@example.com')
+        self.fellow = create_fellow('ann@example.com', self.sector, self.mentor)
+        self.other = create_fellow('bob@example.com', self.sector)
+        self.mine = create_activity(self.fellow)
+        self.theirs = create_activity(self.other)
+
+    def fresh(self, user):
+        # A new instance, like the one each request loads
+        return User.objects.get(pk=user.pk)
+
+    def test_one_query_then_memoised_on_the_user(self):
+        user = self.fresh(self.mentor.user)
+        with self.assertNumQueries(1):
+            role = get_user_role(user)
+            self.assertIs(get_user_role(user), role)
+        self.assertEqual((role.mentor_id, role.fellow_id), (self.mentor.id, None))
+        self.assertTrue(role.is_mentor)
+
+    @override_settings(ROLE_CACHE_TIMEOUT=0)
+    def test_without_cache_every_request_queries(self):
+        get_user_role(self.fresh(self.fellow.user))
+        user = self.fresh(self.fellow.user)
+        with self.assertNumQueries(1):
+            get_user_role(user)
+
+    @override_settings(ROLE_CACHE_TIMEOUT=60)
+    def test_role_cache_serves_later_requests(self):
+        get_user_role(self.fresh(self.fellow.user))
+        user = self.fresh(self.fellow.user)
+        with self.assertNumQueries(0):
+            role = get_user_role(user)
+        self.assertEqual(role.fellow_id, self.fellow.id)
+
+    @override_settings(ROLE_CACHE_TIMEOUT=60)
+    def test_group_change_invalidates_the_cache(self):
+        user = self.fellow.user
+        self.assertFalse(get_user_role(self.fresh(user)).is_admin_or_coordinator)
+        user.groups.add(Group.objects.create(name='Coordinator'))
+        self.assertTrue(get_user_role(self.fresh(user)).is_admin_or_coordinator)
+        user.groups.clear()
+        self.assertFalse(get_user_role(self.fresh(user)).is_admin_or_coordinator)
+
+    @override_settings(ROLE_CACHE_TIMEOUT=60)
+    def test_profile_change_invalidates_the_cache(self):
+        user = self.fellow.user
+        self.assertEqual(get_user_role(self.fresh(user)).role, 'FELLOW')
+        profile = user.userprofile
+        profile.role = 'COORDINATOR'
+        profile.save()
+        self.assertEqual(get_user_role(self.fresh(user)).role, 'COORDINATOR')
+
+        self.fellow.delete()
+        self.assertIsNone(get_user_role(self.fresh(user)).fellow_id)
+
+    def visible_ids(self, user):
+        client = APIClient()
+        client.force_authenticate(self.fresh(user))
+        response = client.get('/api/activities/logs/', {'fields': 'id'})
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.json()['results']}
+
+    def test_reviewers_see_every_report(self):
+        everything = {self.mine.id, self.theirs.id}
+        for role in ('ADMIN', 'COORDINATOR'):
+            self.assertEqual(self.visible_ids(create_user(f'{role.lower()}@example.com', role=role)), everything)
+        self.assertEqual(self.visible_ids(self.mentor.user), everything)
+        self.assertEqual(self.visible_ids(create_user('staff@example.com', role='VIEWER', is_staff=True)), everything)
+
+    def test_fellows_see_their_own_reports(self):
+        self.assertEqual(self.visible_ids(self.fellow.user), {self.mine.id})
+        self.assertEqual(self.visible_ids(create_user('viewer@example.com', role='VIEWER')), set())
+
+
+SMALL_RATES = {
+    'api': {'ADMIN': None, 'COORDINATOR': '2/min', 'FELLOW': '2/min', 'ANON': '2/min'},
+    'analytics': {'ADMIN': None, 'COORDINATOR': '1/min', 'ANON': '1/min'},
+    'export': {'COORDINATOR': '1/hour'},
+}
+
+
+class ThrottlingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        buckets.clear()
+        self.sector = create_locations()
+
+    def test_rates_per_role(self):
+        self.assertEqual(get_rate('api', 'FELLOW'), (120, 2.0))
+        self.assertEqual(get_rate('api', 'COORDINATOR'), (600, 10.0))
+        self.assertEqual(get_rate('export', 'MENTOR'), (10, 10 / 3600))
+        self.assertIsNone(get_rate('api', 'ADMIN'))
+        self.assertEqual(parse_rate('10/5min'), (10, 10 / 300))
+
+        self.assertEqual(throttle_role(UserRole()), 'ANON')
+        self.assertEqual(throttle_role(UserRole(user_id=1, role='FELLOW', is_staff=True)), 'ADMIN')
+        self.assertEqual(throttle_role(UserRole(user_id=1, role='COORDINATOR')), 'COORDINATOR')
+        self.assertEqual(throttle_role(UserRole(user_id=1, mentor_id=3)), 'MENTOR')
+        self.assertEqual(throttle_role(UserRole(user_id=1, fellow_id=3)), 'FELLOW')
+        self.assertEqual(throttle_role(UserRole(user_id=1)), 'VIEWER')
+
+    @override_settings(API_THROTTLE_RATES=SMALL_RATES)
+    def test_drf_throttle_answers_429_with_retry_after(self):
+        client = APIClient()
+        client.force_authenticate(create_fellow('ann@example.com', self.sector).user)
+        statuses = [client.get('/api/locations/provinces/').status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+
+        response = client.get('/api/locations/provinces/')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn(int(response['Retry-After']), range(1, 31))
+
+    @override_settings(API_THROTTLE_RATES=SMALL_RATES)
+    def test_admin_is_unthrottled(self):
+        client = APIClient()
+        client.force_authenticate(create_user('admin@example.com', role='ADMIN', is_staff=True))
+        for _ in range(5):
+            self.assertEqual(client.get('/api/locations/provinces/').status_code, 200)
+
+    @override_settings(API_THROTTLE_RATES=SMALL_RATES)
+    def test_analytics_and_export_have_their_own_budgets(self):
+        user = create_user('coordinator@example.com', role='COORDINATOR')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        self.assertEqual(client.get('/api/locations/sectors/coverage/').status_code, 200)
+        self.assertEqual(client.get('/api/locations/sectors/coverage/').status_code, 429)
+        # The 'api' budget is untouched by analytics calls
+        self.assertEqual(client.get('/api/locations/provinces/').status_code, 200)
+
+        client.force_login(user)
+        self.assertEqual(client.get('/activities/export/csv/', SERVER_NAME='localhost').status_code, 200)
+        response = client.get('/activities/export/csv/', SERVER_NAME='localhost')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '3600')
+        self.assertIn('throttled', response.json()['detail'])
+
+    @override_settings(API_THROTTLE_RATES=SMALL_RATES)
+    def test_anonymous_callers_are_bucketed_per_ip(self):
+        client = APIClient()
+        for _ in range(2):
+            client.get('/api/locations/provinces/', REMOTE_ADDR='203.0.113.1')
+        self.assertEqual(client.get('/api/locations/provinces/', REMOTE_ADDR='203.0.113.1').status_code, 429)
+        self.assertEqual(client.get('/api/locations/provinces/', REMOTE_ADDR='203.0.113.2').status_code, 200)
+
+    def test_client_ip(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.2', HTTP_X_FORWARDED_FOR='1.1.1.1, 203.0.113.9')
+        with self.settings(API_THROTTLE_NUM_PROXIES=0):
+            # Not behind a proxy: the header is client-controlled and ignored
+            self.assertEqual(client_ip(request), '10.0.0.2')
+        with self.settings(API_THROTTLE_NUM_PROXIES=1):
+            self.assertEqual(client_ip(request), '203.0.113.9')
+        with self.settings(API_THROTTLE_NUM_PROXIES=5):
+            self.assertEqual(client_ip(request), '1.1.1.1')
+
+    def test_bucket_refills_over_time(self):
+        store = TokenBucketStore()
+        self.assertEqual(store.take('k', 2, 1.0, now=0), 0)
+        self.assertEqual(store.take('k', 2, 1.0, now=0), 0)
+        self.assertEqual(store.take('k', 2, 1.0, now=0), 1.0)
+        self.assertEqual(store.take('k', 2, 1.0, now=0.5), 0.5)
+        self.assertEqual(store.take('k', 2, 1.0, now=1.0), 0)
+
+    def test_refilled_buckets_are_pruned(self):
+        store = TokenBucketStore()
+        with mock.patch('accounts.throttling.PRUNE_EVERY', 3):
+            store.take('a', 1, 1.0, now=0)
+            store.take('b', 1, 1.0, now=0)
+            self.assertEqual(len(store), 2)
+            store.take('c', 1, 1.0, now=10)
+        self.assertEqual(len(store), 1)
@@ -0,0 +1,215 @@
+"""
+Role-aware API throttling with in-process token buckets.
+
+Each (scope, user) pair owns a bucket of `N` tokens that refills continuously at
+N per period ('120/min' = a burst of 120, then 2 requests per second). A request
+takes one token; an empty bucket answers 429 with a Retry-After header giving the
+seconds until the next token. Anonymous callers are bucketed per client IP.
+
+Scopes and rates per role live in settings.API_THROTTLE_RATES:
+    'api'        every DRF view (DEFAULT_THROTTLE_CLASSES)
+    'analytics'  aggregate endpoints (dashboard, impact, leaderboard, metrics, coverage)
+    'export'     CSV export
+A rate of None leaves that role unthrottled in that scope.
+
+The check is a dict lookup and a few float operations under one lock (a few
+microseconds); the role comes from get_user_role(), already resolved for the
+request (JWT claims or one memoised query). Buckets are per worker process: with
+N gunicorn workers a client can reach up to N x the configured rate.
+
+Usage:
+    class DashboardStatsAPIView(APIView):
+        throttle_classes = [AnalyticsRateThrottle]
+
+    @throttle_view('export')
+    def export_activities_csv(request): ...
+"""
+
+# accounts/throttling.py
+
+import math
+import threading
+import time
+from functools import lru_cache, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework.throttling import BaseThrottle
+
+from .roles import get_user_role
+
+PERIODS = {'s': 1, 'sec': 1, 'second': 1, 'm': 60, 'min': 60, 'minute': 60,
+           'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+# Prune idle (refilled) buckets every N checks so memory follows the active clients
+PRUNE_EVERY = 10000
+
+
+class TokenBucketStore:
+    """Thread-safe token buckets keyed by string: key -> [tokens, updated_at, full_at]."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._checks = 0
+
+    def take(self, key, capacity, per_second, now=None):
+        """Takes one token; returns 0 when allowed, else the seconds until a token is free."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                # Unknown (or pruned) key: a full bucket
+                tokens = capacity
+                bucket = self._buckets[key] = [capacity, now, now]
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * per_second)
+
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / per_second
+            bucket[0] = tokens
+            bucket[1] = now
+            bucket[2] = now + (capacity - tokens) / per_second
+
+            self._checks += 1
+            if self._checks >= PRUNE_EVERY:
+                self._prune(now)
+        return wait
+
+    def _prune(self, now):
+        # A bucket that has refilled is the same as no bucket
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+        self._checks = 0
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._checks = 0
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+buckets = TokenBucketStore()
+
+
+# --- 1. RATES ---
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'120/min' -> (capacity 120, 2.0 tokens per second); None -> None."""
+    if rate is None:
+        return None
+    count, period = rate.split('/')
+    # Optional multiplier, e.g. '10/5min'
+    digits = period.rstrip('abcdefghijklmnopqrstuvwxyz')
+    seconds = PERIODS[period[len(digits):]] * (int(digits) if digits else 1)
+    return int(count), int(count) / seconds
+
+
+def throttle_role(role):
+    """Rate table row for a UserRole: ADMIN (staff), the profile role, or ANON."""
+    if not role.is_authenticated:
+        return 'ANON'
+    if role.is_staff or role.is_superuser:
+        return 'ADMIN'
+    if role.role:
+        return role.role
+    if role.mentor_id is not None:
+        return 'MENTOR'
+    return 'FELLOW' if role.fellow_id is not None else 'VIEWER'
+
+
+def get_rate(scope, role_name):
+    rates = settings.API_THROTTLE_RATES[scope]
+    return parse_rate(rates.get(role_name, rates.get('default')))
+
+
+def client_ip(request):
+    """Client IP; X-Forwarded-For is only trusted behind API_THROTTLE_NUM_PROXIES proxies."""
+    proxies = settings.API_THROTTLE_NUM_PROXIES
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if proxies and forwarded:
+        hops = [hop.strip() for hop in forwarded.split(',')]
+        return hops[-min(proxies, len(hops))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def take_token(request, role, scope):
+    """Takes a token from the caller's bucket in `scope`; returns 0 or the seconds to wait."""
+    if not settings.API_THROTTLE_ENABLED:
+        return 0
+    rate = get_rate(scope, throttle_role(role))
+    if rate is None:
+        return 0
+    ident = f'u{role.user_id}' if role.is_authenticated else f'ip{client_ip(request)}'
+    return buckets.take(f'{scope}:{ident}', *rate)
+
+
+def throttle_wait(request, scope):
+    """take_token() for the request's user (sync views and DRF throttles)."""
+    return take_token(request, get_user_role(request.user), scope)
+
+
+async def athrottle_wait(request, user, scope):
+    """
+    throttle_wait() for async views, given the user returned by aauthenticate_api_request
+    (request.user may still be lazy): resolves the role off the event loop if needed.
+    """
+    role = getattr(user, '_user_role', None)
+    if role is None:
+        role = await sync_to_async(get_user_role)(user)
+    return take_token(request, role, scope)
+
+
+# --- 2. DRF THROTTLE CLASSES ---
+
+class RoleRateThrottle(BaseThrottle):
+    """Default throttle of every DRF view ('api' scope); DRF adds the Retry-After header."""
+    scope = 'api'
+
+    def allow_request(self, request, view):
+        self.retry_after = throttle_wait(request, self.scope)
+        return not self.retry_after
+
+    def wait(self):
+        return self.retry_after
+
+
+class AnalyticsRateThrottle(RoleRateThrottle):
+    """Aggregate endpoints: their own, smaller budget instead of the 'api' one."""
+    scope = 'analytics'
+
+
+class ExportRateThrottle(RoleRateThrottle):
+    scope = 'export'
+
+
+# --- 3. PLAIN DJANGO VIEWS ---
+
+def throttled_response(wait):
+    """429 with the same body and Retry-After header as DRF's Throttled."""
+    seconds = max(math.ceil(wait), 1)
+    unit = 'second' if seconds == 1 else 'seconds'
+    response = JsonResponse(
+        {'detail': f'Request was throttled. Expected available in {seconds} {unit}.'}, status=429,
+    )
+    response['Retry-After'] = str(seconds)
+    return response
+
+
+def throttle_view(scope):
+    """Decorator for (sync) function views, applied inside @login_required."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            wait = throttle_wait(request, scope)
+            if wait:
+                return throttled_response(wait)
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,67 @@
+"""
+JWT serializers that embed the user's role in the (signed) token payload.
+RoleClaimsJWTAuthentication reads these claims back so read-only API calls
+never have to load the User, UserProfile, Fellow or Mentor rows.
+"""
+
+# accounts/tokens.py
+
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+    TokenBlacklistSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from .blacklist import FilteredRefreshToken
+from .roles import get_user_role, load_user_role
+
+# Claim name -> UserRole attribute
+ROLE_CLAIMS = {
+    'role': 'role',
+    'fellow_id': 'fellow_id',
+    'mentor_id': 'mentor_id',
+    'is_staff': 'is_staff',
+    'is_superuser': 'is_superuser',
+    'coordinator_group': 'in_coordinator_group',
+}
+
+
+def add_role_claims(token, user_role):
+    """Copies the resolved role onto a token (refresh or access)."""
+    for claim, attr in ROLE_CLAIMS.items():
+        token[claim] = getattr(user_role, attr)
+    return token
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """POST /api/auth/login/ - tokens carry role, fellow_id and mentor_id claims."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        # Claims on the refresh token are copied to every access token derived from it
+        return add_role_claims(token, get_user_role(user))
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    POST /api/auth/token/refresh/
+    Re-resolves the role before issuing the new access (and rotated refresh) token,
+    so a promotion, new mentor assignment or deactivation is picked up on rotation.
+    """
+    token_class = FilteredRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id is not None:
+            add_role_claims(refresh, load_user_role(user_id))
+            # Same jti/exp, so blacklisting and rotation behave exactly as before
+            attrs['refresh'] = str(refresh)
+        return super().validate(attrs)
+
+
+class FilteredTokenBlacklistSerializer(TokenBlacklistSerializer):
+    """POST /api/auth/logout/ - blacklist check goes through the Bloom filter."""
+    token_class = FilteredRefreshToken
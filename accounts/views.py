@@ -7,12 +7,13 @@ from rest_framework.permissions import AllowAny # Added for API
 
 from .models import UserProfile
 from .serializers import RegisterSerializer 
+from .roles import get_user_role
 
 """ Script that handles where users go after they log in """
 
 @login_required
 def smart_redirect(request):
-    role = request.user.userprofile.role
+    role = get_user_role(request.user).role
     if role == 'FELLOW':
         return redirect('fellow_dashboard')  
     elif role in ['ADMIN', 'COORDINATOR', 'MENTOR']:
@@ -1,5 +1,11 @@
 from django.contrib import admin
-from .models import TrainingActivity
+from django.utils import timezone
+
+from bridge2Rwanda_fellowship_management_system.admin_utils import (
+    EstimatedCountPaginator, cached_choices_filter,
+)
+from .choices import district_options
+from .models import OutboxMessage, ReportSnapshot, ReviewEvent, TrainingActivity
 
 @admin.register(TrainingActivity)
 class TrainingActivityAdmin(admin.ModelAdmin):
@@ -12,9 +18,22 @@ class TrainingActivityAdmin(admin.ModelAdmin):
         'status', 
         'number_of_farmers_trained'
     )
-    
-    # Filters on the right sidebar
-    list_filter = ('status', 'training_method', 'date', 'sector__district')
+    # 'fellow' prints the user's name: join it instead of one query per row
+    list_select_related = ('fellow__user', 'sector')
+
+    # Newest first, served by activity_date_idx (-date, -id)
+    ordering = ('-date', '-id')
+    # Year > month > day drill-down over the indexed date column
+    date_hierarchy = 'date'
+
+    # No full COUNT(*) scans at production volume (see admin_utils.py)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Max queries per changelist page, whatever the number of rows (audit_admin_queries)
+    changelist_query_budget = 6
+
+    # Filters on the right sidebar (District names include their province)
+    list_filter = ('status', 'training_method', ('sector__district', cached_choices_filter(district_options)))
     
     # Search functionality
     search_fields = (
@@ -24,6 +43,9 @@ class TrainingActivityAdmin(admin.ModelAdmin):
         'village_name'
     )
     
+    # Search-as-you-type widgets instead of <select>s loading every fellow / sector
+    autocomplete_fields = ('fellow', 'sector')
+
     # Organization of the edit page
     fieldsets = (
         ('General Information', {
@@ -37,7 +59,7 @@ class TrainingActivityAdmin(admin.ModelAdmin):
                 'training_topic', 
                 'training_method', 
                 'number_of_farmers_trained', 
-                'duration_hours'
+                'duration'
             )
         }),
         ('Notes & Feedback', {
@@ -49,4 +71,84 @@ class TrainingActivityAdmin(admin.ModelAdmin):
     )
 
     # Make the date tracking fields read-only
-    readonly_fields = ('created_at', 'updated_at')
\ No newline at end of file
+    readonly_fields = ('created_at', 'updated_at')
+
+    def save_model(self, request, obj, form, change):
+        obj.review_actor = request.user  # recorded on the review event
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(ReviewEvent)
+class ReviewEventAdmin(admin.ModelAdmin):
+    """Read-only: the review log is append-only (activities/reviews.py)."""
+    list_display = ('created_at', 'kind', 'report', 'actor', 'mentor', 'district', 'waited_seconds', 'first_review')
+    # No join to the report: events of archived or deleted reports have no hot row
+    list_select_related = ('actor', 'mentor__user', 'district__province')
+    list_filter = ('kind', 'first_review')
+    ordering = ('-created_at', '-id')
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    changelist_query_budget = 4
+
+    def report(self, obj):
+        return f'#{obj.activity_id}'
+    report.short_description = 'Report'
+    report.admin_order_field = 'activity_id'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    """Delivery status of queued notifications (sent by dispatch_notifications)."""
+    list_display = ('created_at', 'kind', 'recipient', 'status', 'attempts', 'available_at', 'sent_at')
+    list_select_related = ('recipient',)
+    list_filter = ('status', 'kind')
+    readonly_fields = ('recipient', 'kind', 'payload', 'attempts', 'last_error', 'created_at', 'sent_at')
+    ordering = ('-created_at', '-id')
+    actions = ('retry_now',)
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    changelist_query_budget = 4
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Retry selected messages at the next dispatch')
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=OutboxMessage.Status.SENT).update(
+            status=OutboxMessage.Status.PENDING, available_at=timezone.now(), attempts=0,
+        )
+        self.message_user(request, f'{updated} message(s) queued for the next dispatch.')
+
+
+@admin.register(ReportSnapshot)
+class ReportSnapshotAdmin(admin.ModelAdmin):
+    """Read-only: snapshots are frozen by `python manage.py freeze_snapshot` (activities/snapshots.py)."""
+    list_display = ('label', 'period_start', 'period_end', 'content_hash', 'created_by', 'created_at')
+    list_select_related = ('created_by',)
+    search_fields = ('label',)
+    ordering = ('-period_start', 'label')
+
+    show_full_result_count = False
+    changelist_query_budget = 4
+    # No bulk actions on the changelist
+    actions = None
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,139 @@
+"""
+Analytics queries shared by the sync (WSGI) and async (ASGI) views.
+
+Each report is described as a dict of INDEPENDENT query callables:
+
+    queries = impact_summary_queries(search, district_id)
+    results = run_queries(queries)            # one after another (sync views)
+    results = await arun_queries(queries)     # all at once (async views)
+
+arun_queries runs every callable in its own worker thread. Django connections
+are per-thread, so the aggregates go to the database over separate connections
+concurrently, and the request costs roughly the slowest query instead of the sum.
+The pool size (ANALYTICS_QUERY_WORKERS) caps the extra connections per process.
+"""
+
+# activities/analytics.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Sum, Count, Avg
+from django.db.models.functions import TruncMonth
+
+# Live + archived reports (activities/archive.py): archiving changes no total
+from .models import TrainingActivityRecord
+
+_executor = None
+
+
+def get_query_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'ANALYTICS_QUERY_WORKERS', 8),
+            thread_name_prefix='analytics-query',
+        )
+    return _executor
+
+
+# --- 1. RUNNERS ---
+
+def run_queries(queries):
+    """Evaluates the callables sequentially on the current connection."""
+    return {name: query() for name, query in queries.items()}
+
+
+def _run_on_own_connection(query):
+    # Same connection hygiene as a request: drop connections past CONN_MAX_AGE or broken
+    close_old_connections()
+    try:
+        return query()
+    finally:
+        close_old_connections()
+
+
+async def arun_queries(queries):
+    """Evaluates the callables concurrently, each on its worker thread's own connection."""
+    executor = get_query_executor()
+    results = await asyncio.gather(*(
+        sync_to_async(_run_on_own_connection, thread_sensitive=False, executor=executor)(query)
+        for query in queries.values()
+    ))
+    return dict(zip(queries, results))
+
+
+# --- 2. IMPACT SUMMARY (activities/summary/) ---
+
+def impact_summary_queries(search=None, district_id=None):
+    approved_data = TrainingActivityRecord.objects.filter(status='APPROVED')
+    if search:
+        approved_data = approved_data.filter(training_topic__icontains=search)
+    if district_id:
+        approved_data = approved_data.filter(sector__district_id=district_id)
+
+    return {
+        'total_stats': lambda: approved_data.aggregate(
+            total_farmers=Sum('number_of_farmers_trained'),
+            total_sessions=Count('id'),
+            avg_reach=Avg('number_of_farmers_trained'),
+        ),
+        'topic_data': lambda: list(approved_data.values('training_topic').annotate(
+            total=Count('id')
+        ).order_by('-total')[:5]),
+        'geographic_data': lambda: list(approved_data.values('sector__district__name').annotate(
+            farmers=Sum('number_of_farmers_trained'),
+            sessions=Count('id'),
+        ).order_by('-farmers')),
+    }
+
+
+def build_impact_summary(results):
+    total_stats = results['total_stats']
+    return {
+        'total_farmers': total_stats['total_farmers'] or 0,
+        'total_sessions': total_stats['total_sessions'] or 0,
+        'avg_reach': round(total_stats['avg_reach'] or 0, 1),
+        'geographic_data': results['geographic_data'],
+        'topic_data': results['topic_data'],
+    }
+
+
+# --- 3. PROGRAM METRICS (dashboards & charts) ---
+
+def program_metrics_queries():
+    approved_activities = TrainingActivityRecord.objects.filter(status='APPROVED')
+    return {
+        'monthly_trends': lambda: list(approved_activities.annotate(
+            month=TruncMonth('date')
+        ).values('month').annotate(
+            total=Sum('number_of_farmers_trained')
+        ).order_by('month')),
+        'total_farmers': lambda: approved_activities.aggregate(
+            Sum('number_of_farmers_trained')
+        )['number_of_farmers_trained__sum'] or 0,
+        'total_sessions': lambda: approved_activities.count(),
+        'active_sectors_count': lambda: approved_activities.values('sector').distinct().count(),
+        'province_reach': lambda: list(approved_activities.values(
+            'sector__district__province__name'
+        ).annotate(
+            total_farmers=Sum('number_of_farmers_trained'),
+            session_count=Count('id'),
+        ).order_by('-total_farmers')),
+    }
+
+
+def build_program_metrics(results):
+    monthly_trends = results['monthly_trends']
+    return {
+        'total_farmers': results['total_farmers'],
+        'total_sessions': results['total_sessions'],
+        'active_sectors_count': results['active_sectors_count'],
+        'province_reach': results['province_reach'],
+        # --- Chart.js series ---
+        'chart_labels': [item['month'].strftime('%b %Y') for item in monthly_trends],
+        'chart_values': [item['total'] for item in monthly_trends],
+    }
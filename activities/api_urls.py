@@ -11,6 +11,12 @@ urlpatterns = [
     path('dashboard/', views.DashboardStatsAPIView.as_view(), name='api-dashboard'),
     path('impact/', views.ImpactReportDataAPIView.as_view(), name='api-impact'),
     path('fellow-performance/', views.FellowPerformanceAPIView.as_view(), name='api-performance'),
+    path('review-latency/', views.ReviewLatencyAPIView.as_view(), name='api-review-latency'),
+    path('metrics/', views.MetricsAPIView.as_view(), name='api-metrics'),
+    path('program-metrics/', views.ProgramMetricsAPIView.as_view(), name='api-program-metrics'),
+    path('snapshots/', views.ReportSnapshotListAPIView.as_view(), name='api-snapshots'),
+    path('snapshots/<int:pk>/', views.ReportSnapshotAPIView.as_view(), name='api-snapshot'),
+    path('async/program-metrics/', views.program_metrics_async, name='api-program-metrics-async'),
     
     # The ModelViewSet routes (e.g., /api/activities/logs/)
     path('', include(router.urls)), # training activity logs
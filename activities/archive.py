@@ -0,0 +1,143 @@
+"""
+Hot / cold archival of closed-cohort training reports.
+
+TrainingActivity (hot) keeps the reports live queries need: mentor queues, fellow
+dashboards, the API. APPROVED reports of COMPLETED fellows dated before a cutoff
+never change again; archive() moves them to ArchivedTrainingActivity (cold) in
+batched transactions:
+
+    INSERT INTO archive (...) SELECT ... FROM hot WHERE id IN (batch)
+    DELETE FROM hot WHERE id IN (batch)
+
+Rows keep their id. The raw DELETE sends no signals and cascades nothing, so the
+fellow counters (which count all history) and the review event log stay as they
+are (ReviewEvent.activity is DO_NOTHING without a database constraint: events
+outlive the hot row), and restore() moves rows back the same way, unchanged.
+
+Reading both: TrainingActivityRecord maps the view activities_trainingactivity_all
+(hot UNION ALL cold, plus an `archived` flag). Analytics, exports, coverage and
+counter reconciliation read it, so archiving changes no total. The view is created
+by migration 0013 (RunSQL). A migration that changes either table must drop the
+view first and recreate it last with the new column list (SQLite table rebuilds
+and PostgreSQL column changes fail while a view depends on the table); the
+activities tests check that the view's columns match the models.
+
+Usage:
+    python manage.py archive_activities --dry-run
+    python manage.py archive_activities --older-than-days 365
+    python manage.py restore_activities --fellow 12
+"""
+
+# activities/archive.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import ExtractYear
+from django.utils import timezone
+
+from fellows.models import Fellow
+from .models import ActivityColumns, ArchivedTrainingActivity, TrainingActivity
+from .utils import bump_data_version, fellow_dataset
+
+HOT_TABLE = TrainingActivity._meta.db_table
+COLD_TABLE = ArchivedTrainingActivity._meta.db_table
+
+# Columns copied between the tables: id, the foreign keys, then the shared columns
+COLUMNS = ('id', 'fellow_id', 'sector_id', 'approved_by_id') + tuple(
+    field.column for field in ActivityColumns._meta.fields
+)
+
+
+# --- 1. MOVING ROWS ---
+
+def archive_cutoff(days=None, today=None):
+    days = settings.ACTIVITY_ARCHIVE_AFTER_DAYS if days is None else days
+    return (today or timezone.localdate()) - timedelta(days=days)
+
+
+def archivable(cutoff):
+    """Hot reports that may move: APPROVED, of a COMPLETED fellow, dated before the cutoff."""
+    return TrainingActivity.objects.filter(
+        status=TrainingActivity.Status.APPROVED,
+        fellow__status=Fellow.Status.COMPLETED,
+        date__lt=cutoff,
+    )
+
+
+def _move(ids, source, target, archived_at=None):
+    """INSERT ... SELECT the rows into `target`, then DELETE them from `source` (one transaction)."""
+    qn = connection.ops.quote_name
+    columns = ', '.join(qn(column) for column in COLUMNS)
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        if archived_at is None:
+            cursor.execute(
+                f'INSERT INTO {qn(target)} ({columns}) '
+                f'SELECT {columns} FROM {qn(source)} WHERE {qn("id")} IN ({placeholders})',
+                ids,
+            )
+        else:
+            cursor.execute(
+                f'INSERT INTO {qn(target)} ({columns}, {qn("archived_at")}) '
+                f'SELECT {columns}, %s FROM {qn(source)} WHERE {qn("id")} IN ({placeholders})',
+                [connection.ops.adapt_datetimefield_value(archived_at), *ids],
+            )
+        cursor.execute(f'DELETE FROM {qn(source)} WHERE {qn("id")} IN ({placeholders})', ids)
+
+
+def _invalidate(fellow_ids):
+    # Same numbers through the view, but the hot lists of these fellows changed
+    def bump():
+        bump_data_version('activities')
+        for fellow_id in fellow_ids:
+            bump_data_version(fellow_dataset(fellow_id))
+    transaction.on_commit(bump)
+
+
+def _locked_batch(queryset, batch_size):
+    """[(id, fellow_id), ...] of the next batch, row-locked where the database can skip locked rows."""
+    queryset = queryset.order_by('id')
+    if connection.features.has_select_for_update_skip_locked:
+        queryset = queryset.select_for_update(skip_locked=True, of=('self',))
+    return list(queryset.values_list('id', 'fellow_id')[:batch_size])
+
+
+def archive(cutoff=None, batch_size=500, max_batches=None):
+    """Moves the archivable reports to the archive table, one transaction per batch."""
+    cutoff = cutoff or archive_cutoff()
+    moved = batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            rows = _locked_batch(archivable(cutoff), batch_size)
+            if not rows:
+                break
+            _move([pk for pk, _ in rows], HOT_TABLE, COLD_TABLE, archived_at=timezone.now())
+            _invalidate({fellow_id for _, fellow_id in rows})
+        moved += len(rows)
+        batches += 1
+    return moved
+
+
+def restore(queryset=None, batch_size=500):
+    """Moves archived reports (all, or `queryset` of ArchivedTrainingActivity) back to the hot table."""
+    queryset = ArchivedTrainingActivity.objects.all() if queryset is None else queryset
+    restored = 0
+    while True:
+        with transaction.atomic():
+            rows = _locked_batch(queryset, batch_size)
+            if not rows:
+                return restored
+            _move([pk for pk, _ in rows], COLD_TABLE, HOT_TABLE)
+            _invalidate({fellow_id for _, fellow_id in rows})
+        restored += len(rows)
+
+
+def archivable_by_year(cutoff):
+    """{year: reports} that archive(cutoff) would move (for --dry-run)."""
+    rows = archivable(cutoff).annotate(year=ExtractYear('date')).values('year').annotate(
+        reports=Count('id')
+    ).order_by('year')
+    return {row['year']: row['reports'] for row in rows}
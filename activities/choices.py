@@ -0,0 +1,182 @@
+"""
+Cached choice lists for the sector, district and mentor <select>s.
+
+A ModelChoiceField re-reads its table on every render, and labels built by
+__str__ can cost one more query per option (District -> province, Mentor -> user).
+Here each list is built ONCE per data version, with pre-rendered <option> tags:
+
+    sector_options()                  every sector, labelled like Sector.__str__
+    sector_options(district_id=3)     only the sectors of one district
+    district_options(province_id=2)   districts, labelled like District.__str__
+    mentor_options()                  mentors, labelled like Mentor.__str__
+
+Sectors come from the cached location hierarchy (no query at all), districts and
+mentors from one joined query each. The 'locations' and 'mentors' data versions are
+bumped by activities/signals.py, which makes stale lists unreachable.
+
+Forms use them through CachedModelChoiceField + PrerenderedSelect:
+
+    assigned_sector = CachedModelChoiceField(sector_options, queryset=Sector.objects.all())
+
+The filtered variants serve dependent (province -> district -> sector) selects:
+sector_rows()/district_rows() back the /locations/ajax/load-*/ endpoints, which
+answer without touching the database.
+"""
+
+# activities/choices.py
+
+from django import forms
+from django.core.cache import cache
+from django.forms.utils import flatatt
+from django.utils.choices import BaseChoiceIterator
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from locations.utils import get_sector_hierarchy
+from locations.models import District
+from mentors.models import Mentor
+from .utils import get_data_version
+
+CHOICES_CACHE_KEY = 'choices:{}:v{}'
+
+
+class OptionList:
+    """(value, label) choices plus their pre-rendered <option> tags."""
+
+    def __init__(self, choices):
+        self.choices = [(value, label) for value, label in choices]
+        self.options = [format_html('<option value="{}">{}</option>', value, label) for value, label in self.choices]
+        self.positions = {str(value): index for index, (value, _) in enumerate(self.choices)}
+
+    def __len__(self):
+        return len(self.choices)
+
+    def render(self, selected=()):
+        """The <option> tags as one HTML string, marking the selected values."""
+        options = list(self.options)
+        for value in selected:
+            index = self.positions.get(str(value))
+            if index is not None:
+                options[index] = format_html(
+                    '<option value="{}" selected>{}</option>', *self.choices[index]
+                )
+        return mark_safe(''.join(options))
+
+
+def _cached(name, dataset, build):
+    return cache.get_or_set(CHOICES_CACHE_KEY.format(name, get_data_version(dataset)), build, timeout=None)
+
+
+# --- 1. LOCATIONS ---
+
+def _sector_rows():
+    # The hierarchy is already ordered like Sector.Meta.ordering
+    return [
+        {'id': entry['sector_id'], 'name': entry['sector_name'],
+         'district_id': entry['district_id'], 'district__name': entry['district']}
+        for entry in get_sector_hierarchy().values()
+    ]
+
+
+def _district_rows():
+    # Own query: districts without sectors yet are not in the sector hierarchy
+    return list(District.objects.values('id', 'name', 'province_id', 'province__name'))
+
+
+def sector_rows(district_id=None):
+    """Cached [{'id', 'name', 'district_id', 'district__name'}], optionally for one district."""
+    rows = _cached('sector_rows', 'locations', _sector_rows)
+    if district_id is None:
+        return rows
+    return [row for row in rows if row['district_id'] == int(district_id)]
+
+
+def district_rows(province_id=None):
+    """Cached [{'id', 'name', 'province_id', 'province__name'}], optionally for one province."""
+    rows = _cached('district_rows', 'locations', _district_rows)
+    if province_id is None:
+        return rows
+    return [row for row in rows if row['province_id'] == int(province_id)]
+
+
+def sector_options(district_id=None):
+    if district_id is not None:
+        return OptionList((row['id'], f"{row['name']} Sector") for row in sector_rows(district_id))
+    return _cached('sectors', 'locations', lambda: OptionList(
+        (row['id'], f"{row['name']} Sector") for row in sector_rows()
+    ))
+
+
+def district_options(province_id=None):
+    if province_id is not None:
+        return OptionList(
+            (row['id'], f"{row['name']} ({row['province__name']})") for row in district_rows(province_id)
+        )
+    return _cached('districts', 'locations', lambda: OptionList(
+        (row['id'], f"{row['name']} ({row['province__name']})") for row in district_rows()
+    ))
+
+
+# --- 2. MENTORS ---
+
+def _mentor_list():
+    rows = Mentor.objects.values_list('id', 'user__first_name', 'user__last_name').order_by(
+        'user__last_name', 'user__first_name'
+    )
+    return OptionList(
+        (mentor_id, f"Mentor: {f'{first_name} {last_name}'.strip()}") for mentor_id, first_name, last_name in rows
+    )
+
+
+def mentor_options():
+    return _cached('mentors', 'mentors', _mentor_list)
+
+
+# --- 3. FORM FIELD & WIDGET ---
+
+class CachedChoiceIterator(BaseChoiceIterator):
+    """Lazy: the provider is only read when the choices are iterated (not at import)."""
+
+    def __init__(self, field):
+        self.field = field
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        yield from self.field.provider().choices
+
+    def __len__(self):
+        return len(self.field.provider()) + (self.field.empty_label is not None)
+
+
+class PrerenderedSelect(forms.Select):
+    """A <select> that writes the provider's cached <option> tags instead of rendering one template per option."""
+
+    def render(self, name, value, attrs=None, renderer=None):
+        field = self.choices.field
+        attrs = self.build_attrs(self.attrs, attrs)
+        attrs['name'] = name
+        selected = [] if value in (None, '') else [value]
+        empty = ''
+        if field.empty_label is not None:
+            empty = format_html(
+                '<option value=""{}>{}</option>', '' if selected else mark_safe(' selected'), field.empty_label
+            )
+        return format_html('<select{}>{}{}</select>', flatatt(attrs), empty, field.provider().render(selected))
+
+
+class CachedModelChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField whose options come from a cached provider (no query per render).
+    Submitted values are still validated against `queryset` (one get() by pk).
+    """
+    widget = PrerenderedSelect
+
+    def __init__(self, provider, queryset, **kwargs):
+        self.provider = provider
+        super().__init__(queryset, **kwargs)
+
+    def _get_choices(self):
+        return CachedChoiceIterator(self)
+
+    choices = property(_get_choices, forms.ChoiceField.choices.fset)
@@ -0,0 +1,147 @@
+"""
+Denormalized per-fellow activity counters (columns on fellows.Fellow).
+
+    pending_count / revision_count / approved_count   activities per status
+    farmers_trained / training_seconds                totals of APPROVED activities
+    last_activity_date                                newest activity date (any status)
+
+Every write is a single UPDATE with F() expressions (no read-modify-write), so
+concurrent submissions and reviews cannot lose increments:
+  - TrainingActivity.save() locks the old row, saves, then applies new - old;
+  - post_delete (activities/signals.py) subtracts the deleted row.
+Writes that bypass the ORM instance methods (queryset.update(), bulk_create, raw SQL)
+are caught by `python manage.py reconcile_fellow_counters`.
+Every change also bumps the fellow's data version (utils.fellow_dataset) once the
+transaction commits, which invalidates that fellow's cached dashboard fragments.
+"""
+
+# activities/counters.py
+
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Greatest
+
+from fellows.models import Fellow
+from .models import TrainingActivity, TrainingActivityRecord
+from .utils import bump_data_version, fellow_dataset
+
+COUNTER_FIELDS = Fellow.COUNTER_FIELDS
+
+# Activity columns the counters are derived from
+SOURCE_FIELDS = ('fellow_id', 'status', 'number_of_farmers_trained', 'duration', 'date')
+
+STATUS_COUNTERS = {
+    TrainingActivity.Status.PENDING: 'pending_count',
+    TrainingActivity.Status.REVISION: 'revision_count',
+    TrainingActivity.Status.APPROVED: 'approved_count',
+}
+
+
+def source_values(activity):
+    """The counter-relevant values of an in-memory activity."""
+    return {field: getattr(activity, field) for field in SOURCE_FIELDS}
+
+
+def contribution(values):
+    """What one activity adds to its fellow's numeric counters."""
+    result = {name: 0 for name in STATUS_COUNTERS.values()}
+    result['farmers_trained'] = result['training_seconds'] = 0
+
+    counter = STATUS_COUNTERS.get(values['status'])
+    if counter:
+        result[counter] = 1
+    if values['status'] == TrainingActivity.Status.APPROVED:
+        result['farmers_trained'] = values['number_of_farmers_trained'] or 0
+        duration = values['duration']
+        result['training_seconds'] = int(duration.total_seconds()) if duration else 0
+    return result
+
+
+def _apply(fellow_id, delta):
+    changes = {}
+    for field, amount in delta.items():
+        if amount > 0:
+            changes[field] = F(field) + amount
+        elif amount < 0:
+            # Never below zero, even if the counter had drifted
+            changes[field] = Greatest(F(field) - (-amount), Value(0))
+    if changes:
+        Fellow.objects.filter(pk=fellow_id).update(**changes)
+
+
+def _refresh_last_activity_date(fellow_id):
+    # Live and archived reports: the view pushes the fellow filter into both tables'
+    # (fellow, -date) indexes, one lookup each inside the UPDATE
+    Fellow.objects.filter(pk=fellow_id).update(last_activity_date=Subquery(
+        TrainingActivityRecord.objects.filter(fellow_id=OuterRef('pk')).order_by('-date').values('date')[:1]
+    ))
+
+
+def record_change(old, new):
+    """
+    Applies an activity change to the fellow counters.
+    old/new are source-value dicts (None for a create / delete).
+    """
+    if old and new and old['fellow_id'] == new['fellow_id']:
+        before, after = contribution(old), contribution(new)
+        _apply(new['fellow_id'], {field: after[field] - before[field] for field in after})
+    else:
+        if old:
+            _apply(old['fellow_id'], {field: -amount for field, amount in contribution(old).items()})
+        if new:
+            _apply(new['fellow_id'], contribution(new))
+
+    # --- last_activity_date ---
+    if new and new['date']:
+        # Moves forward only: a conditional UPDATE, no read needed
+        Fellow.objects.filter(pk=new['fellow_id']).filter(
+            Q(last_activity_date__isnull=True) | Q(last_activity_date__lt=new['date'])
+        ).update(last_activity_date=new['date'])
+    if old and (new is None or old['fellow_id'] != new['fellow_id'] or new['date'] < old['date']):
+        # The newest activity may have gone (or moved back): look it up again
+        _refresh_last_activity_date(old['fellow_id'])
+
+    for fellow_id in {values['fellow_id'] for values in (old, new) if values}:
+        invalidate_fellow_fragments(fellow_id)
+
+
+def invalidate_fellow_fragments(fellow_id):
+    """Bumps the fellow's data version after commit, so no reader can re-cache old numbers."""
+    transaction.on_commit(lambda: bump_data_version(fellow_dataset(fellow_id)))
+
+
+# --- Reconciliation ---
+
+def expected_counters(fellow_ids=None):
+    """{fellow_id: {counter: value}} recomputed from the live and archived activities (one grouped query)."""
+    activities = TrainingActivityRecord.objects.all()
+    if fellow_ids is not None:
+        activities = activities.filter(fellow_id__in=fellow_ids)
+
+    approved = Q(status=TrainingActivity.Status.APPROVED)
+    rows = activities.values('fellow_id').annotate(
+        pending=Count('id', filter=Q(status=TrainingActivity.Status.PENDING)),
+        revision=Count('id', filter=Q(status=TrainingActivity.Status.REVISION)),
+        approved=Count('id', filter=approved),
+        farmers=Sum('number_of_farmers_trained', filter=approved),
+        duration=Sum('duration', filter=approved),
+        last_date=Max('date'),
+    ).order_by()
+
+    return {
+        row['fellow_id']: {
+            'pending_count': row['pending'],
+            'revision_count': row['revision'],
+            'approved_count': row['approved'],
+            'farmers_trained': row['farmers'] or 0,
+            'training_seconds': int(row['duration'].total_seconds()) if row['duration'] else 0,
+            'last_activity_date': row['last_date'],
+        }
+        for row in rows
+    }
+
+
+EMPTY_COUNTERS = {
+    'pending_count': 0, 'revision_count': 0, 'approved_count': 0,
+    'farmers_trained': 0, 'training_seconds': 0, 'last_activity_date': None,
+}
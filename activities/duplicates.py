@@ -0,0 +1,74 @@
+"""
+Duplicate-report detection: a normalized content fingerprint stored on every
+TrainingActivity and indexed (activity_fingerprint_idx).
+
+    fingerprint = BLAKE2b-128 of (fellow, date, normalized village, normalized topic, farmers)
+
+normalize() folds the differences seen when the same session is submitted twice
+(web form and app): case, accents, spaces and punctuation, doubled letters
+('Nyammata ' == 'nyamata', 'Crop-Rotation' == 'crop rotation'). Two reports with
+the same fingerprint are likely the same session.
+
+- TrainingActivity.save() recomputes the fingerprint (no query).
+- likely_duplicate_ids() / has_likely_duplicate() are single index lookups, used
+  on submission (web warning, `possible_duplicates` in the API create response)
+  and to flag rows of the mentor queues.
+- `python manage.py find_duplicate_reports` streams the whole table in
+  fingerprint order and reports the duplicate clusters.
+"""
+
+# activities/duplicates.py
+
+import hashlib
+import re
+import unicodedata
+
+from django.db.models import Exists, OuterRef
+
+# Fields the fingerprint is computed from (TrainingActivity.save() refreshes it when one changes)
+FINGERPRINT_FIELDS = ('fellow', 'date', 'village_name', 'training_topic', 'number_of_farmers_trained')
+
+REPEATED_CHARACTER = re.compile(r'(.)\1+')
+
+
+def normalize(text):
+    """Lower-case letters and digits only, accents stripped, repeated characters squeezed."""
+    text = unicodedata.normalize('NFKD', text or '')
+    # Combining accents, spaces and punctuation are not alphanumeric
+    text = ''.join(char for char in text if char.isalnum()).casefold()
+    return REPEATED_CHARACTER.sub(r'\1', text)
+
+
+def compute_fingerprint(fellow_id, date, village_name, training_topic, farmers):
+    key = '|'.join([
+        str(fellow_id), date.isoformat() if date else '', normalize(village_name),
+        normalize(training_topic), str(farmers or 0),
+    ])
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def activity_fingerprint(activity):
+    return compute_fingerprint(
+        activity.fellow_id, activity.date, activity.village_name,
+        activity.training_topic, activity.number_of_farmers_trained,
+    )
+
+
+def duplicates_of(activity):
+    """Other reports with the same fingerprint (one index lookup)."""
+    from .models import TrainingActivity
+
+    return TrainingActivity.objects.filter(fingerprint=activity.fingerprint).exclude(pk=activity.pk)
+
+
+def likely_duplicate_ids(activity):
+    return list(duplicates_of(activity).order_by('id').values_list('id', flat=True))
+
+
+def has_likely_duplicate():
+    """Annotation for queue querysets: True when another report shares the row's fingerprint."""
+    from .models import TrainingActivity
+
+    return Exists(
+        TrainingActivity.objects.filter(fingerprint=OuterRef('fingerprint')).exclude(pk=OuterRef('pk'))
+    )
@@ -0,0 +1,67 @@
+"""
+CSV export of training activities, shared by the download view
+(activities.views.export_activities_csv) and the background export task
+(activities.tasks.export_activities_csv), which writes the file to media storage.
+"""
+
+# activities/exports.py
+
+from .models import TrainingActivityRecord
+
+HEADER = [
+    'Fellow Name', 'Date', 'Topic', 'Province', 'District', 'Sector',
+    'Village', 'Farmers Trained', 'Duration', 'Status',
+    'Approved By (Name)', 'Approved By (Email)',
+    'Challenges', 'Success Stories', 'Mentor Comments'
+]
+
+
+def filtered_activities(search_query=None, district_id=None):
+    """Activities (live and archived) matching the Impact Summary filters, newest first."""
+    # select_related('approved_by') pulls the User object who reviewed the report
+    activities = TrainingActivityRecord.objects.all().select_related(
+        'fellow__user',
+        'sector__district__province',
+        'approved_by'
+    )
+    if search_query:
+        activities = activities.filter(training_topic__icontains=search_query)
+    if district_id:
+        activities = activities.filter(sector__district_id=district_id)
+    return activities.order_by('-date')
+
+
+def write_activities_csv(fileobj, activities):
+    """Writes the header and one row per activity; returns the number of rows."""
+    import csv  # lazy: only the (rare) export path needs it
+
+    writer = csv.writer(fileobj)
+    writer.writerow(HEADER)
+    rows = 0
+    for activity in activities.iterator(chunk_size=2000):
+        # Resolve village name based on approval status
+        village_display = activity.verified_village if activity.status == 'APPROVED' and activity.verified_village else activity.village_name
+
+        # Pull Mentor Details correctly
+        mentor_name = activity.approved_by.get_full_name() if activity.approved_by else "Pending"
+        mentor_email = activity.approved_by.email if activity.approved_by else "N/A"
+
+        writer.writerow([
+            activity.fellow.user.get_full_name(),
+            activity.date,
+            activity.training_topic,
+            activity.sector.district.province.name if activity.sector.district.province else "N/A",
+            activity.sector.district.name,
+            activity.sector.name,
+            village_display,
+            activity.number_of_farmers_trained,
+            activity.duration,
+            activity.get_status_display(),
+            mentor_name,
+            mentor_email,
+            activity.challenges_notes or "",
+            activity.success_stories or "",
+            activity.mentor_comments or ""
+        ])
+        rows += 1
+    return rows
@@ -0,0 +1,147 @@
+"""
+Sparse fieldsets (?fields=) and opt-in expansion (?expand=) for REST list/detail endpoints.
+
+    GET /api/activities/logs/?fields=id,date,training_topic,status
+    GET /api/fellows/?fields=id,full_name&expand=assigned_sector
+
+The resolved fieldset drives BOTH the JSON output and the SQL projection:
+each output field declares the columns (only()) and joins (select_related())
+it needs, so narrowing the fields also narrows the query.
+"""
+
+# activities/fieldsets.py
+
+from rest_framework.exceptions import ValidationError
+
+
+def parse_field_list(request, param):
+    """'a, b,,c' -> ['a', 'b', 'c']; None when the parameter is absent or empty."""
+    value = request.query_params.get(param) if request is not None else None
+    if not value:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class Fieldset:
+    """The output fields and expansions requested by one request."""
+
+    def __init__(self, fields, expand):
+        self.fields = fields          # ordered list of output field names
+        self.expand = expand          # set of expanded field names
+
+    def __contains__(self, name):
+        return name in self.fields
+
+    def is_expanded(self, name):
+        return name in self.expand
+
+
+def resolve_fieldset(request, default_fields, expandable_fields=(), extra_fields=()):
+    """
+    Builds the Fieldset for a request.
+    - default_fields: sent when ?fields= is absent.
+    - expandable_fields: names accepted by ?expand= (nested objects or opt-in columns).
+    - extra_fields: opt-in fields that are never sent unless asked for.
+    Unknown names are a 400, so typos don't silently return the full payload.
+    """
+    requested = parse_field_list(request, 'fields')
+    expand = parse_field_list(request, 'expand') or []
+
+    allowed = list(default_fields) + [name for name in extra_fields if name not in default_fields]
+
+    unknown = [name for name in expand if name not in expandable_fields]
+    if unknown:
+        raise ValidationError({'expand': f"Unknown expansion(s): {', '.join(unknown)}. "
+                                         f"Allowed: {', '.join(expandable_fields)}."})
+    if requested is not None:
+        unknown = [name for name in requested if name not in allowed]
+        if unknown:
+            raise ValidationError({'fields': f"Unknown field(s): {', '.join(unknown)}."})
+
+    wanted = set(requested if requested is not None else default_fields) | set(expand)
+    # Keep the declared order so the JSON shape is stable whatever the query string order
+    return Fieldset([name for name in allowed if name in wanted], set(expand))
+
+
+def project_queryset(queryset, fieldset, field_sources, always=('id',)):
+    """
+    Narrows a queryset to the columns/joins the fieldset needs.
+    field_sources maps an output field to {'only': [...], 'related': [...]};
+    an expanded field may declare its own sources under 'expanded'.
+    """
+    only = set(always)
+    related = set()
+    for name in fieldset.fields:
+        sources = field_sources.get(name, {})
+        if fieldset.is_expanded(name) and 'expanded' in sources:
+            sources = sources['expanded']
+        only.update(sources.get('only', ()))
+        related.update(sources.get('related', ()))
+
+    # Drop any select_related inherited from get_queryset: a join on a deferred
+    # relation is an error, and only the joins listed here are needed
+    queryset = queryset.select_related(None)
+    if related:
+        queryset = queryset.select_related(*sorted(related))
+    return queryset.only(*sorted(only))
+
+
+class FieldsetSerializerMixin:
+    """
+    ModelSerializer mixin: keeps only the fields of context['fieldset'] and swaps
+    expanded fields for the serializers declared in Meta.expanded_fields.
+    Without a fieldset in the context (writes, nested use) it behaves as before.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.context.get('fieldset')
+        if fieldset is None:
+            return fields
+
+        expanded = getattr(self.Meta, 'expanded_fields', {})
+        extra = getattr(self.Meta, 'extra_fields', {})
+        selected = {}
+        for name in fieldset.fields:
+            if fieldset.is_expanded(name) and name in expanded:
+                selected[name] = expanded[name]()
+            elif name in fields:
+                selected[name] = fields[name]
+            elif name in extra:
+                selected[name] = extra[name]()
+        return selected
+
+
+class FieldsetViewMixin:
+    """
+    ViewSet mixin: resolves ?fields=/?expand= once per request for list/retrieve,
+    projects the queryset and hands the fieldset to the serializer context.
+    Subclasses declare default_fields, expandable_fields, extra_fields and field_sources.
+    """
+    fieldset_actions = ('list', 'retrieve')
+    default_fields = ()
+    expandable_fields = ()
+    extra_fields = ()
+    field_sources = {}
+
+    def get_fieldset(self):
+        if self.action not in self.fieldset_actions:
+            return None
+        if not hasattr(self, '_fieldset'):
+            self._fieldset = resolve_fieldset(
+                self.request, self.default_fields, self.expandable_fields, self.extra_fields
+            )
+        return self._fieldset
+
+    def project(self, queryset):
+        fieldset = self.get_fieldset()
+        if fieldset is None:
+            return queryset
+        return project_queryset(queryset, fieldset, self.field_sources)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        fieldset = self.get_fieldset()
+        if fieldset is not None:
+            context['fieldset'] = fieldset
+        return context
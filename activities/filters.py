@@ -0,0 +1,123 @@
+"""
+Server-side filtering for /api/activities/logs/ (django-filter).
+
+Each filter maps onto an index of activities_trainingactivity, and no filter
+needs a sort step (checked with EXPLAIN QUERY PLAN on SQLite, see
+ActivityFilterTests.test_no_filter_sorts):
+
+    status            -> activity_status_date_id_idx  (status, -date, -id)
+    fellow            -> activity_fellow_date_id_idx  (fellow, -date, -id)
+    sector            -> activity_sector_date_id_idx  (sector, -date, -id)
+    date_from/date_to -> any of the above, or activity_date_idx (-date, -id)
+    training_method   -> activity_date_idx            a handful of values, each matching a large share
+    is_resubmitted    -> activity_date_idx            of the table: walking the date index fills a page
+                                                      sooner than a per-value index plus a sort would
+    district/province -> activity_date_idx            sector_id IN (...) from the cached location hierarchy
+    mentor            -> activity_date_idx            fellow_id IN (SELECT ... WHERE mentor_id = ?)
+
+An IN list of several sectors or fellows can't be read off a (column, -date)
+index in date order, so the planner would fetch every match and sort it. These
+three filters are therefore checked row by row while walking activity_date_idx
+(the column is wrapped in `+ 0` so the planner can't pick its index): a page
+stops after its rows, and the page count scans a narrow index without sorting.
+Combined with status, fellow or sector, that index is used instead.
+
+Sorting is limited to `date` (ascending or descending, ties broken by id), which
+the lookups above read straight off the index; any other ?ordering= is a 400.
+Id parameters must be whole numbers (?mentor=3.7 is a 400).
+"""
+
+# activities/filters.py
+
+import django_filters
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db.models import F
+
+from fellows.models import Fellow
+from locations.utils import get_sector_hierarchy
+from .models import TrainingActivity
+
+class IdFilter(django_filters.NumberFilter):
+    """A primary-key parameter: whole numbers only (NumberFilter would accept 3.7)."""
+    field_class = forms.IntegerField
+
+
+# Only one location level may be used at a time (they would narrow the same column)
+LOCATION_FILTERS = ('sector', 'district', 'province')
+
+
+class IndexedOrderingFilter(django_filters.OrderingFilter):
+    """?ordering=date|-date only (default -date), with a stable id tie-breaker for paging."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('fields', (('date', 'date'),))
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        ordering = [self.get_ordering_value(param) for param in value or []] or ['-date']
+        # Sorting on a second column would defeat the (…, -date) indexes
+        ordering = ordering[:1]
+        tiebreak = '-id' if ordering[0].startswith('-') else 'id'
+        return qs.order_by(*ordering, tiebreak)
+
+
+class TrainingActivityFilter(django_filters.FilterSet):
+    status = django_filters.ChoiceFilter(choices=TrainingActivity.Status.choices)
+    date_from = django_filters.DateFilter(field_name='date', lookup_expr='gte')
+    date_to = django_filters.DateFilter(field_name='date', lookup_expr='lte')
+    sector = IdFilter(field_name='sector_id')
+    district = IdFilter(method='filter_district')
+    province = IdFilter(method='filter_province')
+    training_method = django_filters.ChoiceFilter(choices=TrainingActivity.METHOD_CHOICES)
+    fellow = IdFilter(field_name='fellow_id')
+    mentor = IdFilter(method='filter_mentor')
+    is_resubmitted = django_filters.BooleanFilter()
+    ordering = IndexedOrderingFilter()
+
+    class Meta:
+        model = TrainingActivity
+        fields = []  # all filters are declared explicitly above
+
+    # --- Guards on combinations ---
+
+    def is_valid(self):
+        valid = super().is_valid()
+        if not valid:
+            return False
+
+        data = self.form.cleaned_data
+        used = [name for name in LOCATION_FILTERS if data.get(name) is not None]
+        if len(used) > 1:
+            self.form.add_error(None, ValidationError(
+                f"Use only one of {', '.join(LOCATION_FILTERS)} (got {', '.join(used)})."
+            ))
+        if data.get('date_from') and data.get('date_to') and data['date_from'] > data['date_to']:
+            self.form.add_error('date_to', ValidationError("date_to must be on or after date_from."))
+        return not self.form.errors
+
+    # --- Location & mentor filters, checked while walking the date index ---
+
+    @staticmethod
+    def _unindexed(queryset, column):
+        """`column + 0`: same values, but no index on `column` is used for the lookup."""
+        return queryset.alias(**{f'{column}_unindexed': F(column) + 0})
+
+    def _filter_sectors(self, queryset, key, value):
+        # The hierarchy is cached, so this costs no query (and no join at filter time)
+        sector_ids = [
+            sector_id for sector_id, entry in get_sector_hierarchy().items()
+            if entry[key] == value
+        ]
+        return self._unindexed(queryset, 'sector_id').filter(sector_id_unindexed__in=sector_ids)
+
+    def filter_district(self, queryset, name, value):
+        return self._filter_sectors(queryset, 'district_id', value)
+
+    def filter_province(self, queryset, name, value):
+        return self._filter_sectors(queryset, 'province_id', value)
+
+    def filter_mentor(self, queryset, name, value):
+        return self._unindexed(queryset, 'fellow_id').filter(
+            fellow_id_unindexed__in=Fellow.objects.filter(mentor_id=value).values('id')
+        )
@@ -1,5 +1,7 @@
 from django import forms
 from .models import TrainingActivity
+from .choices import CachedModelChoiceField, PrerenderedSelect, sector_options
+from locations.models import Sector
 from django.utils import timezone
 
 class ActivityReportForm(forms.ModelForm):
@@ -7,6 +9,12 @@ class ActivityReportForm(forms.ModelForm):
     Form for Fellows to submit and update their training activity reports.
     Validated against model constraints to ensure data integrity.
     """
+    # Options come from the cached sector list (activities/choices.py), not a table scan per render
+    sector = CachedModelChoiceField(
+        sector_options, queryset=Sector.objects.all(),
+        widget=PrerenderedSelect(attrs={'class': 'form-select'}),
+    )
+
     class Meta:
         model = TrainingActivity
         fields = [
@@ -26,9 +34,6 @@ class ActivityReportForm(forms.ModelForm):
             'date': forms.DateInput(
                 attrs={'type': 'date', 'class': 'form-control'}
             ),
-            'sector': forms.Select(
-                attrs={'class': 'form-select'}
-            ),
             'training_method': forms.Select(
                 attrs={'class': 'form-select'}
             ),
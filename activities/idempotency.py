@@ -0,0 +1,138 @@
+"""
+Idempotency-Key support for API writes (mobile clients retrying over flaky networks).
+
+A request carrying `Idempotency-Key: <client-generated id>` is executed at most once
+per (user, endpoint, key):
+
+    1. A stored, unexpired IdempotencyKey row for the key -> its response is replayed
+       (same status and body, plus `Idempotent-Replayed: true`); the write does not run.
+    2. Otherwise the write runs, and its response is INSERTed as the key's row in the
+       SAME transaction. Two concurrent duplicates both try that insert: the unique
+       constraint (idempotency_key_unique) lets one commit, the other one's
+       transaction - its duplicate activity included - rolls back, and it replays
+       the winner's response. No lock is taken before the write.
+
+The key is bound to the request payload (SHA-256): reusing it for a different
+payload answers 422. Errors (4xx/5xx) are not stored and roll the write back, so a
+corrected retry runs from scratch.
+Rows live IDEMPOTENCY_KEY_TTL_HOURS; expired ones are deleted by the hourly
+activities.tasks.prune_idempotency_keys task (or replaced when the key comes back).
+
+Usage:
+    @idempotent('activities:create')
+    def create(self, request, *args, **kwargs): ...
+"""
+
+# activities/idempotency.py
+
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def fingerprint(request):
+    """SHA-256 of method, path and parsed payload (uploaded files by name and size)."""
+    data = request.data
+    if hasattr(data, 'lists'):
+        # Form / multipart QueryDict
+        data = {
+            name: [f'file:{v.name}:{v.size}' if isinstance(v, UploadedFile) else v for v in values]
+            for name, values in data.lists()
+        }
+    payload = json.dumps([request.method, request.path, data], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _stored(lookup, now):
+    """The live row for a key; an expired one is deleted and treated as absent."""
+    record = IdempotencyKey.objects.filter(**lookup).first()
+    if record is not None and record.expires_at <= now:
+        IdempotencyKey.objects.filter(pk=record.pk, expires_at=record.expires_at).delete()
+        return None
+    return record
+
+
+def _replay(record, request_hash):
+    if record.request_hash != request_hash:
+        return Response(
+            {'detail': f'This {HEADER} was already used with a different request.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(record.response_body, status=record.status_code, headers={'Idempotent-Replayed': 'true'})
+
+
+def run_once(endpoint, key, request, write):
+    """Runs `write()` (returning a DRF Response) once per key, replaying its response afterwards."""
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise ValidationError({HEADER: f'Must be 1 to {MAX_KEY_LENGTH} characters.'})
+
+    now = timezone.now()
+    lookup = {'user_id': request.user.pk, 'endpoint': endpoint, 'key': key}
+    request_hash = fingerprint(request)
+
+    record = _stored(lookup, now)
+    if record is not None:
+        return _replay(record, request_hash)
+
+    try:
+        with transaction.atomic():
+            response = write()
+            if response.status_code >= 400:
+                # An error response is not stored; whatever the write did before it
+                # answered must not be committed either (a corrected retry runs again)
+                transaction.set_rollback(True)
+                return response
+            IdempotencyKey.objects.create(
+                **lookup,
+                request_hash=request_hash,
+                status_code=response.status_code,
+                response_body=response.data,
+                created_at=now,
+                expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+            )
+    except IntegrityError:
+        # A concurrent request with the same key committed first: our write rolled back
+        record = IdempotencyKey.objects.filter(**lookup).first()
+        if record is None:
+            raise
+        return _replay(record, request_hash)
+    return response
+
+
+def idempotent(endpoint):
+    """Decorator for DRF view methods; requests without the header run unchanged."""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            key = request.headers.get(HEADER)
+            if key is None:
+                return method(view, request, *args, **kwargs)
+            return run_once(endpoint, key, request, lambda: method(view, request, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def prune_expired(batch_size=1000):
+    """Deletes expired keys in primary-key batches; returns the number deleted."""
+    deleted = 0
+    while True:
+        ids = list(IdempotencyKey.objects.filter(
+            expires_at__lte=timezone.now()
+        ).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
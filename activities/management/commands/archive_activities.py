@@ -0,0 +1,56 @@
+"""
+Moves APPROVED reports of COMPLETED fellows dated before a cutoff from the live
+TrainingActivity table to the ArchivedTrainingActivity table (activities/archive.py),
+in batched transactions. Totals read through the union view do not change.
+
+The cutoff is ACTIVITY_ARCHIVE_AFTER_DAYS before today unless --older-than-days or
+--before is given. --dry-run prints what would move, per year.
+
+Usage:
+    python manage.py archive_activities --dry-run
+    python manage.py archive_activities --older-than-days 365 --batch-size 1000
+    python manage.py archive_activities --before 2024-01-01 --max-batches 10
+"""
+
+# activities/management/commands/archive_activities.py
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from activities.archive import archive, archivable_by_year, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = 'Archives approved reports of completed fellows older than the cutoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int,
+                            help='Cutoff in days before today (default: ACTIVITY_ARCHIVE_AFTER_DAYS).')
+        parser.add_argument('--before', help='Cutoff date (YYYY-MM-DD); overrides --older-than-days.')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Reports moved per transaction (default: 500).')
+        parser.add_argument('--max-batches', type=int,
+                            help='Stop after this many batches (default: until done).')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only print the reports that would move, per year.')
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                cutoff = date.fromisoformat(options['before'])
+            except ValueError:
+                raise CommandError('--before must be a date in YYYY-MM-DD format.')
+        else:
+            cutoff = archive_cutoff(options['older_than_days'])
+
+        if options['dry_run']:
+            years = archivable_by_year(cutoff)
+            self.stdout.write(self.style.MIGRATE_HEADING(f'Archivable reports dated before {cutoff}'))
+            for year, reports in years.items():
+                self.stdout.write(f'  {year}: {reports}')
+            self.stdout.write(f'  Total: {sum(years.values())}')
+            return
+
+        moved = archive(cutoff, batch_size=options['batch_size'], max_batches=options['max_batches'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} reports dated before {cutoff}.'))
@@ -0,0 +1,100 @@
+"""
+Checks that every admin changelist stays within its query budget.
+
+Each ModelAdmin declares `changelist_query_budget`: the most queries one
+changelist page may run, whatever the table size (annotated counts,
+list_select_related, estimated counts). This command renders every such
+changelist (and the change form of its first row) as a superuser, counts the
+queries and fails when a changelist goes over budget. Run it against a database
+with production-like volume.
+
+Each page is rendered twice and the second render is counted: the steady state,
+once cached choice lists (activities/choices.py) are warm.
+
+Everything runs inside a transaction that is rolled back: no data is kept.
+
+Usage:
+    python manage.py audit_admin_queries
+    python manage.py audit_admin_queries --verbose-queries
+"""
+
+# activities/management/commands/audit_admin_queries.py
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+class Rollback(Exception):
+    """Raised to discard the temporary superuser and session."""
+
+
+class Command(BaseCommand):
+    help = 'Renders each admin changelist and fails if it runs more queries than its budget.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-queries', action='store_true',
+                            help='Print the SQL of pages that go over budget.')
+
+    def handle(self, *args, **options):
+        self.failures = []
+        try:
+            with transaction.atomic():
+                # Same as the test runner: allow the test client's 'testserver' host
+                with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                    self.run(options)
+                raise Rollback()
+        except Rollback:
+            pass
+
+        if self.failures:
+            raise CommandError(f"Over budget: {', '.join(self.failures)}")
+        self.stdout.write(self.style.SUCCESS('All changelists are within their query budget.'))
+
+    def run(self, options):
+        user = User.objects.bulk_create([User(username='audit-admin-queries', is_staff=True, is_superuser=True)])[0]
+        client = Client()
+        client.force_login(User.objects.get(username='audit-admin-queries'))
+
+        self.stdout.write(self.style.NOTICE(
+            f"{'admin':<32} {'rows':>7} {'changelist':>11} {'budget':>7} {'change form':>12}"
+        ))
+        for model, model_admin in sorted(admin.site._registry.items(), key=lambda item: item[0]._meta.label):
+            budget = getattr(model_admin, 'changelist_query_budget', None)
+            if budget is None:
+                continue
+            opts = model._meta
+            changelist_url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+            changelist_queries = self.count_queries(client, changelist_url)
+
+            first = model_admin.get_queryset(None).order_by('pk').first() if model.objects.exists() else None
+            change_form_queries = None
+            if first is not None:
+                change_form_queries = self.count_queries(
+                    client, reverse(f'admin:{opts.app_label}_{opts.model_name}_change', args=[first.pk])
+                )
+
+            over = len(changelist_queries) > budget
+            line = (
+                f'{opts.label:<32} {model.objects.count():>7} {len(changelist_queries):>11} {budget:>7} '
+                f"{len(change_form_queries) if change_form_queries is not None else '-':>12}"
+            )
+            self.stdout.write(self.style.ERROR(line) if over else line)
+            if over:
+                self.failures.append(opts.label)
+                if options['verbose_queries']:
+                    for query in changelist_queries:
+                        self.stdout.write(f"    {query['sql']}")
+
+    def count_queries(self, client, url):
+        for _ in range(2):  # the first render fills the caches, the second is measured
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f'{url} returned HTTP {response.status_code}.')
+        return queries.captured_queries
@@ -0,0 +1,157 @@
+"""
+Cold-start audit: what a fresh worker imports, how long each module takes, and how
+long each boot phase takes.
+
+Boots the project in a clean child interpreter with `python -X importtime`, the
+same way a gunicorn worker does:
+    setup      django.setup() (settings, apps, models, signals)
+    wsgi       the WSGI handler and middleware chain
+    urlconf    the URL conf and every view module it imports
+    warm-up    (--warm-up) the pre-fork warm-up from gunicorn.conf.py
+and reports the phase times, the child's memory, the slowest modules (self time)
+and the boot cost of each top-level package (its imports plus the dependencies
+it was first to pull in).
+
+Usage:
+    python manage.py audit_imports
+    python manage.py audit_imports --top 40
+    python manage.py audit_imports --warm-up
+    python manage.py audit_imports --package rest_framework
+"""
+
+# activities/management/commands/audit_imports.py
+
+import json
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from bridge2Rwanda_fellowship_management_system.warmup import format_memory
+
+# Runs in the child interpreter; prints one JSON line on stdout
+BOOT_SCRIPT = """
+import json, time
+timings = {}
+started = time.perf_counter()
+import django
+django.setup()
+timings['setup'] = time.perf_counter() - started
+
+mark = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+timings['wsgi'] = time.perf_counter() - mark
+
+mark = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+timings['urlconf'] = time.perf_counter() - mark
+
+from bridge2Rwanda_fellowship_management_system.warmup import process_memory, warm_up
+warm_up_report = None
+if WARM_UP:
+    mark = time.perf_counter()
+    warm_up_report = warm_up()
+    timings['warm-up'] = time.perf_counter() - mark
+
+timings['total'] = time.perf_counter() - started
+print(json.dumps({'timings': timings, 'memory': process_memory(), 'warm_up': warm_up_report}))
+"""
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = 'Reports boot phase times, memory and per-module import times of a fresh worker.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=25,
+                            help='Modules / packages listed (default: 25).')
+        parser.add_argument('--warm-up', action='store_true',
+                            help='Also run and time the pre-fork warm-up.')
+        parser.add_argument('--package',
+                            help='Only list modules of this top-level package.')
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get(
+            'DJANGO_SETTINGS_MODULE', 'bridge2Rwanda_fellowship_management_system.settings'
+        )}
+        script = f"WARM_UP = {bool(options['warm_up'])}\n{BOOT_SCRIPT}"
+        child = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if child.returncode != 0:
+            raise CommandError(f'Boot failed:\n{child.stderr[-2000:]}')
+
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        modules = self.parse_importtime(child.stderr)
+
+        self.report_phases(result)
+        self.report_modules(modules, options)
+        if not options['package']:
+            self.report_packages(modules, options)
+
+    # --- Parsing ---
+
+    def parse_importtime(self, stderr):
+        """[(module, self_us, cumulative_us, depth)] in import order."""
+        modules = []
+        for line in stderr.splitlines():
+            match = IMPORT_LINE.match(line)
+            if match:
+                self_us, cumulative_us, indent, name = match.groups()
+                modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+        return modules
+
+    # --- Reporting ---
+
+    def report_phases(self, result):
+        self.stdout.write(self.style.MIGRATE_HEADING('Boot phases'))
+        for phase, seconds in result['timings'].items():
+            self.stdout.write(f'  {phase:<10} {seconds * 1000:>9.1f} ms')
+
+        self.stdout.write(f"  memory     {format_memory(result['memory'])}")
+        if result['warm_up']:
+            for step, values in result['warm_up'].items():
+                self.stdout.write(f'    warm-up {step}: {values}')
+
+    def report_modules(self, modules, options):
+        if options['package']:
+            modules = [m for m in modules if m[0].split('.')[0] == options['package']]
+        total_us = sum(m[1] for m in modules)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'\nSlowest modules by self time ({len(modules)} modules, {total_us / 1000:.1f} ms in total)'
+        ))
+        self.stdout.write(f"  {'self_ms':>8} {'cumul_ms':>9}  module")
+        for name, self_us, cumulative_us, _ in sorted(modules, key=lambda m: -m[1])[:options['top']]:
+            self.stdout.write(f'  {self_us / 1000:>8.1f} {cumulative_us / 1000:>9.1f}  {name}')
+
+    def report_packages(self, modules, options):
+        # What importing each package at boot really costs: the cumulative time of its
+        # modules imported directly by another package (or by the boot itself),
+        # i.e. the package plus every dependency it was first to pull in
+        packages = {}
+        parents = []  # import stack; importtime lists children before their parent
+        for name, self_us, cumulative_us, depth in reversed(modules):
+            del parents[depth:]
+            package = name.split('.')[0]
+            entry = packages.setdefault(package, {'self': 0, 'boot_cost': 0, 'modules': 0})
+            entry['self'] += self_us
+            entry['modules'] += 1
+            if not parents or parents[-1].split('.')[0] != package:
+                entry['boot_cost'] += cumulative_us
+            parents.append(name)
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nTop-level packages (by boot cost)'))
+        self.stdout.write(f"  {'self_ms':>8} {'cumul_ms':>9} {'modules':>8}  package")
+        ranked = sorted(packages.items(), key=lambda item: -item[1]['boot_cost'])
+        for package, entry in ranked[:options['top']]:
+            self.stdout.write(
+                f"  {entry['self'] / 1000:>8.1f} {entry['boot_cost'] / 1000:>9.1f} "
+                f"{entry['modules']:>8}  {package}"
+            )
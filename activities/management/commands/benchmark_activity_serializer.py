@@ -0,0 +1,126 @@
+"""
+Throughput benchmark for the activity list serializers.
+
+Compares, on the same rows:
+  - TrainingActivitySerializer(many=True) over select_related model instances
+  - TrainingActivityListReader (values() rows + DB-computed names)
+and reports rows/sec for each, plus whether both produce identical JSON.
+
+Benchmark rows are inserted inside a transaction that is rolled back: no data is kept.
+
+Usage:
+    python manage.py benchmark_activity_serializer
+    python manage.py benchmark_activity_serializer --rows 20000 --repeat 5
+"""
+
+# activities/management/commands/benchmark_activity_serializer.py
+
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from activities.models import TrainingActivity
+from activities.serializers import TrainingActivitySerializer, TrainingActivityListReader
+from fellows.models import Fellow
+from locations.models import Province, District, Sector
+
+
+class Rollback(Exception):
+    """Raised to discard all benchmark rows."""
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks rows/sec of the activity list serializer vs the values() fast path.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000,
+                            help='Activities serialized per run (default: 5000).')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Runs per serializer; the best run is reported.')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def insert_activities(self, count):
+        """Creates `count` activities for a throwaway fellow (bulk_create: no signals)."""
+        province = Province.objects.create(name='Benchmark Province')
+        district = District.objects.create(province=province, name='Benchmark District')
+        sector = Sector.objects.create(district=district, name='Benchmark Sector')
+        user = User.objects.bulk_create([
+            User(username='benchmark-fellow', first_name='Bench', last_name='Mark')
+        ])[0]
+        user = User.objects.get(username=user.username)
+        fellow = Fellow.objects.bulk_create([
+            Fellow(
+                user=user, university='Benchmark', degree_field='Agronomy',
+                graduation_year=2024, assigned_sector=sector,
+                fellowship_start_date=date(2024, 1, 1),
+            )
+        ])[0]
+        fellow = Fellow.objects.get(user=user)
+
+        today = date.today()
+        TrainingActivity.objects.bulk_create([
+            TrainingActivity(
+                fellow=fellow,
+                date=today - timedelta(days=random.randint(0, 365)),
+                sector=sector,
+                village_name=f'Village {i % 50}',
+                number_of_farmers_trained=random.randint(1, 80),
+                training_topic='Mulching',
+                training_method=TrainingActivity.METHOD_CHOICES[0][0],
+                duration=timedelta(minutes=random.randint(30, 240)),
+                challenges_notes='Long narrative ' * 50,
+                success_stories='Long narrative ' * 50,
+                status=random.choice(TrainingActivity.Status.values),
+            )
+            for i in range(count)
+        ], batch_size=1000)
+        return fellow
+
+    def best_rate(self, rows, repeat, serialize):
+        best = float('inf')
+        output = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = serialize()
+            best = min(best, time.perf_counter() - started)
+        return rows / max(best, 1e-9), output
+
+    def run(self, options):
+        fellow = self.insert_activities(options['rows'])
+        request = RequestFactory().get('/api/activities/logs/')
+        queryset = TrainingActivity.objects.filter(fellow=fellow).order_by('-date', 'id')
+        rows = options['rows']
+
+        # 1. Stock path: model instances + DRF field introspection
+        model_rate, model_data = self.best_rate(rows, options['repeat'], lambda: TrainingActivitySerializer(
+            queryset.select_related('fellow__user', 'sector__district'),
+            many=True, context={'request': request},
+        ).data)
+
+        # 2. Fast path: values() rows + row mapper
+        reader = TrainingActivityListReader(request)
+        fast_rate, fast_data = self.best_rate(
+            rows, options['repeat'], lambda: reader.serialize(reader.get_rows(queryset))
+        )
+
+        identical = [dict(item) for item in model_data] == fast_data
+        self.stdout.write(self.style.NOTICE(f"{'serializer':<28} {'rows/sec':>12}"))
+        self.stdout.write(f"{'TrainingActivitySerializer':<28} {model_rate:>12,.0f}")
+        self.stdout.write(f"{'TrainingActivityListReader':<28} {fast_rate:>12,.0f}")
+        style = self.style.SUCCESS if identical else self.style.ERROR
+        self.stdout.write(style(
+            f'{rows} rows, speedup {fast_rate / max(model_rate, 1e-9):.1f}x, '
+            f'identical output: {identical}'
+        ))
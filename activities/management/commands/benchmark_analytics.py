@@ -0,0 +1,236 @@
+"""
+Latency benchmark: sequential analytics (WSGI) vs concurrent-query analytics (ASGI).
+
+Fires the same number of requests, N at a time, at each pair of endpoints:
+    /activities/summary/                   vs  /activities/summary/async/
+    /api/activities/program-metrics/       vs  /api/activities/async/program-metrics/
+and reports mean / p50 / p95 latency and throughput.
+
+Two modes:
+  - in-process (default): the sync views go through the test client's WSGI-style
+    handler from N threads, the async views through Django's real ASGIHandler
+    (the one an ASGI server calls) from N concurrent tasks.
+  - live servers: --wsgi-url http://127.0.0.1:8000 --asgi-url http://127.0.0.1:8001
+    benchmarks real gunicorn / uvicorn processes over HTTP (JSON endpoints, JWT auth).
+
+A throwaway staff user is created for the run and deleted afterwards.
+The database must contain activities for the numbers to be meaningful.
+
+Usage:
+    python manage.py benchmark_analytics
+    python manage.py benchmark_analytics --db-latency-ms 3
+    python manage.py benchmark_analytics --requests 400 --concurrency 20
+"""
+
+# activities/management/commands/benchmark_analytics.py
+
+import asyncio
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.core.asgi import get_asgi_application
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+BENCHMARK_USERNAME = 'benchmark-analytics'
+
+# (label, sync path, async path)
+ENDPOINT_PAIRS = [
+    ('impact summary (HTML)', '/activities/summary/', '/activities/summary/async/'),
+    ('program metrics (JSON)', '/api/activities/program-metrics/', '/api/activities/async/program-metrics/'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compares latency of the sequential (WSGI) and concurrent-query (ASGI) analytics views.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Requests per endpoint (default: 200).')
+        parser.add_argument('--concurrency', type=int, default=10,
+                            help='Requests in flight at the same time (default: 10).')
+        parser.add_argument('--db-latency-ms', type=float, default=0.0,
+                            help='In-process mode: add this network round-trip to every query '
+                                 '(a local SQLite file answers in microseconds, a hosted '
+                                 'Postgres typically in 1-5 ms).')
+        parser.add_argument('--wsgi-url', help='Base URL of a running WSGI server (live mode).')
+        parser.add_argument('--asgi-url', help='Base URL of a running ASGI server (live mode).')
+
+    def handle(self, *args, **options):
+        if bool(options['wsgi_url']) != bool(options['asgi_url']):
+            raise CommandError('Live mode needs both --wsgi-url and --asgi-url.')
+
+        self.session_keys = []
+        # Committed (not rolled back): worker threads/servers use their own connections
+        User.objects.filter(username=BENCHMARK_USERNAME).delete()
+        user = User.objects.bulk_create([User(username=BENCHMARK_USERNAME, is_staff=True)])[0]
+        user = User.objects.get(username=BENCHMARK_USERNAME)
+        try:
+            self.stdout.write(self.style.NOTICE(
+                f"{'endpoint':<24} {'server':<6} {'mean_ms':>9} {'p50_ms':>9} {'p95_ms':>9} {'req/s':>8}"
+            ))
+            if options['wsgi_url']:
+                self.run_live(user, options)
+            else:
+                self.simulate_db_latency(options['db_latency_ms'])
+                # Same as the test runner: allow the test clients' 'testserver' host
+                with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                    self.run_in_process(user, options)
+        finally:
+            connection_created.disconnect(self.add_latency_wrapper)
+            Session.objects.filter(session_key__in=self.session_keys).delete()
+            user.delete()
+
+    # --- Simulated database round-trip ---
+
+    def simulate_db_latency(self, latency_ms):
+        if not latency_ms:
+            return
+        delay = latency_ms / 1000
+
+        def wait_then_execute(execute, sql, params, many, context):
+            time.sleep(delay)  # sleeping releases the GIL, like waiting on a socket
+            return execute(sql, params, many, context)
+
+        self.latency_wrapper = wait_then_execute
+        # Connections opened later by client/worker threads get the wrapper as well
+        connection_created.connect(self.add_latency_wrapper)
+        for conn in connections.all(initialized_only=True):
+            conn.execute_wrappers.append(wait_then_execute)
+
+    def add_latency_wrapper(self, sender, connection, **kwargs):
+        connection.execute_wrappers.append(self.latency_wrapper)
+
+    # --- Reporting ---
+
+    def report(self, label, server, latencies, elapsed):
+        latencies = sorted(latencies)
+        p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+        self.stdout.write(
+            f'{label:<24} {server:<6} {statistics.mean(latencies) * 1000:>9.1f} '
+            f'{statistics.median(latencies) * 1000:>9.1f} {p95 * 1000:>9.1f} '
+            f'{len(latencies) / elapsed:>8.1f}'
+        )
+
+    def check_status(self, path, status):
+        if status != 200:
+            raise CommandError(f'{path} returned HTTP {status}.')
+
+    # --- In-process: WSGI handler from threads, ASGI handler from tasks ---
+
+    def run_in_process(self, user, options):
+        login = Client()
+        login.force_login(user)
+        cookies = login.cookies
+        self.session_keys = [login.session.session_key]
+
+        for label, sync_path, async_path in ENDPOINT_PAIRS:
+            self.report(label, 'wsgi', *self.load_wsgi(sync_path, cookies, options))
+            self.report(label, 'asgi', *asyncio.run(self.load_asgi(async_path, cookies, options)))
+
+    def load_wsgi(self, path, cookies, options):
+        def worker(count):
+            client = Client()
+            client.cookies = cookies
+            latencies = []
+            for _ in range(count):
+                started = time.perf_counter()
+                response = client.get(path)
+                latencies.append(time.perf_counter() - started)
+                self.check_status(path, response.status_code)
+            return latencies
+
+        return self.run_threads(worker, options)
+
+    async def asgi_get(self, app, path, cookies):
+        """One GET through Django's real ASGIHandler (per-request thread-sensitive context)."""
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': b'', 'root_path': '', 'server': ('testserver', 80),
+            'client': ('127.0.0.1', 0),
+            'headers': [
+                (b'host', b'testserver'),
+                (b'cookie', '; '.join(f'{m.key}={m.coded_value}' for m in cookies.values()).encode()),
+            ],
+        }
+        sent = []
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await asyncio.Event().wait()  # client never disconnects
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+        return sent[0]['status']
+
+    async def load_asgi(self, path, cookies, options):
+        app = get_asgi_application()
+        self.check_status(path, await self.asgi_get(app, path, cookies))  # warm-up
+        latencies = []
+
+        async def worker(count):
+            for _ in range(count):
+                started = time.perf_counter()
+                status = await self.asgi_get(app, path, cookies)
+                latencies.append(time.perf_counter() - started)
+                self.check_status(path, status)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(count) for count in self.split(options)))
+        return latencies, time.perf_counter() - started
+
+    # --- Live servers over HTTP (JWT bearer token) ---
+
+    def run_live(self, user, options):
+        token = str(AccessToken.for_user(user))
+        label, sync_path, async_path = ENDPOINT_PAIRS[1]
+
+        for server, base_url, path in (
+            ('wsgi', options['wsgi_url'], sync_path),
+            ('asgi', options['asgi_url'], async_path),
+        ):
+            url = base_url.rstrip('/') + path
+
+            def worker(count, url=url):
+                latencies = []
+                for _ in range(count):
+                    request = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'})
+                    started = time.perf_counter()
+                    with urllib.request.urlopen(request) as response:
+                        response.read()
+                        self.check_status(url, response.status)
+                    latencies.append(time.perf_counter() - started)
+                return latencies
+
+            self.report(label, server, *self.run_threads(worker, options))
+
+    # --- Helpers ---
+
+    def split(self, options):
+        """Spreads --requests over --concurrency workers."""
+        workers = max(options['concurrency'], 1)
+        base, extra = divmod(options['requests'], workers)
+        return [base + (1 if index < extra else 0) for index in range(workers)]
+
+    def run_threads(self, worker, options):
+        worker(1)  # warm-up (URL resolving, template compilation, connections)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(worker, self.split(options)))
+        elapsed = time.perf_counter() - started
+        return [latency for latencies in results for latency in latencies], elapsed
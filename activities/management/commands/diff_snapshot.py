@@ -0,0 +1,54 @@
+"""
+Compares a frozen ReportSnapshot with the live data of its period
+(activities/snapshots.py): checks the stored document against its content hash,
+re-runs the aggregates and prints every value that changed since the freeze
+(edited, re-reviewed or late reports).
+
+--fail-on-change exits with an error when anything differs, for scheduled checks.
+
+Usage:
+    python manage.py diff_snapshot 2025-Q1
+    python manage.py diff_snapshot 2025-Q1 2025-Q2 --fail-on-change
+"""
+
+# activities/management/commands/diff_snapshot.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from activities.models import ReportSnapshot
+from activities.snapshots import diff, verify
+
+
+class Command(BaseCommand):
+    help = 'Lists the differences between frozen snapshots and the live data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('periods', nargs='+', help='Labels of frozen periods.')
+        parser.add_argument('--fail-on-change', action='store_true',
+                            help='Exit with an error if a snapshot differs from the live data.')
+
+    def handle(self, *args, **options):
+        changed = []
+        for label in options['periods']:
+            snapshot = ReportSnapshot.objects.filter(label=label).first()
+            if snapshot is None:
+                raise CommandError(f'No snapshot for period {label}.')
+
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{label} ({snapshot.period_start} to {snapshot.period_end}), frozen {snapshot.created_at:%Y-%m-%d}'
+            ))
+            if not verify(snapshot):
+                # The document was altered after the freeze (e.g. by hand in the database)
+                self.stdout.write(self.style.ERROR('  Stored document does not match its content hash.'))
+                changed.append(label)
+
+            changes = diff(snapshot)
+            for path, frozen, live in changes:
+                self.stdout.write(f'  {path}: {frozen} -> {live}')
+            if changes:
+                changed.append(label)
+            else:
+                self.stdout.write('  No differences.')
+
+        if changed and options['fail_on_change']:
+            raise CommandError(f"Changed since the freeze: {', '.join(sorted(set(changed)))}")
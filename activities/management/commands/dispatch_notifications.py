@@ -0,0 +1,56 @@
+"""
+Outbox dispatcher: sends queued notifications as one digest email per recipient.
+
+Each pass claims due messages in batches (activities/outbox.py), sends the digests
+over one EMAIL_BACKEND connection and records the outcome: SENT, retried later
+with exponential backoff, or FAILED after OUTBOX_MAX_ATTEMPTS. Without --once it
+keeps running and passes every --interval seconds, so reviews made between two
+passes reach the fellow in the same digest. Several dispatchers may run at once.
+(With a task worker running, the activities.tasks.dispatch_notifications schedule
+does the same every minute.)
+
+Usage:
+    python manage.py dispatch_notifications --once
+    python manage.py dispatch_notifications --interval 60
+    EMAIL_BACKEND=django.core.mail.backends.filebased.EmailBackend python manage.py dispatch_notifications --once
+"""
+
+# activities/management/commands/dispatch_notifications.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from activities.outbox import dispatch_due
+
+
+class Command(BaseCommand):
+    help = 'Sends pending outbox notifications as per-recipient digest emails.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Send what is due now, then exit.')
+        parser.add_argument('--interval', type=int, default=60,
+                            help='Seconds between passes when running continuously (default: 60).')
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Messages claimed per batch (default: 200).')
+        parser.add_argument('--lease', type=int, default=600,
+                            help='Seconds a claimed batch is reserved for this dispatcher (default: 600).')
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                totals = dispatch_due(options['batch_size'], options['lease'])
+                if any(totals.values()):
+                    self.stdout.write(
+                        f"{timezone.now():%Y-%m-%d %H:%M:%S} sent {totals['sent']}, "
+                        f"retry {totals['retry']}, failed {totals['failed']}"
+                    )
+                if options['once']:
+                    break
+                close_old_connections()
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Dispatcher stopped.')
@@ -0,0 +1,103 @@
+"""
+Reports clusters of likely duplicate training reports: reports sharing the same
+normalized fingerprint (fellow, date, village, topic, farmers; activities/duplicates.py).
+
+One streaming pass: the table is read in fingerprint order from the
+activity_fingerprint_idx index with a server-side iterator, and consecutive rows
+with the same fingerprint form a cluster, so memory stays at one chunk plus one
+cluster whatever the table size. The summary counts the farmers that approved
+duplicates add to the impact totals.
+
+--refresh first recomputes the stored fingerprints in primary-key batches (after
+a change to the normalization rules, or rows written with queryset.update()).
+
+Usage:
+    python manage.py find_duplicate_reports
+    python manage.py find_duplicate_reports --status PENDING --status APPROVED
+    python manage.py find_duplicate_reports --refresh --quiet
+"""
+
+# activities/management/commands/find_duplicate_reports.py
+
+from itertools import groupby
+
+from django.core.management.base import BaseCommand
+
+from activities.duplicates import activity_fingerprint
+from activities.models import TrainingActivity
+
+COLUMNS = ('fingerprint', 'id', 'fellow_id', 'date', 'status', 'village_name', 'training_topic',
+           'number_of_farmers_trained')
+
+
+class Command(BaseCommand):
+    help = 'Streams the training reports in fingerprint order and reports likely duplicate clusters.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--status', action='append', choices=TrainingActivity.Status.values,
+                            help='Only reports with this status (repeatable).')
+        parser.add_argument('--refresh', action='store_true',
+                            help='Recompute the stored fingerprints before scanning.')
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='Rows fetched per round trip (default: 2000).')
+        parser.add_argument('--quiet', action='store_true',
+                            help='Only print the summary.')
+
+    def handle(self, *args, **options):
+        if options['refresh']:
+            self.stdout.write(f"Fingerprints updated: {self.refresh(options['chunk_size'])}")
+
+        reports = TrainingActivity.objects.exclude(fingerprint='')
+        if options['status']:
+            reports = reports.filter(status__in=options['status'])
+        rows = reports.order_by('fingerprint', 'id').values_list(*COLUMNS).iterator(
+            chunk_size=options['chunk_size']
+        )
+
+        scanned = clusters = duplicates = inflated_farmers = 0
+        for fingerprint, group in groupby(rows, key=lambda row: row[0]):
+            group = list(group)
+            scanned += len(group)
+            if len(group) < 2:
+                continue
+            clusters += 1
+            duplicates += len(group) - 1
+            approved = [row for row in group if row[4] == TrainingActivity.Status.APPROVED]
+            # Every approved copy after the first counts its farmers again
+            inflated_farmers += sum(row[7] for row in approved[1:])
+            if not options['quiet']:
+                self.write_cluster(fingerprint, group)
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Summary'))
+        self.stdout.write(f'  Reports scanned:          {scanned}')
+        self.stdout.write(f'  Duplicate clusters:       {clusters}')
+        self.stdout.write(f'  Extra reports:            {duplicates}')
+        self.stdout.write(f'  Farmers double-counted:   {inflated_farmers} (approved duplicates)')
+
+    def write_cluster(self, fingerprint, group):
+        first = group[0]
+        self.stdout.write(f'{fingerprint[:12]}  fellow {first[2]}, {first[3]}, {first[7]} farmers')
+        for _, pk, _, _, status, village, topic, _ in group:
+            self.stdout.write(f'    #{pk:<8} {status:<9} {village} / {topic}')
+
+    def refresh(self, batch_size):
+        """Recomputes fingerprints in primary-key batches; returns the number changed."""
+        changed = 0
+        last_id = 0
+        while True:
+            batch = list(TrainingActivity.objects.filter(id__gt=last_id).order_by('id').only(
+                'id', 'fingerprint', 'fellow_id', 'date', 'village_name', 'training_topic',
+                'number_of_farmers_trained',
+            )[:batch_size])
+            if not batch:
+                return changed
+            stale = []
+            for activity in batch:
+                fingerprint = activity_fingerprint(activity)
+                if activity.fingerprint != fingerprint:
+                    activity.fingerprint = fingerprint
+                    stale.append(activity)
+            # bulk_update: no save() side effects (counters, review events)
+            TrainingActivity.objects.bulk_update(stale, ['fingerprint'])
+            changed += len(stale)
+            last_id = batch[-1].id
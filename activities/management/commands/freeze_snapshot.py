@@ -0,0 +1,43 @@
+"""
+Freezes the metrics of a closed reporting period into an immutable ReportSnapshot
+(activities/snapshots.py): reach per province, district and sector, topics,
+methods and the fellow leaderboard, with the SHA-256 of the document.
+
+Usage:
+    python manage.py freeze_snapshot 2025-Q1
+    python manage.py freeze_snapshot 2025-03 2025
+    python manage.py freeze_snapshot --previous-quarter
+"""
+
+# activities/management/commands/freeze_snapshot.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from activities.snapshots import freeze, previous_quarter
+
+
+class Command(BaseCommand):
+    help = 'Stores immutable metric snapshots of closed reporting periods.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('periods', nargs='*', help='Period labels: YYYY, YYYY-Qn or YYYY-MM.')
+        parser.add_argument('--previous-quarter', action='store_true',
+                            help='Also freeze the last quarter that has ended.')
+
+    def handle(self, *args, **options):
+        periods = list(options['periods'])
+        if options['previous_quarter']:
+            periods.append(previous_quarter())
+        if not periods:
+            raise CommandError('Give at least one period label or --previous-quarter.')
+
+        for label in periods:
+            try:
+                snapshot = freeze(label)
+            except ValueError as error:
+                raise CommandError(str(error))
+            totals = snapshot.data['totals']
+            self.stdout.write(self.style.SUCCESS(
+                f"Froze {label}: {totals['sessions']} sessions, {totals['farmers']} farmers "
+                f"(sha256 {snapshot.content_hash[:12]})"
+            ))
@@ -0,0 +1,76 @@
+"""
+Detects and repairs drift in the running review-latency totals (ReviewStats)
+by recomputing them from the append-only review event log.
+
+The totals are incremented with every logged transition (activities/reviews.py);
+drift can only come from writes that bypass them (queryset.update() on ReviewStats,
+raw SQL, restored backups). This is the one place that scans the whole log: one
+grouped aggregate query, then the drifted rows are fixed with bulk_update.
+
+Usage:
+    python manage.py rebuild_review_stats
+    python manage.py rebuild_review_stats --dry-run
+"""
+
+# activities/management/commands/rebuild_review_stats.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from activities.models import ReviewStats
+from activities.reviews import STAT_FIELDS, expected_stats
+
+FIELDS = (*STAT_FIELDS, 'last_event_at')
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the review-latency totals from the review event log and fixes any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report drift, change nothing.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            # Locking the rows makes concurrent transitions wait for the fix and
+            # then apply their F() increment on top of it, instead of being overwritten.
+            stored = ReviewStats.objects.all()
+            if not options['dry_run']:
+                stored = stored.select_for_update()
+            stored = {(stats.mentor_id, stats.district_id): stats for stats in stored}
+            expected = expected_stats()
+
+            to_fix, to_create = [], []
+            for pair, values in expected.items():
+                stats = stored.pop(pair, None)
+                if stats is None:
+                    self.stdout.write(f'Mentor {pair[0]}, district {pair[1]}: missing')
+                    to_create.append(ReviewStats(mentor_id=pair[0], district_id=pair[1], **values))
+                    continue
+                diff = {
+                    field: (getattr(stats, field), values[field])
+                    for field in FIELDS if getattr(stats, field) != values[field]
+                }
+                if not diff:
+                    continue
+                self.stdout.write(f'Mentor {pair[0]}, district {pair[1]}: ' + ', '.join(
+                    f'{field} {old} -> {new}' for field, (old, new) in diff.items()
+                ))
+                for field, (_, new) in diff.items():
+                    setattr(stats, field, new)
+                to_fix.append(stats)
+
+            # Rows without any logged event
+            for pair in stored:
+                self.stdout.write(f'Mentor {pair[0]}, district {pair[1]}: no events')
+
+            if not options['dry_run']:
+                ReviewStats.objects.bulk_create(to_create)
+                ReviewStats.objects.bulk_update(to_fix, FIELDS)
+                ReviewStats.objects.filter(pk__in=[stats.pk for stats in stored.values()]).delete()
+
+        drifted = len(to_fix) + len(to_create) + len(stored)
+        if options['dry_run']:
+            self.stdout.write(self.style.NOTICE(f'{drifted} of {len(expected)} review stats rows have drifted.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Checked {len(expected)} review stats rows, fixed {drifted}.'))
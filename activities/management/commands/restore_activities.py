@@ -0,0 +1,42 @@
+"""
+Moves archived training reports back to the live TrainingActivity table
+(activities/archive.py), e.g. when a completed fellow's report has to be reviewed
+again or a fellow is re-enrolled. Ids, statuses and review history are unchanged.
+
+Usage:
+    python manage.py restore_activities --fellow 12 --fellow 15
+    python manage.py restore_activities --ids 301 302 303
+    python manage.py restore_activities --all
+"""
+
+# activities/management/commands/restore_activities.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from activities.archive import restore
+from activities.models import ArchivedTrainingActivity
+
+
+class Command(BaseCommand):
+    help = 'Restores archived training reports to the live table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fellow', type=int, action='append',
+                            help='Restore the reports of this fellow id (repeatable).')
+        parser.add_argument('--ids', type=int, nargs='+', help='Restore these report ids.')
+        parser.add_argument('--all', action='store_true', help='Restore every archived report.')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Reports moved per transaction (default: 500).')
+
+    def handle(self, *args, **options):
+        if not (options['fellow'] or options['ids'] or options['all']):
+            raise CommandError('Give --fellow, --ids or --all.')
+
+        reports = ArchivedTrainingActivity.objects.all()
+        if options['fellow']:
+            reports = reports.filter(fellow_id__in=options['fellow'])
+        if options['ids']:
+            reports = reports.filter(id__in=options['ids'])
+
+        restored = restore(reports, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Restored {restored} reports.'))
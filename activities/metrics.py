@@ -0,0 +1,49 @@
+"""
+Tiny in-process metrics registry (per worker process).
+
+    metrics.observe('payload_bytes', 'trainingactivity-list full', 18234)
+    metrics.snapshot()  ->  {'payload_bytes': {'trainingactivity-list full': {...}}}
+
+Each (metric, key) keeps count / total / min / max / mean, which is enough to
+compare variants of the same endpoint without an external metrics stack.
+Exposed to staff at GET /api/activities/metrics/.
+"""
+
+# activities/metrics.py
+
+import threading
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, metric, key, value):
+        with self._lock:
+            series = self._series.setdefault(metric, {}).setdefault(
+                key, {'count': 0, 'total': 0, 'min': None, 'max': None}
+            )
+            series['count'] += 1
+            series['total'] += value
+            series['min'] = value if series['min'] is None else min(series['min'], value)
+            series['max'] = value if series['max'] is None else max(series['max'], value)
+
+    def snapshot(self, metric=None):
+        with self._lock:
+            names = [metric] if metric else list(self._series)
+            return {
+                name: {
+                    key: {**series, 'mean': round(series['total'] / series['count'], 2)}
+                    for key, series in self._series.get(name, {}).items()
+                }
+                for name in names
+            }
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+metrics = MetricsRegistry()
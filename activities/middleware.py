@@ -0,0 +1,44 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .metrics import metrics
+
+# Query parameters that change the shape of a REST payload (see activities/fieldsets.py)
+FIELDSET_PARAMS = ('fields', 'expand')
+
+
+class PayloadSizeMiddleware:
+    """
+    Records the size of every /api/ JSON response:
+    - adds an `X-Payload-Bytes` header to the response;
+    - aggregates sizes per view, split into 'full' vs 'sparse' (?fields=/?expand=)
+      so the savings of sparse fieldsets show up in the metrics snapshot.
+    Sync and async capable (ASGI).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.record(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.record(request, await self.get_response(request))
+
+    def record(self, request, response):
+        if not request.path.startswith('/api/') or response.streaming:
+            return response
+
+        size = len(response.content)
+        response['X-Payload-Bytes'] = str(size)
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else request.path
+        variant = 'sparse' if any(param in request.GET for param in FIELDSET_PARAMS) else 'full'
+        metrics.observe('payload_bytes', f'{view_name} {variant}', size)
+        return response
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0006_manual_fix_fields'),
+        ('fellows', '0003_fellow_mentor'),
+        ('locations', '0002_village'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trainingactivity',
+            index=models.Index(fields=['status', '-date'], name='activity_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainingactivity',
+            index=models.Index(fields=['fellow', '-date'], name='activity_fellow_date_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0007_trainingactivity_activity_status_date_idx_and_more'),
+        ('fellows', '0004_fellow_fellow_status_idx'),
+        ('locations', '0002_village'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trainingactivity',
+            index=models.Index(fields=['sector', '-date'], name='activity_sector_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainingactivity',
+            index=models.Index(fields=['training_method', '-date'], name='activity_method_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainingactivity',
+            index=models.Index(fields=['is_resubmitted', '-date'], name='activity_resubmit_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainingactivity',
+            index=models.Index(fields=['-date', '-id'], name='activity_date_idx'),
+        ),
+    ]
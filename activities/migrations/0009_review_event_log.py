@@ -0,0 +1,77 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:09
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_pending_since(apps, schema_editor):
+    """Reports already queued: their last change is the best known queue entry time."""
+    TrainingActivity = apps.get_model('activities', 'TrainingActivity')
+    TrainingActivity.objects.filter(status='PENDING').update(pending_since=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0008_api_filter_indexes'),
+        ('locations', '0002_village'),
+        ('mentors', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trainingactivity',
+            name='pending_since',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='ReviewEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('SUBMITTED', 'Submitted'), ('RESUBMITTED', 'Resubmitted'), ('APPROVED', 'Approved'), ('REVISION', 'Revision Requested')], max_length=20)),
+                ('from_status', models.CharField(blank=True, max_length=20)),
+                ('to_status', models.CharField(max_length=20)),
+                ('waited_seconds', models.PositiveIntegerField(blank=True, null=True)),
+                ('first_review', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('activity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_events', to='activities.trainingactivity')),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('district', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='locations.district')),
+                ('mentor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='mentors.mentor')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['activity', 'created_at'], name='review_event_activity_idx'), models.Index(fields=['-created_at', '-id'], name='review_event_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReviewStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('submitted', models.PositiveIntegerField(default=0)),
+                ('resubmitted', models.PositiveIntegerField(default=0)),
+                ('approved', models.PositiveIntegerField(default=0)),
+                ('revisions', models.PositiveIntegerField(default=0)),
+                ('reviews', models.PositiveIntegerField(default=0)),
+                ('review_wait_seconds', models.BigIntegerField(default=0)),
+                ('first_reviews', models.PositiveIntegerField(default=0)),
+                ('first_review_seconds', models.BigIntegerField(default=0)),
+                ('wait_under_1d', models.PositiveIntegerField(default=0)),
+                ('wait_1_to_3d', models.PositiveIntegerField(default=0)),
+                ('wait_3_to_7d', models.PositiveIntegerField(default=0)),
+                ('wait_over_7d', models.PositiveIntegerField(default=0)),
+                ('last_event_at', models.DateTimeField(blank=True, null=True)),
+                ('district', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_stats', to='locations.district')),
+                ('mentor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='review_stats', to='mentors.mentor')),
+            ],
+            options={
+                'verbose_name_plural': 'Review Stats',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('mentor__isnull', False)), fields=('mentor', 'district'), name='review_stats_mentor_district_uniq'), models.UniqueConstraint(condition=models.Q(('mentor__isnull', True)), fields=('district',), name='review_stats_unassigned_district_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_pending_since, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+from activities.duplicates import compute_fingerprint
+
+BATCH_SIZE = 1000
+
+
+def backfill_fingerprints(apps, schema_editor):
+    """Fingerprints for the existing reports, in primary-key batches."""
+    TrainingActivity = apps.get_model('activities', 'TrainingActivity')
+    last_id = 0
+    while True:
+        batch = list(TrainingActivity.objects.filter(id__gt=last_id).order_by('id').only(
+            'id', 'fellow_id', 'date', 'village_name', 'training_topic', 'number_of_farmers_trained',
+        )[:BATCH_SIZE])
+        if not batch:
+            return
+        for activity in batch:
+            activity.fingerprint = compute_fingerprint(
+                activity.fellow_id, activity.date, activity.village_name,
+                activity.training_topic, activity.number_of_farmers_trained,
+            )
+        TrainingActivity.objects.bulk_update(batch, ['fingerprint'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0011_idempotency_key'),
+        ('fellows', '0005_fellow_activity_counters'),
+        ('locations', '0002_village'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trainingactivity',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.AddIndex(
+            model_name='trainingactivity',
+            index=models.Index(fields=['fingerprint', 'id'], name='activity_fingerprint_idx'),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+    ]
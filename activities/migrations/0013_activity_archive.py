@@ -0,0 +1,101 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:27
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# Hot + cold union read by TrainingActivityRecord (activities/archive.py). A later
+# migration that changes either table drops the view first and recreates it last
+# with the then-current columns: SQLite table rebuilds and PostgreSQL column changes
+# fail while a view depends on the table.
+UNION_COLUMNS = (
+    'id, fellow_id, sector_id, approved_by_id, date, village_name, verified_village, '
+    'number_of_farmers_trained, training_topic, training_method, duration, challenges_notes, '
+    'success_stories, photos, status, is_resubmitted, pending_since, fingerprint, '
+    'mentor_comments, created_at, updated_at'
+)
+CREATE_UNION_VIEW = (
+    f'CREATE VIEW activities_trainingactivity_all AS '
+    f'SELECT {UNION_COLUMNS}, FALSE AS archived FROM activities_trainingactivity '
+    f'UNION ALL SELECT {UNION_COLUMNS}, TRUE AS archived FROM activities_archivedtrainingactivity'
+)
+DROP_UNION_VIEW = 'DROP VIEW IF EXISTS activities_trainingactivity_all'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0012_activity_fingerprint'),
+        ('fellows', '0005_fellow_activity_counters'),
+        ('locations', '0002_village'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrainingActivityRecord',
+            fields=[
+                ('date', models.DateField()),
+                ('village_name', models.CharField(max_length=100)),
+                ('verified_village', models.CharField(blank=True, max_length=100, null=True)),
+                ('number_of_farmers_trained', models.PositiveIntegerField()),
+                ('training_topic', models.CharField(max_length=255)),
+                ('training_method', models.CharField(choices=[('demonstration', 'Demonstration'), ('field_visit', 'Field Visit'), ('group_session', 'Group Session'), ('workshop', 'Workshop')], max_length=50)),
+                ('duration', models.DurationField()),
+                ('challenges_notes', models.TextField(blank=True, null=True)),
+                ('success_stories', models.TextField(blank=True, null=True)),
+                ('photos', models.ImageField(blank=True, null=True, upload_to='training_photos/')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending Review'), ('APPROVED', 'Approved'), ('REVISION', 'Needs Revision')], max_length=20)),
+                ('is_resubmitted', models.BooleanField(default=False)),
+                ('pending_since', models.DateTimeField(blank=True, null=True)),
+                ('fingerprint', models.CharField(blank=True, max_length=32)),
+                ('mentor_comments', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('archived', models.BooleanField()),
+            ],
+            options={
+                'db_table': 'activities_trainingactivity_all',
+                'managed': False,
+            },
+        ),
+        migrations.AlterField(
+            model_name='reviewevent',
+            name='activity',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='review_events', to='activities.trainingactivity'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedTrainingActivity',
+            fields=[
+                ('date', models.DateField()),
+                ('village_name', models.CharField(max_length=100)),
+                ('verified_village', models.CharField(blank=True, max_length=100, null=True)),
+                ('number_of_farmers_trained', models.PositiveIntegerField()),
+                ('training_topic', models.CharField(max_length=255)),
+                ('training_method', models.CharField(choices=[('demonstration', 'Demonstration'), ('field_visit', 'Field Visit'), ('group_session', 'Group Session'), ('workshop', 'Workshop')], max_length=50)),
+                ('duration', models.DurationField()),
+                ('challenges_notes', models.TextField(blank=True, null=True)),
+                ('success_stories', models.TextField(blank=True, null=True)),
+                ('photos', models.ImageField(blank=True, null=True, upload_to='training_photos/')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending Review'), ('APPROVED', 'Approved'), ('REVISION', 'Needs Revision')], max_length=20)),
+                ('is_resubmitted', models.BooleanField(default=False)),
+                ('pending_since', models.DateTimeField(blank=True, null=True)),
+                ('fingerprint', models.CharField(blank=True, max_length=32)),
+                ('mentor_comments', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('approved_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('fellow', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='fellows.fellow')),
+                ('sector', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='locations.sector')),
+            ],
+            options={
+                'verbose_name_plural': 'Archived Training Activities',
+                'indexes': [models.Index(fields=['date'], name='archive_date_idx'), models.Index(fields=['fellow', '-date'], name='archive_fellow_date_idx')],
+            },
+        ),
+        migrations.RunSQL(CREATE_UNION_VIEW, reverse_sql=DROP_UNION_VIEW),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0014_report_snapshot'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboxmessage',
+            name='kind',
+            field=models.CharField(choices=[('REPORT_APPROVED', 'Report Approved'), ('REPORT_REVISION', 'Revision Requested'), ('ACCOUNT_INVITE', 'Account Invitation')], max_length=30),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0015_outbox_account_invite'),
+    ]
+
+    operations = [
+        # The (column, -date, -id) replacements are built before the (column, -date)
+        # indexes they supersede are dropped, so the filters are never left unindexed
+        migrations.AddIndex(
+            model_name='trainingactivity',
+            index=models.Index(fields=['status', '-date', '-id'], name='activity_status_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainingactivity',
+            index=models.Index(fields=['fellow', '-date', '-id'], name='activity_fellow_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainingactivity',
+            index=models.Index(fields=['sector', '-date', '-id'], name='activity_sector_date_id_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='trainingactivity',
+            name='activity_status_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='trainingactivity',
+            name='activity_fellow_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='trainingactivity',
+            name='activity_sector_date_idx',
+        ),
+        # Unused: these filters walk activity_date_idx (see activities/filters.py)
+        migrations.RemoveIndex(
+            model_name='trainingactivity',
+            name='activity_method_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='trainingactivity',
+            name='activity_resubmit_date_idx',
+        ),
+    ]
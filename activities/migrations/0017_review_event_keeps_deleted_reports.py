@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0016_activity_filter_index_review'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reviewevent',
+            name='activity',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='review_events', to='activities.trainingactivity'),
+        ),
+    ]
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.conf import settings  # ADDED: To reference the User model
@@ -105,6 +106,12 @@ class TrainingActivity(models.Model):
     # Flag to track if the fellow updated an activity after a revision request
     is_resubmitted = models.BooleanField(default=False)
 
+    # When the report (re)entered the review queue; None unless PENDING (activities/reviews.py)
+    pending_since = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # Normalized content hash for duplicate detection (activities/duplicates.py), set by save()
+    fingerprint = models.CharField(max_length=32, blank=True, editable=False)
+
     # Mentor feedback field to help Fellows understand required updates
     mentor_comments = models.TextField(
         blank=True, 
@@ -119,7 +126,407 @@ class TrainingActivity(models.Model):
     class Meta:
         ordering = ['-date', 'sector__name']
         verbose_name_plural = "Training Activities"
+        indexes = [
+            # Each (column, -date, -id) index serves both the equality filter and the full
+            # ?ordering=-date sort with its id tie-breaker, so a page reads no more than its rows.
+            # Mentor queue and the ?status= filter
+            models.Index(fields=['status', '-date', '-id'], name='activity_status_date_id_idx'),
+            # Fellow history and ?fellow=
+            models.Index(fields=['fellow', '-date', '-id'], name='activity_fellow_date_id_idx'),
+            # ?sector=
+            models.Index(fields=['sector', '-date', '-id'], name='activity_sector_date_id_idx'),
+            # Unfiltered / date-range-only lists, the low-selectivity filters (?training_method=,
+            # ?is_resubmitted=) and the IN-list ones (?district=, ?province=, ?mentor=); see activities/filters.py
+            models.Index(fields=['-date', '-id'], name='activity_date_idx'),
+            # Duplicate-report lookups and the fingerprint-ordered scan
+            models.Index(fields=['fingerprint', 'id'], name='activity_fingerprint_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """
+        Saves and updates the fellow's denormalized counters in ONE transaction.
+        The previous row is locked (SELECT ... FOR UPDATE) so concurrent reviews
+        of the same report cannot both apply the same status transition.
+        Status transitions are appended to the review event log (activities/reviews.py).
+        The duplicate-detection fingerprint is recomputed (activities/duplicates.py).
+        """
+        from .counters import SOURCE_FIELDS, record_change, source_values
+        from .duplicates import FINGERPRINT_FIELDS, activity_fingerprint
+        from .reviews import REVIEW_FIELDS, record_transition, track_pending_since
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            update_fields = kwargs['update_fields'] = {*update_fields, 'pending_since'}
+        if update_fields is not None and not set(FINGERPRINT_FIELDS).isdisjoint(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'fingerprint'}
+        self.fingerprint = activity_fingerprint(self)
+
+        with transaction.atomic():
+            old = None
+            if self.pk is not None and not self._state.adding:
+                old = TrainingActivity.objects.select_for_update().filter(
+                    pk=self.pk
+                ).values(*SOURCE_FIELDS, *REVIEW_FIELDS).first()
+            now = timezone.now()
+            track_pending_since(self, old, now)
+            super().save(*args, **kwargs)
+            record_change(old, source_values(self))
+            record_transition(self, old, now)
 
     def __str__(self):
         # Utilizes the get_full_name property from the User model via Fellow
-        return f"Activity by {self.fellow.user.get_full_name()} on {self.date}"
\ No newline at end of file
+        return f"Activity by {self.fellow.user.get_full_name()} on {self.date}"
+
+
+class ReviewEvent(models.Model):
+    """
+    Append-only log of review transitions: one INSERT per submit, resubmit,
+    approval or revision request, never updated afterwards.
+    Written by TrainingActivity.save() (activities/reviews.py).
+    """
+
+    class Kind(models.TextChoices):
+        SUBMITTED = 'SUBMITTED', 'Submitted'
+        RESUBMITTED = 'RESUBMITTED', 'Resubmitted'
+        APPROVED = 'APPROVED', 'Approved'
+        REVISION = 'REVISION', 'Revision Requested'
+
+    # No database constraint and no cascade: the log keeps the events of archived
+    # reports (the archive keeps the report's id, see activities/archive.py) and of
+    # deleted ones, like the ReviewStats totals they were added to
+    activity = models.ForeignKey(
+        TrainingActivity,
+        on_delete=models.DO_NOTHING,
+        related_name='review_events',
+        db_constraint=False
+    )
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    # '' for a new report
+    from_status = models.CharField(max_length=20, blank=True)
+    to_status = models.CharField(max_length=20)
+
+    # Who made the change (the reviewer, or the fellow for (re)submissions), when known
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    # Aggregate dimensions, copied at event time: the fellow's assigned mentor and the district
+    mentor = models.ForeignKey(
+        'mentors.Mentor',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    district = models.ForeignKey(
+        'locations.District',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+
+    # Reviews only: seconds the report waited in the queue, and whether it was its first review
+    waited_seconds = models.PositiveIntegerField(null=True, blank=True)
+    first_review = models.BooleanField(default=False)
+
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            # One report's history, oldest first
+            models.Index(fields=['activity', 'created_at'], name='review_event_activity_idx'),
+            # Admin log, newest first
+            models.Index(fields=['-created_at', '-id'], name='review_event_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Review events are append-only.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.activity_id} at {self.created_at:%Y-%m-%d %H:%M}"
+
+
+class ReviewStats(models.Model):
+    """
+    Running review totals per (assigned mentor, district), incremented with F()
+    by every ReviewEvent; reports read these rows instead of the event history.
+    Rebuilt from the log by `python manage.py rebuild_review_stats`.
+    """
+    mentor = models.ForeignKey(
+        'mentors.Mentor',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='review_stats'
+    )
+    district = models.ForeignKey(
+        'locations.District',
+        on_delete=models.CASCADE,
+        related_name='review_stats'
+    )
+
+    # Transitions
+    submitted = models.PositiveIntegerField(default=0)
+    resubmitted = models.PositiveIntegerField(default=0)
+    approved = models.PositiveIntegerField(default=0)
+    revisions = models.PositiveIntegerField(default=0)
+
+    # Reviews of queued reports: count and total wait, first reviews separately
+    reviews = models.PositiveIntegerField(default=0)
+    review_wait_seconds = models.BigIntegerField(default=0)
+    first_reviews = models.PositiveIntegerField(default=0)
+    first_review_seconds = models.BigIntegerField(default=0)
+
+    # Histogram of review waits (see reviews.WAIT_BUCKETS)
+    wait_under_1d = models.PositiveIntegerField(default=0)
+    wait_1_to_3d = models.PositiveIntegerField(default=0)
+    wait_3_to_7d = models.PositiveIntegerField(default=0)
+    wait_over_7d = models.PositiveIntegerField(default=0)
+
+    last_event_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "Review Stats"
+        constraints = [
+            # One row per pair; reports of fellows without a mentor share one row per district
+            models.UniqueConstraint(
+                fields=['mentor', 'district'], condition=models.Q(mentor__isnull=False),
+                name='review_stats_mentor_district_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['district'], condition=models.Q(mentor__isnull=True),
+                name='review_stats_unassigned_district_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Review stats: mentor {self.mentor_id or '-'}, district {self.district_id}"
+
+
+class OutboxMessage(models.Model):
+    """
+    Transactional outbox: a notification is inserted in the same transaction as
+    the change it announces, so it exists if (and only if) the change commits.
+    Delivered later as per-recipient digests by `python manage.py dispatch_notifications`
+    (activities/outbox.py); the request path never talks to the mail server.
+    """
+
+    class Kind(models.TextChoices):
+        REPORT_APPROVED = 'REPORT_APPROVED', 'Report Approved'
+        REPORT_REVISION = 'REPORT_REVISION', 'Revision Requested'
+        # New account without a password (bulk onboarding): a set-password link
+        ACCOUNT_INVITE = 'ACCOUNT_INVITE', 'Account Invitation'
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        SENT = 'SENT', 'Sent'
+        FAILED = 'FAILED', 'Failed'
+
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='outbox_messages'
+    )
+    kind = models.CharField(max_length=30, choices=Kind.choices)
+    # Everything the digest needs, copied at write time (no joins when sending)
+    payload = models.JSONField(default=dict)
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Not picked up before this time: retry backoff, or a dispatcher's claim on it
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The dispatcher's scan: due PENDING messages, oldest first
+            models.Index(fields=['status', 'available_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} for user {self.recipient_id} ({self.get_status_display()})"
+
+
+class IdempotencyKey(models.Model):
+    """
+    Stored outcome of a write sent with an `Idempotency-Key` header (activities/idempotency.py).
+    A retry with the same key gets the stored response instead of running the write
+    again; the unique constraint settles concurrent duplicates. Kept until expires_at.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    # Keys are scoped per user and endpoint, e.g. 'activities:create'
+    endpoint = models.CharField(max_length=50)
+    key = models.CharField(max_length=255)
+    # SHA-256 of the request payload: the same key with another payload is refused
+    request_hash = models.CharField(max_length=64)
+
+    status_code = models.PositiveSmallIntegerField()
+    response_body = models.JSONField(encoder=DjangoJSONEncoder, null=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'endpoint', 'key'], name='idempotency_key_unique'),
+        ]
+        indexes = [
+            # Pruning of expired keys
+            models.Index(fields=['expires_at'], name='idempotency_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.endpoint} {self.key} (user {self.user_id})"
+
+
+# --- HOT / COLD ARCHIVE (activities/archive.py) ---
+
+class ActivityColumns(models.Model):
+    """
+    The TrainingActivity columns, shared by the archive table and the union view.
+    A column added to TrainingActivity must be added here too, and its migration
+    must drop and recreate the activities_trainingactivity_all view (see migration
+    0013 and activities/archive.py).
+    """
+    date = models.DateField()
+    village_name = models.CharField(max_length=100)
+    verified_village = models.CharField(max_length=100, blank=True, null=True)
+    number_of_farmers_trained = models.PositiveIntegerField()
+    training_topic = models.CharField(max_length=255)
+    training_method = models.CharField(max_length=50, choices=TrainingActivity.METHOD_CHOICES)
+    duration = models.DurationField()
+    challenges_notes = models.TextField(blank=True, null=True)
+    success_stories = models.TextField(blank=True, null=True)
+    photos = models.ImageField(upload_to='training_photos/', blank=True, null=True)
+    status = models.CharField(max_length=20, choices=TrainingActivity.Status.choices)
+    is_resubmitted = models.BooleanField(default=False)
+    pending_since = models.DateTimeField(null=True, blank=True)
+    fingerprint = models.CharField(max_length=32, blank=True)
+    mentor_comments = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        abstract = True
+
+
+class ArchivedTrainingActivity(ActivityColumns):
+    """
+    Cold storage: APPROVED reports of COMPLETED fellows past the archive cutoff,
+    moved out of TrainingActivity (same id) so live queries don't scan them.
+    Written and restored only by activities/archive.py.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    fellow = models.ForeignKey(Fellow, on_delete=models.CASCADE, related_name='+')
+    sector = models.ForeignKey(Sector, on_delete=models.PROTECT, related_name='+')
+    approved_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name_plural = "Archived Training Activities"
+        indexes = [
+            # Per-year reads and restores
+            models.Index(fields=['date'], name='archive_date_idx'),
+            # One fellow's history through the union view (newest first)
+            models.Index(fields=['fellow', '-date'], name='archive_fellow_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived activity {self.pk} ({self.date})"
+
+
+class TrainingActivityRecord(ActivityColumns):
+    """
+    Read-only union of live and archived reports (database view
+    activities_trainingactivity_all: UNION ALL of both tables). Analytics and
+    exports read this model, so archiving doesn't change any total.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    # DO_NOTHING: deletes are never cascaded into a view
+    fellow = models.ForeignKey(Fellow, on_delete=models.DO_NOTHING, related_name='activity_records')
+    sector = models.ForeignKey(Sector, on_delete=models.DO_NOTHING, related_name='+')
+    approved_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    archived = models.BooleanField()
+
+    class Meta:
+        managed = False
+        db_table = 'activities_trainingactivity_all'
+
+    def __str__(self):
+        return f"Activity {self.pk} ({self.date})"
+
+
+# --- REPORT SNAPSHOTS (activities/snapshots.py) ---
+
+class ReportSnapshotQuerySet(models.QuerySet):
+    """Refuses bulk UPDATEs (queryset.update(), bulk_update()), which bypass save()."""
+
+    def update(self, **kwargs):
+        raise ValueError("Report snapshots are immutable.")
+
+
+class ReportSnapshot(models.Model):
+    """
+    Frozen metrics of a closed reporting period ('2025-Q1', '2025-03', '2025'):
+    reach per province / district / sector, topics, methods and the fellow
+    leaderboard, stored as one JSON document with the SHA-256 of its canonical
+    form. Written once by `python manage.py freeze_snapshot`, never updated;
+    `python manage.py diff_snapshot` compares it with the live data.
+    """
+    label = models.CharField(max_length=10, unique=True)
+    # Inclusive bounds of the period
+    period_start = models.DateField()
+    period_end = models.DateField()
+
+    data = models.JSONField()
+    content_hash = models.CharField(max_length=64)
+    # Layout of `data` (snapshots.SCHEMA_VERSION when frozen)
+    schema_version = models.PositiveSmallIntegerField()
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = ReportSnapshotQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-period_start', 'label']
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Report snapshots are immutable.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"Snapshot {self.label} ({self.period_start} to {self.period_end})"
@@ -0,0 +1,205 @@
+"""
+Transactional outbox for fellow notifications, and the digest dispatcher.
+
+Writing (request path, ONE insert):
+    When a mentor approves or returns a report, activities/reviews.py calls
+    enqueue_review_notification() inside TrainingActivity.save()'s transaction.
+    A rolled-back review leaves no message; a committed one always has one.
+
+Sending (`python manage.py dispatch_notifications`, or the every-minute
+activities.tasks.dispatch_notifications task under run_task_worker):
+    1. claim_batch()   locks due PENDING messages (SKIP LOCKED where supported),
+                       pushes their available_at past a lease and commits, so
+                       concurrent dispatchers never take the same messages and a
+                       crashed one releases them when the lease ends;
+    2. send_digests()  groups them per recipient, sends ONE digest email each over
+                       a single backend connection (EMAIL_BACKEND: smtp, console,
+                       file or locmem), then marks them SENT, or schedules a retry
+                       after OUTBOX_RETRY_BASE_SECONDS x 1, 2, 4, ... (capped at
+                       OUTBOX_RETRY_MAX_SECONDS) until OUTBOX_MAX_ATTEMPTS, then FAILED.
+"""
+
+# activities/outbox.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from .models import OutboxMessage, TrainingActivity
+
+# Not worth retrying: the message is given up at once
+NO_EMAIL_ERROR = 'Recipient has no email address.'
+
+REVIEW_KINDS = {
+    TrainingActivity.Status.APPROVED: OutboxMessage.Kind.REPORT_APPROVED,
+    TrainingActivity.Status.REVISION: OutboxMessage.Kind.REPORT_REVISION,
+}
+
+
+# --- 1. WRITING ---
+
+def enqueue(recipient_id, kind, payload):
+    """Queues one message (a single INSERT); call it inside the change's transaction."""
+    return OutboxMessage.objects.create(recipient_id=recipient_id, kind=kind, payload=payload)
+
+
+def enqueue_review_notification(activity, recipient_id):
+    """Tells the fellow their report was approved or sent back for revision."""
+    actor = getattr(activity, 'review_actor', None)
+    return enqueue(recipient_id, REVIEW_KINDS[activity.status], {
+        'activity_id': activity.pk,
+        'training_topic': activity.training_topic,
+        'date': activity.date.isoformat(),
+        'mentor_comments': activity.mentor_comments or '',
+        'reviewed_by': actor.get_full_name() if actor is not None else '',
+    })
+
+
+def invite_message(user_id):
+    """Unsaved invitation for a new passwordless account (bulk_create it with the user rows)."""
+    return OutboxMessage(recipient_id=user_id, kind=OutboxMessage.Kind.ACCOUNT_INVITE, payload={})
+
+
+# --- 2. SENDING ---
+
+def retry_delay(attempts):
+    """Exponential backoff after the given number of failed attempts."""
+    delay = settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(delay, settings.OUTBOX_RETRY_MAX_SECONDS))
+
+
+def claim_batch(batch_size, lease_seconds, now=None):
+    """Claims up to batch_size due messages for this dispatcher and returns them."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        due = OutboxMessage.objects.filter(
+            status=OutboxMessage.Status.PENDING, available_at__lte=now
+        ).order_by('available_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        # (SQLite has no row locks: its writes are serialized, one dispatcher at a time)
+        messages = list(due[:batch_size])
+        OutboxMessage.objects.filter(pk__in=[message.pk for message in messages]).update(
+            available_at=now + timedelta(seconds=lease_seconds)
+        )
+    return messages
+
+
+def set_password_url(user):
+    """
+    Absolute one-time link to choose a password (Django's password-reset token).
+    Built at send time: the token is valid PASSWORD_RESET_TIMEOUT from the email,
+    and stops working once the password is set.
+    """
+    path = reverse('password_set', args=[
+        urlsafe_base64_encode(force_bytes(user.pk)), default_token_generator.make_token(user),
+    ])
+    return settings.SITE_URL.rstrip('/') + path
+
+
+def render_digest(user, messages):
+    """(subject, body) of one recipient's digest."""
+    invited = any(message.kind == OutboxMessage.Kind.ACCOUNT_INVITE for message in messages)
+    items = [
+        {'kind': message.kind, 'label': message.get_kind_display(), **message.payload}
+        for message in messages if message.kind != OutboxMessage.Kind.ACCOUNT_INVITE
+    ]
+    count = len(items)
+    if invited and not items:
+        subject = "B2R Fellowship: your account is ready"
+    else:
+        subject = f"B2R Fellowship: {count} report update{'s' if count != 1 else ''}"
+    body = render_to_string('activities/emails/review_digest.txt', {
+        'user': user,
+        'items': items,
+        'set_password_url': set_password_url(user) if invited else '',
+    })
+    return subject, body
+
+
+def send_digests(messages, now=None):
+    """
+    Sends one digest per recipient and records the outcome of every message.
+    Returns {'sent': messages sent, 'retry': messages rescheduled, 'failed': given up}.
+    """
+    now = now or timezone.now()
+    by_recipient = {}
+    for message in messages:
+        by_recipient.setdefault(message.recipient_id, []).append(message)
+    # password and last_login feed the set-password token of invitations
+    users = User.objects.only(
+        'id', 'email', 'first_name', 'last_name', 'password', 'last_login',
+    ).in_bulk(by_recipient)
+
+    sent, failed = [], []  # failed: (message, error)
+    backend = get_connection(fail_silently=False)
+    try:
+        backend.open()
+    except Exception as exc:
+        # Mail server unreachable: the whole batch is retried later
+        failed = [(message, f'{type(exc).__name__}: {exc}') for message in messages]
+    else:
+        try:
+            for recipient_id, items in by_recipient.items():
+                user = users.get(recipient_id)
+                if user is None or not user.email:
+                    failed.extend((message, NO_EMAIL_ERROR) for message in items)
+                    continue
+                subject, body = render_digest(user, items)
+                try:
+                    EmailMessage(subject, body, to=[user.email], connection=backend).send()
+                except Exception as exc:
+                    failed.extend((message, f'{type(exc).__name__}: {exc}') for message in items)
+                else:
+                    sent.extend(items)
+        finally:
+            backend.close()
+
+    return _record_outcomes(sent, failed, now)
+
+
+def _record_outcomes(sent, failed, now):
+    retry, given_up = [], []
+    for message, error in failed:
+        message.attempts += 1
+        message.last_error = error[:1000]
+        if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS or error == NO_EMAIL_ERROR:
+            message.status = OutboxMessage.Status.FAILED
+            given_up.append(message)
+        else:
+            message.available_at = now + retry_delay(message.attempts)
+            retry.append(message)
+
+    with transaction.atomic():
+        if sent:
+            OutboxMessage.objects.filter(pk__in=[message.pk for message in sent]).update(
+                status=OutboxMessage.Status.SENT, sent_at=now, last_error='',
+            )
+        if failed:
+            OutboxMessage.objects.bulk_update(
+                retry + given_up, ['attempts', 'last_error', 'status', 'available_at']
+            )
+    return {'sent': len(sent), 'retry': len(retry), 'failed': len(given_up)}
+
+
+def dispatch_due(batch_size=200, lease_seconds=600):
+    """Drains everything due now, one claimed batch at a time; returns the summed outcomes."""
+    totals = {'sent': 0, 'retry': 0, 'failed': 0}
+    while True:
+        now = timezone.now()
+        messages = claim_batch(batch_size, lease_seconds, now)
+        if not messages:
+            return totals
+        for key, count in send_digests(messages, now).items():
+            totals[key] += count
+        if len(messages) < batch_size:
+            return totals
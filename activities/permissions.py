@@ -1,4 +1,5 @@
 from rest_framework import permissions
+from accounts.roles import get_user_role
 
 class IsOwnerOrMentor(permissions.BasePermission):
     """
@@ -13,7 +14,7 @@ class IsOwnerOrMentor(permissions.BasePermission):
             return request.user.is_authenticated
 
         # 2. Prevent 'VIEWER' role from any write operations (POST, PUT, DELETE)
-        if hasattr(request.user, 'userprofile') and request.user.userprofile.role == 'VIEWER':
+        if get_user_role(request.user).is_viewer:
             return False
 
         return request.user.is_authenticated
@@ -23,9 +24,18 @@ class IsOwnerOrMentor(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
 
+        role = get_user_role(request.user)
+
         # Mentors/Staff/Superusers can edit/delete anything
-        if request.user.is_staff or request.user.is_superuser or hasattr(request.user, 'mentor'):
+        if role.is_staff or role.is_superuser or role.mentor_id is not None:
             return True
 
         # Fellows can only edit/delete their own training logs
-        return obj.fellow.user == request.user
\ No newline at end of file
+        return role.fellow_id is not None and obj.fellow_id == role.fellow_id
+
+
+class IsReviewer(permissions.BasePermission):
+    """Mentors, Coordinators and Staff: the users who review reports (UserRole.is_mentor)."""
+
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and get_user_role(request.user).is_mentor
@@ -0,0 +1,324 @@
+"""
+Append-only review event log and incrementally maintained review-latency totals.
+
+TrainingActivity.save() already locks and reads the previous row; from the old and
+new status it derives at most ONE transition per save:
+
+    new report (PENDING)          SUBMITTED
+    REVISION/APPROVED -> PENDING  RESUBMITTED
+    * -> APPROVED                 APPROVED
+    * -> REVISION                 REVISION
+
+and writes it with one INSERT into ReviewEvent plus one F() UPDATE of the matching
+ReviewStats row (assigned mentor x district). Approvals and revision requests also
+queue a notification for the fellow in the outbox (activities/outbox.py). Reviews of a queued report also record
+how long it waited (now - pending_since) and whether it was its first review, which
+feed the wait totals and the wait histogram. Reports only read ReviewStats rows and
+the current pending queue, never the event history:
+
+    latency_report('mentor')     per mentor: time to first review, average wait,
+    latency_report('district')   revision cycles, wait histogram, pending-age histogram
+
+The views that change a status set `activity.review_actor = request.user` before
+saving, so the event records who made the change.
+Writes that bypass save() (queryset.update(), raw SQL) log no event;
+`python manage.py rebuild_review_stats` recomputes the totals from the log.
+"""
+
+# activities/reviews.py
+
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.utils import timezone
+
+from fellows.models import Fellow
+from locations.models import Sector
+from locations.utils import get_sector_hierarchy
+from mentors.models import Mentor
+from .models import ReviewEvent, ReviewStats, TrainingActivity
+from .outbox import enqueue_review_notification
+
+# Extra previous-row columns read (under lock) by TrainingActivity.save()
+REVIEW_FIELDS = ('is_resubmitted', 'pending_since')
+
+Status = TrainingActivity.Status
+Kind = ReviewEvent.Kind
+
+# Histogram buckets: (ReviewStats field, upper bound in days; None = no bound)
+WAIT_BUCKETS = (
+    ('wait_under_1d', 1),
+    ('wait_1_to_3d', 3),
+    ('wait_3_to_7d', 7),
+    ('wait_over_7d', None),
+)
+
+KIND_COUNTERS = {
+    Kind.SUBMITTED: 'submitted',
+    Kind.RESUBMITTED: 'resubmitted',
+    Kind.APPROVED: 'approved',
+    Kind.REVISION: 'revisions',
+}
+
+STAT_FIELDS = (
+    'submitted', 'resubmitted', 'approved', 'revisions',
+    'reviews', 'review_wait_seconds', 'first_reviews', 'first_review_seconds',
+    *(field for field, _ in WAIT_BUCKETS),
+)
+
+
+# --- 1. RECORDING TRANSITIONS ---
+
+def classify(old, new_status):
+    """The event kind of a save, or None when the status did not change."""
+    old_status = old['status'] if old else None
+    if old_status == new_status:
+        return None
+    if new_status == Status.PENDING:
+        return Kind.SUBMITTED if old is None else Kind.RESUBMITTED
+    if new_status == Status.APPROVED:
+        return Kind.APPROVED
+    if new_status == Status.REVISION:
+        return Kind.REVISION
+    return None
+
+
+def track_pending_since(activity, old, now):
+    """Sets pending_since on the instance before it is written (no extra UPDATE)."""
+    if activity.status != Status.PENDING:
+        activity.pending_since = None
+    elif old is None or old['status'] != Status.PENDING:
+        activity.pending_since = now
+    else:
+        # Still queued: keep the locked row's value, not a possibly stale instance's
+        activity.pending_since = old['pending_since']
+
+
+def wait_bucket(seconds):
+    for field, days in WAIT_BUCKETS:
+        if days is None or seconds < days * 86400:
+            return field
+
+
+def _dimensions(activity):
+    """
+    (assigned mentor id, district id, fellow's user id) of an activity,
+    from loaded objects or caches when possible.
+    """
+    if TrainingActivity.fellow.is_cached(activity):
+        mentor_id, user_id = activity.fellow.mentor_id, activity.fellow.user_id
+    else:
+        mentor_id, user_id = Fellow.objects.filter(pk=activity.fellow_id).values_list('mentor_id', 'user_id').first()
+
+    sector = get_sector_hierarchy().get(activity.sector_id)
+    if sector is not None:
+        district_id = sector['district_id']
+    else:
+        district_id = Sector.objects.filter(pk=activity.sector_id).values_list('district_id', flat=True).first()
+    return mentor_id, district_id, user_id
+
+
+def record_transition(activity, old, now):
+    """Appends the save's transition (if any) to the log and the running totals."""
+    kind = classify(old, activity.status)
+    if kind is None:
+        return None
+
+    waited_seconds, first_review = None, False
+    if kind in (Kind.APPROVED, Kind.REVISION) and old and old['status'] == Status.PENDING:
+        if old['pending_since'] is not None:
+            waited_seconds = max(0, int((now - old['pending_since']).total_seconds()))
+        first_review = not old['is_resubmitted']
+
+    actor = getattr(activity, 'review_actor', None)
+    actor_id = getattr(actor, 'pk', None)
+    if actor_id is None and kind == Kind.APPROVED:
+        actor_id = activity.approved_by_id
+
+    mentor_id, district_id, fellow_user_id = _dimensions(activity)
+    event = ReviewEvent.objects.create(
+        activity_id=activity.pk,
+        kind=kind,
+        from_status=old['status'] if old else '',
+        to_status=activity.status,
+        actor_id=actor_id,
+        mentor_id=mentor_id,
+        district_id=district_id,
+        waited_seconds=waited_seconds,
+        first_review=first_review,
+        created_at=now,
+    )
+    if district_id is not None:
+        _apply(event)
+    if old is not None and kind in (Kind.APPROVED, Kind.REVISION):
+        # Same transaction: the fellow is told if (and only if) the review commits
+        enqueue_review_notification(activity, fellow_user_id)
+    return event
+
+
+def _apply(event):
+    changes = {KIND_COUNTERS[event.kind]: F(KIND_COUNTERS[event.kind]) + 1, 'last_event_at': event.created_at}
+    if event.waited_seconds is not None:
+        bucket = wait_bucket(event.waited_seconds)
+        changes.update({
+            'reviews': F('reviews') + 1,
+            'review_wait_seconds': F('review_wait_seconds') + event.waited_seconds,
+            bucket: F(bucket) + 1,
+        })
+        if event.first_review:
+            changes['first_reviews'] = F('first_reviews') + 1
+            changes['first_review_seconds'] = F('first_review_seconds') + event.waited_seconds
+
+    stats = ReviewStats.objects.filter(mentor_id=event.mentor_id, district_id=event.district_id)
+    if not stats.update(**changes):
+        # First event of this pair; the partial unique constraints settle concurrent creates
+        try:
+            with transaction.atomic():
+                ReviewStats.objects.create(mentor_id=event.mentor_id, district_id=event.district_id)
+        except IntegrityError:
+            pass
+        stats.update(**changes)
+
+
+# --- 2. REPORTING ---
+
+GROUPINGS = {
+    # by: (ReviewStats key, pending-queue key)
+    'mentor': ('mentor_id', 'fellow__mentor_id'),
+    'district': ('district_id', 'sector__district_id'),
+}
+
+
+def _hours(seconds, count):
+    return round(seconds / count / 3600, 1) if count else None
+
+
+def _labels(by, ids):
+    """{id: name} for the report rows (districts come from the cached hierarchy)."""
+    if by == 'district':
+        return {entry['district_id']: entry['district'] for entry in get_sector_hierarchy().values()}
+    rows = Mentor.objects.filter(pk__in=[pk for pk in ids if pk is not None]).values_list(
+        'id', 'user__first_name', 'user__last_name'
+    )
+    return {pk: f'{first_name} {last_name}'.strip() for pk, first_name, last_name in rows}
+
+
+def pending_age_histogram(by='mentor', now=None):
+    """{key: {bucket: count}} of the reports waiting now (one grouped query over the queue)."""
+    now = now or timezone.now()
+    buckets, lower = {}, None
+    for field, days in WAIT_BUCKETS:
+        # Oldest first: pending_since at or before the bucket's lower age bound
+        condition = Q(pending_since__gt=now - timedelta(days=days)) if days is not None else Q()
+        if lower is not None:
+            condition &= Q(pending_since__lte=now - timedelta(days=lower))
+        if days is None:
+            # Reports queued before the log existed have no pending_since: count them as old
+            condition |= Q(pending_since__isnull=True)
+        buckets[field.replace('wait_', 'pending_')] = Count('id', filter=condition)
+        lower = days
+
+    rows = TrainingActivity.objects.filter(status=Status.PENDING).values(
+        key=F(GROUPINGS[by][1])
+    ).annotate(**buckets).order_by()
+    return {row.pop('key'): row for row in rows}
+
+
+def latency_report(by='mentor'):
+    """
+    Review latency per mentor or per district, summed over the ReviewStats rows
+    plus the pending queue's age histogram. Hours are averages (None when no data).
+    """
+    key = GROUPINGS[by][0]
+    totals = {
+        row.pop('key'): row
+        for row in ReviewStats.objects.values(key=F(key)).annotate(
+            **{f'total_{field}': Sum(field) for field in STAT_FIELDS}
+        ).order_by()
+    }
+    pending = pending_age_histogram(by)
+    labels = _labels(by, set(totals) | set(pending))
+
+    report = []
+    for pk in sorted(set(totals) | set(pending), key=lambda pk: (pk is None, labels.get(pk, ''))):
+        stats = {field: (totals.get(pk) or {}).get(f'total_{field}') or 0 for field in STAT_FIELDS}
+        ages = pending.get(pk, {})
+        report.append({
+            key: pk,
+            'name': labels.get(pk) or ('Unassigned' if pk is None else ''),
+            **{field: stats[field] for field in ('submitted', 'resubmitted', 'approved', 'revisions', 'reviews')},
+            'avg_hours_to_first_review': _hours(stats['first_review_seconds'], stats['first_reviews']),
+            'avg_review_wait_hours': _hours(stats['review_wait_seconds'], stats['reviews']),
+            # Revision requests per approved report
+            'revision_cycles_per_report': round(stats['revisions'] / stats['approved'], 2) if stats['approved'] else None,
+            'wait_histogram': {field: stats[field] for field, _ in WAIT_BUCKETS},
+            'pending': sum(ages.values()),
+            'pending_age_histogram': ages,
+        })
+    return report
+
+
+# --- 3. REBUILD ---
+
+def expected_stats():
+    """{(mentor_id, district_id): {field: value}} recomputed from the whole event log (one grouped query)."""
+    reviewed = Q(waited_seconds__isnull=False)
+    aggregates = {
+        counter: Count('id', filter=Q(kind=kind)) for kind, counter in KIND_COUNTERS.items()
+    }
+    aggregates.update({
+        'reviews': Count('id', filter=reviewed),
+        'review_wait_seconds': Sum('waited_seconds', filter=reviewed),
+        'first_reviews': Count('id', filter=reviewed & Q(first_review=True)),
+        'first_review_seconds': Sum('waited_seconds', filter=reviewed & Q(first_review=True)),
+        'last_event_at': Max('created_at'),
+    })
+    lower = 0
+    for field, days in WAIT_BUCKETS:
+        condition = Q(waited_seconds__gte=lower * 86400)
+        if days is not None:
+            condition &= Q(waited_seconds__lt=days * 86400)
+        aggregates[field] = Count('id', filter=condition)
+        lower = days
+
+    rows = ReviewEvent.objects.filter(district__isnull=False).values(
+        'mentor_id', 'district_id'
+    ).annotate(**aggregates).order_by()
+    return {
+        # Sum() of no reviews is None; every group has a last_event_at
+        (row.pop('mentor_id'), row.pop('district_id')): {field: value or 0 for field, value in row.items()}
+        for row in rows
+    }
+
+
+# --- 4. BULK REVIEW ---
+
+def review_pending(activity_ids, new_status, reviewer, comments=''):
+    """
+    Approves or returns the PENDING reports among activity_ids (API bulk review), with the
+    same changes as the single review page; each save logs its own event. Returns the ids
+    reviewed; reports no longer pending are left alone.
+
+    The pending rows are locked (SELECT ... FOR UPDATE, in id order so overlapping bulk
+    reviews cannot deadlock) before anything is changed. A concurrent review of the same
+    report waits for this one to commit and then no longer finds it PENDING, so each
+    report gets exactly one review event and one ReviewStats increment.
+    """
+    reviewed = []
+    with transaction.atomic():
+        pending = TrainingActivity.objects.select_for_update(of=('self',)).filter(
+            pk__in=activity_ids, status=Status.PENDING,
+        ).order_by('pk')
+        for activity in pending:
+            activity.status = new_status
+            activity.mentor_comments = comments
+            if new_status == Status.APPROVED:
+                activity.verified_village = activity.verified_village or activity.village_name
+                activity.approved_by = reviewer
+            else:
+                activity.approved_by = None
+            activity.review_actor = reviewer
+            activity.save()
+            reviewed.append(activity.pk)
+    return reviewed
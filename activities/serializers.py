@@ -1,7 +1,46 @@
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Trim
+from django.utils import timezone
+from django.utils.duration import duration_string
 from rest_framework import serializers
+from locations.utils import get_sector_hierarchy
+from .fieldsets import FieldsetSerializerMixin
 from .models import TrainingActivity
 
-class TrainingActivitySerializer(serializers.ModelSerializer):
+
+def sector_summary(sector_id):
+    """Nested sector for ?expand=sector, read from the cached location hierarchy (no join)."""
+    entry = get_sector_hierarchy().get(sector_id)
+    if entry is None:
+        return None
+    return {
+        'id': entry['sector_id'],
+        'name': entry['sector_name'],
+        'district': entry['district'],
+        'province': entry['province'],
+    }
+
+
+class SectorSummaryField(serializers.Field):
+    """Read-only field rendering a sector id as {id, name, district, province}."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return sector_summary(value)
+
+
+class FellowSummarySerializer(serializers.Serializer):
+    """Nested fellow for ?expand=fellow."""
+    id = serializers.IntegerField(read_only=True)
+    full_name = serializers.ReadOnlyField(source='user.get_full_name')
+    university = serializers.CharField(read_only=True)
+    status = serializers.CharField(read_only=True)
+
+
+class TrainingActivitySerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the TrainingActivity model.
     - Provides human-readable names for Fellow and District.
@@ -43,6 +82,18 @@ class TrainingActivitySerializer(serializers.ModelSerializer):
         # These fields are managed by Mentors or the system, not by the Fellow API
         read_only_fields = ['status', 'mentor_comments', 'created_at', 'is_resubmitted']
 
+        # Sparse fieldsets (see activities/fieldsets.py)
+        expanded_fields = {
+            'fellow': lambda: FellowSummarySerializer(read_only=True),
+            'sector': lambda: SectorSummaryField(source='sector_id'),
+        }
+        # Narrative text: only sent when asked for with ?fields= or ?expand=
+        extra_fields = {
+            'challenges_notes': lambda: serializers.CharField(read_only=True),
+            'success_stories': lambda: serializers.CharField(read_only=True),
+            'verified_village': lambda: serializers.CharField(read_only=True),
+        }
+
     def get_duration_hours(self, obj):
         """
         Logic to convert the model's DurationField (timedelta) 
@@ -64,4 +115,146 @@ class TrainingActivitySerializer(serializers.ModelSerializer):
         from django.utils import timezone
         if value > timezone.now().date():
             raise serializers.ValidationError("Training date cannot be in the future.")
-        return value
\ No newline at end of file
+        return value
+
+
+
+class BulkReviewSerializer(serializers.Serializer):
+    """POST /api/activities/logs/review/ - approve or return up to 100 pending reports."""
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), min_length=1, max_length=100)
+    status = serializers.ChoiceField(choices=[TrainingActivity.Status.APPROVED, TrainingActivity.Status.REVISION])
+    mentor_comments = serializers.CharField(required=False, allow_blank=True, default='')
+
+class TrainingActivityListReader:
+    """
+    Read-optimized list path producing the SAME JSON as TrainingActivitySerializer.
+    - Fetches plain values() rows: no model instances, no field introspection.
+    - fellow_name and district_name are computed by the database (joins + CONCAT).
+    - Only the columns of the requested fieldset are selected; the narrative
+      columns (challenges_notes, success_stories, verified_village) are opt-in.
+    - duration_hours/status_label/photos are derived in a tiny row mapper
+      (duration arithmetic differs per database backend, so it stays in Python).
+    """
+
+    status_labels = dict(TrainingActivity.Status.choices)
+    photo_storage = TrainingActivity._meta.get_field('photos').storage
+
+    DEFAULT_FIELDS = tuple(TrainingActivitySerializer.Meta.fields)
+    EXPANDABLE_FIELDS = ('fellow', 'sector', 'challenges_notes', 'success_stories', 'verified_village')
+    EXTRA_FIELDS = ('challenges_notes', 'success_stories', 'verified_village')
+
+    # DB-computed columns, only annotated when a selected field needs them
+    ANNOTATIONS = {
+        'row_fellow_name': lambda: Trim(Concat(
+            'fellow__user__first_name', Value(' '), 'fellow__user__last_name'
+        )),
+        'row_district_name': lambda: F('sector__district__name'),
+    }
+
+    # Output field -> values() columns it reads
+    FIELD_COLUMNS = {
+        'id': ('id',),
+        'fellow': ('fellow_id',),
+        'fellow_name': ('row_fellow_name',),
+        'date': ('date',),
+        'sector': ('sector_id',),
+        'district_name': ('row_district_name',),
+        'village_name': ('village_name',),
+        'training_topic': ('training_topic',),
+        'training_method': ('training_method',),
+        'duration': ('duration',),
+        'duration_hours': ('duration',),
+        'number_of_farmers_trained': ('number_of_farmers_trained',),
+        'status': ('status',),
+        'status_label': ('status',),
+        'is_resubmitted': ('is_resubmitted',),
+        'mentor_comments': ('mentor_comments',),
+        'photos': ('photos',),
+        'created_at': ('created_at',),
+        'challenges_notes': ('challenges_notes',),
+        'success_stories': ('success_stories',),
+        'verified_village': ('verified_village',),
+    }
+    EXPANDED_COLUMNS = {
+        'fellow': ('fellow_id', 'row_fellow_name', 'fellow__university', 'fellow__status'),
+        'sector': ('sector_id',),
+    }
+
+    def __init__(self, request=None, fieldset=None):
+        self.request = request
+        self.fieldset = fieldset
+        self.fields = fieldset.fields if fieldset is not None else list(self.DEFAULT_FIELDS)
+        self.converters = [(name, self.get_converter(name)) for name in self.fields]
+
+    def is_expanded(self, name):
+        return self.fieldset is not None and self.fieldset.is_expanded(name)
+
+    def get_columns(self):
+        columns = []
+        for name in self.fields:
+            if self.is_expanded(name) and name in self.EXPANDED_COLUMNS:
+                sources = self.EXPANDED_COLUMNS[name]
+            else:
+                sources = self.FIELD_COLUMNS[name]
+            for column in sources:
+                if column not in columns:
+                    columns.append(column)
+        return columns
+
+    def get_rows(self, queryset):
+        """Turns an activity queryset into a values() queryset with DB-computed columns."""
+        columns = self.get_columns()
+        annotations = {
+            column: build() for column, build in self.ANNOTATIONS.items() if column in columns
+        }
+        return queryset.annotate(**annotations).values(*columns)
+
+    def format_datetime(self, value):
+        # Matches DRF's DateTimeField output (ISO 8601, 'Z' for UTC)
+        value = timezone.localtime(value).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    def format_photo(self, name):
+        if not name:
+            return None
+        url = self.photo_storage.url(name)
+        return self.request.build_absolute_uri(url) if self.request is not None else url
+
+    def get_converter(self, name):
+        """Returns row -> JSON value for one output field."""
+        if name == 'fellow' and self.is_expanded(name):
+            return lambda row: {
+                'id': row['fellow_id'],
+                'full_name': row['row_fellow_name'],
+                'university': row['fellow__university'],
+                'status': row['fellow__status'],
+            }
+        if name == 'sector' and self.is_expanded(name):
+            return lambda row: sector_summary(row['sector_id'])
+
+        converters = {
+            'fellow_name': lambda row: row['row_fellow_name'],
+            'district_name': lambda row: row['row_district_name'],
+            'date': lambda row: row['date'].isoformat(),
+            'duration': lambda row: (
+                duration_string(row['duration']) if row['duration'] is not None else None
+            ),
+            'duration_hours': lambda row: (
+                round(row['duration'].total_seconds() / 3600, 2) if row['duration'] else 0.0
+            ),
+            'status_label': lambda row: self.status_labels.get(row['status'], row['status']),
+            'photos': lambda row: self.format_photo(row['photos']),
+            'created_at': lambda row: self.format_datetime(row['created_at']),
+        }
+        if name in converters:
+            return converters[name]
+        column = self.FIELD_COLUMNS[name][0]
+        return lambda row: row[column]
+
+    def to_representation(self, row):
+        return {name: convert(row) for name, convert in self.converters}
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
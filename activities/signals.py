@@ -0,0 +1,53 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from django.contrib.auth.models import User
+
+from fellows.models import Fellow
+from locations.models import Province, District, Sector
+from mentors.models import Mentor
+from .models import TrainingActivity
+from .counters import record_change, source_values
+from .utils import bump_data_version, fellow_dataset
+
+
+# --- DATA VERSION BUMPS ---
+# Cached analytics are keyed on these versions (see utils.get_data_version).
+
+@receiver([post_save, post_delete], sender=TrainingActivity)
+def activity_changed(sender, instance, **kwargs):
+    bump_data_version('activities')
+
+@receiver([post_save, post_delete], sender=Fellow)
+def fellow_changed(sender, instance, **kwargs):
+    bump_data_version('fellows')
+    bump_data_version(fellow_dataset(instance.pk))
+
+# Cached <select> option lists (activities/choices.py)
+
+@receiver([post_save, post_delete], sender=Province)
+@receiver([post_save, post_delete], sender=District)
+@receiver([post_save, post_delete], sender=Sector)
+def location_changed(sender, instance, **kwargs):
+    bump_data_version('locations')
+
+@receiver([post_save, post_delete], sender=Mentor)
+def mentor_changed(sender, instance, **kwargs):
+    bump_data_version('mentors')
+
+@receiver(post_save, sender=User)
+def user_renamed(sender, instance, update_fields=None, **kwargs):
+    # Mentor labels show the user's name; logins only touch last_login. Any other
+    # user save bumps the version (a cache incr, cheaper than checking for a mentor)
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump_data_version('mentors')
+
+
+# --- FELLOW COUNTERS ---
+# Creates/edits go through TrainingActivity.save(); deletes (instance, queryset or
+# cascade) all send post_delete.
+
+@receiver(post_delete, sender=TrainingActivity)
+def activity_deleted(sender, instance, **kwargs):
+    record_change(source_values(instance), None)
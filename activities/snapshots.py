@@ -0,0 +1,225 @@
+"""
+Immutable snapshot reports of closed reporting periods (quarterly donor reports).
+
+A period is named by its label: '2025' (year), '2025-Q1' (quarter) or '2025-03'
+(month). freeze() runs the period's aggregates ONCE over the approved live and
+archived reports (TrainingActivityRecord) and stores the result as a
+ReportSnapshot row:
+
+    data          {'totals', 'provinces', 'districts', 'sectors', 'topics', 'methods', 'leaderboard'}
+    content_hash  SHA-256 of the canonical JSON of `data` (sorted keys, no spaces)
+
+Reading a report is then one primary-key fetch of that document: later edits of
+old reports can't change the numbers already sent to a donor. The hash proves the
+stored document is the one frozen (verify()), and diff() re-runs the aggregates
+on the live data and lists what changed since, row by row.
+
+Only closed periods (ended before today) can be frozen, once per label.
+
+Usage:
+    python manage.py freeze_snapshot 2025-Q1
+    python manage.py diff_snapshot 2025-Q1
+    GET /api/activities/snapshots/<id>/
+"""
+
+# activities/snapshots.py
+
+import hashlib
+import json
+import re
+from datetime import date, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .analytics import run_queries
+from .models import ReportSnapshot, TrainingActivityRecord
+
+SCHEMA_VERSION = 1
+LEADERBOARD_SIZE = 20
+
+PERIOD_LABEL = re.compile(r'^(\d{4})(?:-Q([1-4])|-(0[1-9]|1[0-2]))?$')
+
+# List sections and the field identifying a row, for diff()
+SECTION_KEYS = {
+    'provinces': 'province_id',
+    'districts': 'district_id',
+    'sectors': 'sector_id',
+    'topics': 'topic',
+    'methods': 'method',
+    'leaderboard': 'fellow_id',
+}
+
+REACH = {
+    'farmers': Sum('number_of_farmers_trained'),
+    'sessions': Count('id'),
+}
+
+
+# --- 1. PERIODS ---
+
+def period_bounds(label):
+    """'2025-Q1' -> (2025-01-01, 2025-03-31); raises ValueError for an unknown label."""
+    match = PERIOD_LABEL.match(label or '')
+    if match is None:
+        raise ValueError(f"Unknown period '{label}': use YYYY, YYYY-Qn or YYYY-MM.")
+    year, quarter, month = match.groups()
+    year = int(year)
+    if quarter:
+        first_month, months = 3 * int(quarter) - 2, 3
+    elif month:
+        first_month, months = int(month), 1
+    else:
+        first_month, months = 1, 12
+    start = date(year, first_month, 1)
+    next_month = first_month + months
+    end = date(year + (next_month > 12), (next_month - 1) % 12 + 1, 1) - timedelta(days=1)
+    return start, end
+
+
+def previous_quarter(today=None):
+    """Label of the last quarter that has ended, e.g. '2025-Q4' in February 2026."""
+    today = today or timezone.localdate()
+    quarter = (today.month - 1) // 3
+    if quarter == 0:
+        return f'{today.year - 1}-Q4'
+    return f'{today.year}-Q{quarter}'
+
+
+# --- 2. METRICS ---
+
+def period_queries(start, end):
+    """
+    Independent aggregates of the period's approved reports (see analytics.run_queries);
+    values(alias=F(path)) keeps the document keys short and independent of the joins.
+    """
+    approved = TrainingActivityRecord.objects.filter(status='APPROVED', date__range=(start, end))
+    by_reach = ('-farmers', '-sessions')
+    return {
+        'totals': lambda: approved.aggregate(
+            **REACH,
+            fellows=Count('fellow', distinct=True),
+            sectors=Count('sector', distinct=True),
+            duration=Sum('duration'),
+        ),
+        'provinces': lambda: list(approved.values(
+            province_id=F('sector__district__province_id'),
+            province_name=F('sector__district__province__name'),
+        ).annotate(**REACH).order_by(*by_reach, 'province_name')),
+        'districts': lambda: list(approved.values(
+            district_id=F('sector__district_id'),
+            district_name=F('sector__district__name'),
+            province_name=F('sector__district__province__name'),
+        ).annotate(**REACH).order_by(*by_reach, 'district_name')),
+        'sectors': lambda: list(approved.values(
+            'sector_id',
+            sector_name=F('sector__name'),
+            district_name=F('sector__district__name'),
+        ).annotate(**REACH).order_by(*by_reach, 'sector_name')),
+        'topics': lambda: list(approved.values(
+            topic=F('training_topic'),
+        ).annotate(**REACH).order_by(*by_reach, 'topic')),
+        'methods': lambda: list(approved.values(
+            method=F('training_method'),
+        ).annotate(**REACH).order_by(*by_reach, 'method')),
+        'leaderboard': lambda: list(approved.values(
+            'fellow_id',
+            first_name=F('fellow__user__first_name'),
+            last_name=F('fellow__user__last_name'),
+            sector_name=F('fellow__assigned_sector__name'),
+        ).annotate(**REACH).order_by(*by_reach, 'fellow_id')[:LEADERBOARD_SIZE]),
+    }
+
+
+def build_document(label, start, end, results):
+    """JSON-native document (ints and strings only) of the query results."""
+    totals = results['totals']
+    duration = totals['duration'] or timedelta()
+    return {
+        'schema_version': SCHEMA_VERSION,
+        'period': {'label': label, 'start': start.isoformat(), 'end': end.isoformat()},
+        'totals': {
+            'farmers': totals['farmers'] or 0,
+            'sessions': totals['sessions'],
+            'fellows': totals['fellows'],
+            'sectors': totals['sectors'],
+            'training_minutes': int(duration.total_seconds() // 60),
+        },
+        **{section: results[section] for section in SECTION_KEYS},
+    }
+
+
+def compute(label):
+    """The period's document computed from the live data now."""
+    start, end = period_bounds(label)
+    return build_document(label, start, end, run_queries(period_queries(start, end)))
+
+
+def canonical_json(document):
+    return json.dumps(document, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def content_hash(document):
+    return hashlib.sha256(canonical_json(document).encode()).hexdigest()
+
+
+# --- 3. FREEZING & READING ---
+
+def freeze(label, user=None, today=None):
+    """Stores the snapshot of a closed period; raises ValueError if open or already frozen."""
+    start, end = period_bounds(label)
+    today = today or timezone.localdate()
+    if end >= today:
+        raise ValueError(f"Period {label} ends on {end}: only closed periods can be frozen.")
+    if ReportSnapshot.objects.filter(label=label).exists():
+        raise ValueError(f"Period {label} is already frozen.")
+
+    document = compute(label)
+    try:
+        with transaction.atomic():
+            return ReportSnapshot.objects.create(
+                label=label,
+                period_start=start,
+                period_end=end,
+                data=document,
+                content_hash=content_hash(document),
+                schema_version=SCHEMA_VERSION,
+                created_by=user,
+            )
+    except IntegrityError:
+        # A concurrent freeze of the same label committed first
+        raise ValueError(f"Period {label} is already frozen.")
+
+
+def verify(snapshot):
+    """True when the stored document still hashes to its content_hash."""
+    return content_hash(snapshot.data) == snapshot.content_hash
+
+
+# --- 4. DIFF AGAINST LIVE DATA ---
+
+def diff(snapshot):
+    """
+    [(path, frozen, live), ...] for every value that differs between the snapshot
+    and the live data of its period. Rows of list sections are matched by their
+    key (SECTION_KEYS); a row missing on one side shows as None.
+    """
+    live = compute(snapshot.label)
+    frozen = snapshot.data
+    changes = [
+        (f'totals.{name}', frozen['totals'].get(name), value)
+        for name, value in live['totals'].items() if frozen['totals'].get(name) != value
+    ]
+    for section, key in SECTION_KEYS.items():
+        frozen_rows = {row[key]: row for row in frozen.get(section, [])}
+        live_rows = {row[key]: row for row in live[section]}
+        for row_key in list(frozen_rows) + [k for k in live_rows if k not in frozen_rows]:
+            old, new = frozen_rows.get(row_key), live_rows.get(row_key)
+            if old is None or new is None:
+                changes.append((f'{section}[{row_key}]', old, new))
+                continue
+            for name in sorted(set(old) | set(new)):
+                if old.get(name) != new.get(name):
+                    changes.append((f'{section}[{row_key}].{name}', old.get(name), new.get(name)))
+    return changes
@@ -0,0 +1,68 @@
+"""
+Background tasks of the activities app (run by `python manage.py run_task_worker`,
+see taskqueue/). Scheduled ones are enqueued by the workers at their cron times.
+"""
+
+# activities/tasks.py
+
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.utils import timezone
+
+from taskqueue.registry import task
+from .archive import archive
+from .exports import filtered_activities, write_activities_csv
+from .idempotency import prune_expired
+from .outbox import dispatch_due
+from .snapshots import freeze, previous_quarter
+
+
+@task(cron='* * * * *', max_attempts=1, timeout=300)
+def dispatch_notifications():
+    """Sends the due outbox notifications as digests (the outbox keeps its own retries)."""
+    return dispatch_due()
+
+
+@task(cron='15 3 * * *')
+def rebuild_review_stats():
+    """Nightly repair of the review-latency totals from the review event log."""
+    output = StringIO()
+    call_command('rebuild_review_stats', stdout=output)
+    return output.getvalue()[-2000:]
+
+
+@task(cron='5 * * * *')
+def prune_idempotency_keys():
+    """Hourly deletion of the stored Idempotency-Key responses past their TTL."""
+    return prune_expired()
+
+
+@task(cron='0 4 * * 0', timeout=60 * 60)
+def archive_closed_reports():
+    """Weekly move of the approved reports of completed fellows past the archive cutoff."""
+    return archive()
+
+
+@task(cron='30 2 1 1,4,7,10 *')
+def freeze_previous_quarter():
+    """Quarterly snapshot of the quarter that just ended (skipped if already frozen)."""
+    label = previous_quarter()
+    try:
+        return freeze(label).content_hash
+    except ValueError as error:
+        return str(error)
+
+
+@task(timeout=30 * 60)
+def export_activities_csv(search=None, district_id=None):
+    """Writes the filtered activity export to media storage; returns its storage name."""
+    buffer = StringIO()
+    rows = write_activities_csv(buffer, filtered_activities(search, district_id))
+    name = default_storage.save(
+        f'exports/b2r_impact_report_{timezone.now():%Y%m%d_%H%M%S}.csv',
+        ContentFile(buffer.getvalue().encode('utf-8')),
+    )
+    return {'file': name, 'rows': rows}
@@ -0,0 +1,91 @@
+"""
+Template fragment caching keyed on a data version (see activities/utils.py).
+
+    {% load fragment_cache %}
+    {% versioned_cache 'fellow_stats' fellow.pk|fellow_dataset request.user_role.role %}
+        ... cards / tables ...
+    {% endversioned_cache %}
+
+    {% versioned_cache 'impact_totals' 'activities' request.user_role.role request.GET.search %}
+
+The first argument names the fragment, the second the dataset whose version is
+part of the key ('activities', 'fellows', or one fellow via `fellow_dataset`);
+any further values vary the key (role, filters...). A write bumps the version,
+so stale fragments are never read again and simply expire.
+
+Every render is timed into the metrics registry as
+    fragment_render_ms  ->  '<fragment> hit' / '<fragment> miss'
+(GET /api/activities/metrics/?metric=fragment_render_ms).
+"""
+
+# activities/templatetags/fragment_cache.py
+
+import time
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from activities.metrics import metrics
+from activities.utils import fellow_dataset as dataset_for_fellow, get_data_version
+
+register = template.Library()
+
+
+class VersionedCacheNode(template.Node):
+
+    def __init__(self, nodelist, fragment_name, dataset, vary_on):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.dataset = dataset
+        self.vary_on = vary_on
+
+    def get_version(self, context, dataset):
+        # Fragments of the same page share one version read per dataset
+        versions = context.render_context.setdefault(self, {})
+        if dataset not in versions:
+            versions[dataset] = get_data_version(dataset)
+        return versions[dataset]
+
+    def render(self, context):
+        started = time.perf_counter()
+        dataset = str(self.dataset.resolve(context))
+        vary_on = [dataset, self.get_version(context, dataset)]
+        vary_on += [var.resolve(context) for var in self.vary_on]
+        cache_key = make_template_fragment_key(self.fragment_name, vary_on)
+
+        value = cache.get(cache_key)
+        outcome = 'hit'
+        if value is None:
+            outcome = 'miss'
+            value = self.nodelist.render(context)
+            cache.set(cache_key, value, getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 24 * 3600))
+
+        metrics.observe(
+            'fragment_render_ms', f'{self.fragment_name} {outcome}',
+            round((time.perf_counter() - started) * 1000, 3),
+        )
+        return value
+
+
+@register.tag('versioned_cache')
+def do_versioned_cache(parser, token):
+    nodelist = parser.parse(('endversioned_cache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{tokens[0]}' tag requires a fragment name and a dataset."
+        )
+    return VersionedCacheNode(
+        nodelist,
+        tokens[1].strip('\'"'),  # the fragment name is a literal
+        parser.compile_filter(tokens[2]),
+        [parser.compile_filter(bit) for bit in tokens[3:]],
+    )
+
+
+@register.filter
+def fellow_dataset(fellow_id):
+    return dataset_for_fellow(fellow_id)
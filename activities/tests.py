@@ -1,3 +1,734 @@
-from django.test import TestCase
+import io
+from datetime import date, datetime, timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models.query import QuerySet
+from django.template import Context, Template, TemplateSyntaxError
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+
+from accounts.throttling import buckets
+from fellows.models import Fellow
+from locations.models import Sector
+from bridge2Rwanda_fellowship_management_system import admin_utils
+from bridge2Rwanda_fellowship_management_system.test_utils import (
+    create_activity, create_fellow, create_locations, create_mentor, create_user,
+)
+from . import archive, choices, idempotency, outbox
+from .snapshots import diff, freeze, period_bounds, previous_quarter, verify
+from .duplicates import likely_duplicate_ids, normalize
+from .fieldsets import Fieldset
+from .filters import TrainingActivityFilter
+from .metrics import metrics
+from .models import (
+    ArchivedTrainingActivity, IdempotencyKey, OutboxMessage, ReportSnapshot, ReviewEvent, ReviewStats,
+    TrainingActivity, TrainingActivityRecord,
+)
+from .reviews import review_pending
+from .serializers import TrainingActivityListReader, TrainingActivitySerializer
+from .utils import bump_data_version
+
+
+class ActivityFilterTests(TestCase):
+    def setUp(self):
+        buckets.clear()
+        self.mentor = create_mentor('mentor@example.com')
+        self.sector = create_locations()
+        self.fellow = create_fellow('ann@example.com', self.sector, self.mentor)
+        self.activity = create_activity(self.fellow)
+        self.client = APIClient()
+        self.client.force_authenticate(create_user('coordinator@example.com', role='COORDINATOR'))
+
+    def get(self, **params):
+        return self.client.get('/api/activities/logs/', params)
+
+    def test_id_filters_reject_decimals(self):
+        for param in ('mentor', 'district', 'province', 'sector', 'fellow'):
+            response = self.get(**{param: '3.7'})
+            self.assertEqual(response.status_code, 400, param)
+            self.assertIn(param, response.json())
+
+    def test_id_filters_match(self):
+        self.assertEqual(self.get(mentor=self.mentor.id).json()['count'], 1)
+        self.assertEqual(self.get(district=self.sector.district_id).json()['count'], 1)
+        self.assertEqual(self.get(mentor=self.mentor.id + 1).json()['count'], 0)
+
+    @skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite syntax')
+    def test_no_filter_sorts(self):
+        other = create_fellow('bob@example.com', create_locations('Kimisagara'), self.mentor)
+        for day in range(1, 29):
+            create_activity(other if day % 2 else self.fellow, date=date(2025, 2, day))
+
+        for params in ({}, {'ordering': 'date'}, {'status': 'PENDING'}, {'fellow': self.fellow.id},
+                       {'sector': self.sector.id}, {'district': self.sector.district_id},
+                       {'province': self.sector.district.province_id}, {'mentor': self.mentor.id},
+                       {'mentor': self.mentor.id, 'status': 'PENDING'}, {'training_method': 'workshop'},
+                       {'is_resubmitted': 'false'}, {'date_from': '2025-02-10'}):
+            queryset = TrainingActivityFilter(params, queryset=TrainingActivity.objects.all()).qs[:10]
+            sql, sql_params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, sql_params)
+                plan = ' / '.join(row[-1] for row in cursor.fetchall())
+            self.assertNotIn('TEMP B-TREE', plan, params)
+            self.assertIn('_idx', plan, params)
+
+
+class ListReaderParityTests(TestCase):
+    """TrainingActivityListReader must produce exactly what the serializer would."""
+
+    def setUp(self):
+        sector = create_locations()
+        named = create_fellow('ann@example.com', sector)
+        unnamed = create_fellow('anon@example.com', sector, first_name='', last_name='')
+        with_photo = create_activity(named, duration=timedelta(hours=1, minutes=30), status='APPROVED')
+        create_activity(unnamed, duration=timedelta(days=1, seconds=5), challenges_notes='Rain')
+        TrainingActivity.objects.filter(pk=with_photo.pk).update(
+            photos='training_photos/field day.jpg',
+            created_at=timezone.make_aware(datetime(2025, 1, 15, 8, 30, 0, 123456)),
+        )
+        self.request = APIRequestFactory().get('/api/activities/logs/')
+
+    def assertSameOutput(self, fieldset=None):
+        queryset = TrainingActivity.objects.order_by('id')
+        context = {'request': self.request}
+        if fieldset is not None:
+            context['fieldset'] = fieldset
+        expected = TrainingActivitySerializer(
+            queryset.select_related('fellow__user', 'sector__district'), many=True, context=context,
+        ).data
+
+        reader = TrainingActivityListReader(request=self.request, fieldset=fieldset)
+        rows = reader.serialize(reader.get_rows(queryset))
+        self.assertEqual(rows, [dict(item) for item in expected])
+        return rows
+
+    def test_default_fields(self):
+        rows = self.assertSameOutput()
+        self.assertEqual(rows[0]['photos'], 'http://testserver/media/training_photos/field%20day.jpg')
+        self.assertEqual(rows[0]['created_at'], '2025-01-15T08:30:00.123456Z')
+        self.assertEqual(rows[0]['duration'], '01:30:00')
+        self.assertEqual(rows[1]['duration'], '1 00:00:05')
+        self.assertEqual(rows[1]['fellow_name'], '')
+        self.assertIsNone(rows[1]['photos'])
+
+    def test_expanded_and_extra_fields(self):
+        fields = list(TrainingActivityListReader.DEFAULT_FIELDS) + list(TrainingActivityListReader.EXTRA_FIELDS)
+        rows = self.assertSameOutput(Fieldset(fields, {'fellow', 'sector'}))
+        self.assertEqual(rows[1]['fellow']['full_name'], '')
+        self.assertEqual(rows[1]['challenges_notes'], 'Rain')
+
+
+class FieldsetTests(TestCase):
+    def setUp(self):
+        buckets.clear()
+        metrics.reset()
+        self.activity = create_activity(create_fellow('ann@example.com', create_locations()),
+                                        challenges_notes='Rain')
+        self.client = APIClient()
+        self.client.force_authenticate(create_user('coordinator@example.com', role='COORDINATOR'))
+
+    def activity_select(self, path, **params):
+        """The response and the SQL of the query that read the activity rows."""
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        selects = [query['sql'] for query in captured
+                   if query['sql'].startswith('SELECT') and 'FROM "activities_trainingactivity"' in query['sql']
+                   and 'COUNT(' not in query['sql']]
+        self.assertEqual(len(selects), 1, selects)
+        return response, selects[0].split(' FROM ')[0]
+
+    def test_fields_narrow_the_list_select(self):
+        _, full = self.activity_select('/api/activities/logs/')
+        self.assertIn('"village_name"', full)
+        self.assertIn('"auth_user"', full)
+        self.assertNotIn('"challenges_notes"', full)
+
+        response, sparse = self.activity_select('/api/activities/logs/', fields='id,date,status')
+        self.assertEqual(list(response.json()['results'][0]), ['id', 'date', 'status'])
+        self.assertNotIn('"village_name"', sparse)
+        self.assertNotIn('"auth_user"', sparse)
+
+        _, extra = self.activity_select('/api/activities/logs/', fields='id', expand='challenges_notes')
+        self.assertIn('"challenges_notes"', extra)
+
+    def test_fields_narrow_the_retrieve_select(self):
+        path = f'/api/activities/logs/{self.activity.id}/'
+        _, full = self.activity_select(path)
+        self.assertIn('"village_name"', full)
+
+        response, sparse = self.activity_select(path, fields='id,status')
+        self.assertEqual(response.json(), {'id': self.activity.id, 'status': 'PENDING'})
+        self.assertNotIn('"village_name"', sparse)
+        self.assertNotIn('"challenges_notes"', sparse)
+
+        response, expanded = self.activity_select(path, fields='id', expand='fellow')
+        self.assertEqual(response.json()['fellow']['full_name'], 'Ann F')
+        self.assertIn('"fellows_fellow"."university"', expanded)
+
+    def test_unknown_names_are_rejected(self):
+        response = self.client.get('/api/activities/logs/', {'fields': 'id,colour'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('colour', response.json()['fields'])
+        response = self.client.get('/api/activities/logs/', {'expand': 'mentor'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('mentor', response.json()['expand'])
+
+    def test_payload_size_is_recorded(self):
+        full = self.client.get('/api/activities/logs/')
+        sparse = self.client.get('/api/activities/logs/', {'fields': 'id'})
+        self.assertEqual(full['X-Payload-Bytes'], str(len(full.content)))
+
+        view_name = full.resolver_match.view_name
+        series = metrics.snapshot('payload_bytes')['payload_bytes']
+        self.assertEqual(series[f'{view_name} full']['total'], len(full.content))
+        self.assertEqual(series[f'{view_name} sparse']['total'], len(sparse.content))
+        self.assertLess(len(sparse.content), len(full.content))
+
+
+class BulkReviewTests(TestCase):
+    def setUp(self):
+        buckets.clear()
+        self.mentor = create_mentor('mentor@example.com')
+        self.fellow = create_fellow('ann@example.com', create_locations(), self.mentor)
+        self.first = create_activity(self.fellow)
+        self.second = create_activity(self.fellow, village_name='Gahanga')
+
+    def approvals(self):
+        return ReviewEvent.objects.filter(kind=ReviewEvent.Kind.APPROVED)
+
+    def test_reviews_pending_reports_once(self):
+        self.assertEqual(review_pending([self.first.pk, self.second.pk], 'APPROVED', self.mentor.user),
+                         [self.first.pk, self.second.pk])
+        # A second (late or concurrent) bulk review finds nothing pending any more
+        self.assertEqual(review_pending([self.first.pk, self.second.pk], 'APPROVED', self.mentor.user), [])
+
+        self.assertEqual(self.approvals().count(), 2)
+        self.assertEqual(set(self.approvals().values_list('actor_id', flat=True)), {self.mentor.user_id})
+        self.assertEqual(ReviewStats.objects.get().approved, 2)
+
+    def test_reports_reviewed_elsewhere_are_skipped(self):
+        self.first.status = 'REVISION'
+        self.first.save()
+        self.assertEqual(review_pending([self.first.pk, self.second.pk], 'APPROVED', self.mentor.user),
+                         [self.second.pk])
+        self.assertEqual(TrainingActivity.objects.get(pk=self.first.pk).status, 'REVISION')
+        stats = ReviewStats.objects.get()
+        self.assertEqual((stats.approved, stats.revisions), (1, 1))
+
+    def test_pending_rows_are_locked_in_id_order(self):
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True,
+                               side_effect=QuerySet.select_for_update) as lock:
+            review_pending([self.second.pk, self.first.pk], 'APPROVED', self.mentor.user)
+        # The bulk lock comes first; each save() then re-reads its (already locked) row
+        self.assertEqual(lock.call_args_list[0].kwargs, {'of': ('self',)})
+
+    def test_api_reports_skipped_ids(self):
+        client = APIClient()
+        client.force_authenticate(self.mentor.user)
+        review_pending([self.first.pk], 'APPROVED', self.mentor.user)
+        response = client.post('/api/activities/logs/review/', {
+            'ids': [self.first.pk, self.second.pk], 'status': 'REVISION', 'mentor_comments': 'Add photos',
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['reviewed'], response.json()['skipped']), ([self.second.pk], [self.first.pk]))
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    OUTBOX_MAX_ATTEMPTS=3, OUTBOX_RETRY_BASE_SECONDS=60, OUTBOX_RETRY_MAX_SECONDS=90,
+)
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.mentor = create_mentor('mentor@example.com', first_name='Jean', last_name='M')
+        self.fellow = create_fellow('ann@example.com', create_locations(), self.mentor)
+
+    def review(self, activity, status, comments=''):
+        activity.status = status
+        activity.mentor_comments = comments
+        activity.review_actor = self.mentor.user
+        activity.save()
+
+    def test_review_queues_a_notification_with_its_transaction(self):
+        activity = create_activity(self.fellow)
+        self.assertFalse(OutboxMessage.objects.exists())  # submissions notify nobody
+
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.review(activity, 'APPROVED')
+                raise RuntimeError
+        self.assertFalse(OutboxMessage.objects.exists())
+
+        self.review(activity, 'REVISION', 'Add the village')
+        message = OutboxMessage.objects.get()
+        self.assertEqual((message.recipient_id, message.kind), (self.fellow.user_id, 'REPORT_REVISION'))
+        self.assertEqual(message.payload['reviewed_by'], 'Jean M')
+
+    def test_one_digest_per_recipient(self):
+        self.review(create_activity(self.fellow, training_topic='Mulching'), 'APPROVED')
+        self.review(create_activity(self.fellow, training_topic='Composting'), 'REVISION', 'Add photos')
+
+        self.assertEqual(outbox.dispatch_due(), {'sent': 2, 'retry': 0, 'failed': 0})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'B2R Fellowship: 2 report updates')
+        self.assertIn('"Composting"', mail.outbox[0].body)
+        self.assertIn('Comments: Add photos', mail.outbox[0].body)
+        self.assertFalse(OutboxMessage.objects.exclude(status='SENT').exists())
+        # Nothing left to send
+        self.assertEqual(outbox.dispatch_due(), {'sent': 0, 'retry': 0, 'failed': 0})
+
+    def test_claimed_messages_are_leased(self):
+        outbox.enqueue(self.fellow.user_id, 'REPORT_APPROVED', {})
+        now = timezone.now()
+        self.assertEqual(len(outbox.claim_batch(10, 600, now)), 1)
+        self.assertEqual(outbox.claim_batch(10, 600, now), [])
+        self.assertEqual(len(outbox.claim_batch(10, 600, now + timedelta(seconds=601))), 1)
+
+    def test_unreachable_server_retries_with_backoff_then_fails(self):
+        message = outbox.enqueue(self.fellow.user_id, 'REPORT_APPROVED', {})
+        now = timezone.now()
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.open', side_effect=OSError('down')):
+            for attempt, delay in ((1, 60), (2, 90)):
+                self.assertEqual(outbox.send_digests([message], now), {'sent': 0, 'retry': 1, 'failed': 0})
+                message.refresh_from_db()
+                self.assertEqual(message.attempts, attempt)
+                self.assertEqual(message.available_at, now + timedelta(seconds=delay))  # capped at 90
+            self.assertEqual(outbox.send_digests([message], now), {'sent': 0, 'retry': 0, 'failed': 1})
+        message.refresh_from_db()
+        self.assertEqual(message.status, 'FAILED')
+        self.assertEqual(message.last_error, 'OSError: down')
+
+    def test_recipient_without_email_fails_at_once(self):
+        User.objects.filter(pk=self.fellow.user_id).update(email='')
+        outbox.enqueue(self.fellow.user_id, 'REPORT_APPROVED', {})
+        self.assertEqual(outbox.dispatch_due(), {'sent': 0, 'retry': 0, 'failed': 1})
+        self.assertEqual(OutboxMessage.objects.get().last_error, outbox.NO_EMAIL_ERROR)
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        buckets.clear()
+        self.sector = create_locations()
+        self.fellow = create_fellow('ann@example.com', self.sector)
+        self.client = APIClient()
+        self.client.force_authenticate(self.fellow.user)
+        self.body = {
+            'fellow': self.fellow.id, 'date': '2025-02-01', 'sector': self.sector.id, 'village_name': 'Nyamata', 'training_topic': 'Mulching',
+            'training_method': 'workshop', 'duration': '01:00:00', 'number_of_farmers_trained': 12,
+        }
+
+    def post(self, body, key):
+        return self.client.post('/api/activities/logs/', body, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_first_response(self):
+        first = self.post(self.body, 'k1')
+        retry = self.post(self.body, 'k1')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((retry.status_code, retry.json()), (201, first.json()))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(TrainingActivity.objects.count(), 1)
+
+    def test_key_reused_for_another_payload_is_a_422(self):
+        self.post(self.body, 'k1')
+        response = self.post({**self.body, 'number_of_farmers_trained': 13}, 'k1')
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(TrainingActivity.objects.count(), 1)
+
+    def test_concurrent_duplicate_rolls_back_and_replays_the_winner(self):
+        first = self.post(self.body, 'k1')
+        # The duplicate's lookup ran before the winner committed its key
+        with mock.patch.object(idempotency, '_stored', return_value=None):
+            duplicate = self.post(self.body, 'k1')
+        self.assertEqual(duplicate.json(), first.json())
+        self.assertEqual(duplicate['Idempotent-Replayed'], 'true')
+        self.assertEqual(TrainingActivity.objects.count(), 1)
+
+    def test_error_response_rolls_back_the_write_and_is_not_stored(self):
+        def write():
+            create_activity(self.fellow)
+            return Response({'detail': 'Rejected after writing.'}, status=409)
+
+        request = mock.Mock(user=self.fellow.user, method='POST', path='/api/activities/logs/', data={})
+        response = idempotency.run_once('activities:create', 'k1', request, write)
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(TrainingActivity.objects.exists())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class DuplicateDetectionTests(TestCase):
+    def setUp(self):
+        buckets.clear()
+        self.fellow = create_fellow('ann@example.com', create_locations())
+
+    def test_normalize_folds_spelling_variants(self):
+        self.assertEqual(normalize('Nyammata '), normalize('nyamata'))
+        self.assertEqual(normalize('Crop-Rotation'), normalize('crop rotation'))
+        self.assertEqual(normalize('Kigalí'), 'kigali')
+        self.assertNotEqual(normalize('Mulching'), normalize('Composting'))
+
+    def test_resubmitted_session_is_a_likely_duplicate(self):
+        original = create_activity(self.fellow, village_name='Nyamata', training_topic='Crop rotation')
+        again = create_activity(self.fellow, village_name='NYAMMATA', training_topic='crop-rotation')
+        other_day = create_activity(self.fellow, date=original.date + timedelta(days=1))
+
+        self.assertEqual(original.fingerprint, again.fingerprint)
+        self.assertEqual(likely_duplicate_ids(again), [original.pk])
+        self.assertEqual(likely_duplicate_ids(other_day), [])
+
+    def test_edit_refreshes_the_fingerprint(self):
+        original = create_activity(self.fellow)
+        edited = create_activity(self.fellow, number_of_farmers_trained=30)
+        edited.number_of_farmers_trained = 20
+        edited.save(update_fields=['number_of_farmers_trained'])
+        self.assertEqual(TrainingActivity.objects.get(pk=edited.pk).fingerprint, original.fingerprint)
+
+    def test_api_create_lists_possible_duplicates(self):
+        original = create_activity(self.fellow)
+        client = APIClient()
+        client.force_authenticate(self.fellow.user)
+        response = client.post('/api/activities/logs/', {
+            'fellow': self.fellow.id, 'date': '2025-01-15', 'sector': original.sector_id, 'village_name': 'nyamata',
+            'training_topic': 'MULCHING', 'training_method': 'workshop', 'duration': '01:00:00',
+            'number_of_farmers_trained': 20,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['possible_duplicates'], [original.pk])
+
+    def test_command_reports_clusters_and_double_counted_farmers(self):
+        create_activity(self.fellow, status='APPROVED')
+        create_activity(self.fellow, status='APPROVED', village_name='Nyamata.')
+        create_activity(self.fellow, village_name='Gahanga')
+        # Written around save(): the command's --refresh recomputes it
+        TrainingActivity.objects.filter(village_name='Gahanga').update(fingerprint='stale')
+
+        out = io.StringIO()
+        call_command('find_duplicate_reports', '--refresh', '--quiet', stdout=out)
+        output = out.getvalue()
+        self.assertIn('Fingerprints updated: 1', output)
+        self.assertIn('Duplicate clusters:       1', output)
+        self.assertIn('Farmers double-counted:   20', output)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.fellow = create_fellow('ann@example.com', create_locations(), status='COMPLETED')
+        self.old = create_activity(self.fellow, date=date(2022, 3, 1))
+        self.old.status = 'APPROVED'
+        self.old.save()
+        self.recent = create_activity(self.fellow, date=date(2025, 3, 1), status='APPROVED')
+        self.cutoff = date(2024, 1, 1)
+
+    def test_union_view_matches_the_model_columns(self):
+        # Fails when a migration changed the tables without recreating the view
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT * FROM {TrainingActivityRecord._meta.db_table} WHERE 1 = 0')
+            columns = [column[0] for column in cursor.description]
+        self.assertEqual(columns, [*archive.COLUMNS, 'archived'])
+
+    def test_archive_moves_closed_reports_and_keeps_totals(self):
+        counters = Fellow.objects.values(*Fellow.COUNTER_FIELDS).get(pk=self.fellow.pk)
+        events = ReviewEvent.objects.filter(activity_id=self.old.pk).count()
+
+        self.assertEqual(archive.archivable_by_year(self.cutoff), {2022: 1})
+        self.assertEqual(archive.archive(self.cutoff), 1)
+
+        self.assertFalse(TrainingActivity.objects.filter(pk=self.old.pk).exists())
+        self.assertEqual(ArchivedTrainingActivity.objects.get().pk, self.old.pk)
+        self.assertEqual(
+            sorted(TrainingActivityRecord.objects.values_list('id', 'archived')),
+            [(self.old.pk, True), (self.recent.pk, False)],
+        )
+        self.assertEqual(ReviewEvent.objects.filter(activity_id=self.old.pk).count(), events)
+        self.assertEqual(Fellow.objects.values(*Fellow.COUNTER_FIELDS).get(pk=self.fellow.pk), counters)
+
+    def test_active_fellows_and_unapproved_reports_stay_hot(self):
+        Fellow.objects.filter(pk=self.fellow.pk).update(status='ACTIVE')
+        self.assertEqual(archive.archive(self.cutoff), 0)
+        Fellow.objects.filter(pk=self.fellow.pk).update(status='COMPLETED')
+        TrainingActivity.objects.filter(pk=self.old.pk).update(status='PENDING')
+        self.assertEqual(archive.archive(self.cutoff), 0)
+
+    def test_restore_moves_reports_back_unchanged(self):
+        archive.archive(self.cutoff)
+        self.assertEqual(archive.restore(), 1)
+        restored = TrainingActivity.objects.get(pk=self.old.pk)
+        self.assertEqual((restored.status, restored.fingerprint), ('APPROVED', self.old.fingerprint))
+        self.assertFalse(ArchivedTrainingActivity.objects.exists())
+
+    def test_deleting_a_report_keeps_its_review_events(self):
+        events = ReviewEvent.objects.filter(activity_id=self.recent.pk)
+        self.assertEqual(events.count(), 1)
+        self.recent.delete()
+        self.assertEqual(events.count(), 1)
+
+    def test_dry_run_changes_nothing(self):
+        out = io.StringIO()
+        call_command('archive_activities', '--before', '2024-01-01', '--dry-run', stdout=out)
+        self.assertIn('2022: 1', out.getvalue())
+        self.assertTrue(TrainingActivity.objects.filter(pk=self.old.pk).exists())
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        buckets.clear()
+        self.fellow = create_fellow('ann@example.com', create_locations())
+        create_activity(self.fellow, date=date(2025, 10, 1), status='APPROVED')
+        create_activity(self.fellow, date=date(2025, 12, 31), status='APPROVED', number_of_farmers_trained=5)
+        self.late = create_activity(self.fellow, date=date(2025, 11, 20), village_name='Gahanga')
+        create_activity(self.fellow, date=date(2026, 1, 1), status='APPROVED')  # next quarter
+        self.today = date(2026, 1, 5)
+
+    def test_period_bounds(self):
+        self.assertEqual(period_bounds('2025-Q4'), (date(2025, 10, 1), date(2025, 12, 31)))
+        self.assertEqual(period_bounds('2025-12'), (date(2025, 12, 1), date(2025, 12, 31)))
+        self.assertEqual(period_bounds('2025-Q1'), (date(2025, 1, 1), date(2025, 3, 31)))
+        self.assertEqual(period_bounds('2024-02'), (date(2024, 2, 1), date(2024, 2, 29)))
+        self.assertEqual(period_bounds('2025'), (date(2025, 1, 1), date(2025, 12, 31)))
+        for label in ('2025-Q5', '2025-13', '2025-00', 'Q4-2025', ''):
+            with self.assertRaises(ValueError):
+                period_bounds(label)
+
+    def test_previous_quarter(self):
+        self.assertEqual(previous_quarter(date(2026, 2, 10)), '2025-Q4')
+        self.assertEqual(previous_quarter(date(2026, 4, 1)), '2026-Q1')
+
+    def test_freeze_counts_the_whole_period_once(self):
+        snapshot = freeze('2025-Q4', today=self.today)
+        self.assertEqual(snapshot.data['totals']['sessions'], 2)  # both bounds, approved only
+        self.assertEqual(snapshot.data['totals']['farmers'], 25)
+        self.assertEqual(freeze('2025-12', today=self.today).data['totals']['farmers'], 5)
+        self.assertTrue(verify(snapshot))
+
+        with self.assertRaisesMessage(ValueError, 'already frozen'):
+            freeze('2025-Q4', today=self.today)
+        with self.assertRaisesMessage(ValueError, 'only closed periods'):
+            freeze('2026-Q1', today=self.today)
+
+    def test_snapshots_cannot_be_changed(self):
+        snapshot = freeze('2025-Q4', today=self.today)
+        snapshot.label = '2025-Q3'
+        with self.assertRaisesMessage(ValueError, 'immutable'):
+            snapshot.save()
+        with self.assertRaisesMessage(ValueError, 'immutable'):
+            ReportSnapshot.objects.filter(pk=snapshot.pk).update(data={})
+        with self.assertRaisesMessage(ValueError, 'immutable'), transaction.atomic():
+            ReportSnapshot.objects.bulk_update([snapshot], ['label'])
+        self.assertEqual(ReportSnapshot.objects.get().label, '2025-Q4')
+
+    def test_deleting_the_creator_keeps_the_snapshot(self):
+        user = create_user('coordinator@example.com', role='COORDINATOR')
+        freeze('2025-Q4', user=user, today=self.today)
+        user.delete()  # SET_NULL is an UPDATE outside the queryset API
+        self.assertIsNone(ReportSnapshot.objects.get().created_by_id)
+
+    def test_tampered_document_fails_verification(self):
+        snapshot = freeze('2025-Q4', today=self.today)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {ReportSnapshot._meta.db_table} SET data = %s WHERE id = %s',
+                ['{"totals": {}}', snapshot.pk],
+            )
+        self.assertFalse(verify(ReportSnapshot.objects.get()))
+
+    def test_diff_lists_changes_since_the_freeze(self):
+        snapshot = freeze('2025-Q4', today=self.today)
+        self.assertEqual(diff(snapshot), [])
+
+        self.late.status = 'APPROVED'
+        self.late.save()
+        changes = {path: (frozen, live) for path, frozen, live in diff(snapshot)}
+        self.assertEqual(changes['totals.sessions'], (2, 3))
+        self.assertEqual(changes['totals.farmers'], (25, 45))
+        self.assertEqual(snapshot.data['totals']['farmers'], 25)  # the stored document is unchanged
+
+    def test_api_serves_the_document_with_its_hash_as_etag(self):
+        snapshot = freeze('2025-Q4', today=self.today)
+        client = APIClient()
+        client.force_authenticate(create_user('coordinator@example.com', role='COORDINATOR'))
+        response = client.get(f'/api/activities/snapshots/{snapshot.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], f'"{snapshot.content_hash}"')
+        self.assertEqual(response.json()['totals']['farmers'], 25)
+        response = client.get(f'/api/activities/snapshots/{snapshot.pk}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_admin_is_read_only(self):
+        freeze('2025-Q4', today=self.today)
+        self.client.force_login(create_user('admin@example.com', is_staff=True, is_superuser=True))
+        response = self.client.get('/admin/activities/reportsnapshot/', SERVER_NAME='localhost')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'name="action"')
+        self.assertNotContains(response, 'Add report snapshot')
+
+
+class AdminChangelistTests(TestCase):
+    """Every changelist stays within its changelist_query_budget however many rows it shows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        sectors = [create_locations(f'Sector {i}', f'District {i % 6}', f'Province {i % 3}') for i in range(12)]
+        mentors = [create_mentor(f'mentor{i}@example.com') for i in range(5)]
+        fellows = [create_fellow(f'fellow{i}@example.com', sectors[i % 12], mentors[i % 5]) for i in range(30)]
+        activities = [create_activity(fellows[i % 30], village_name=f'Village {i}') for i in range(60)]
+        review_pending([activity.id for activity in activities[:30]], 'APPROVED', mentors[0].user)
+        freeze('2025-01', today=date(2026, 1, 1))
+        freeze('2025-Q1', today=date(2026, 1, 1))
+        cls.superuser = create_user('root', role='ADMIN', is_staff=True, is_superuser=True)
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+
+    def test_changelists_within_budget(self):
+        for model, model_admin in admin.site._registry.items():
+            budget = getattr(model_admin, 'changelist_query_budget', None)
+            if budget is None:
+                continue
+            opts = model._meta
+            url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+            with self.subTest(model=opts.label):
+                self.client.get(url, SERVER_NAME='localhost')  # fills the cached choice lists
+                with self.assertNumQueries(budget):
+                    response = self.client.get(url, SERVER_NAME='localhost')
+                self.assertEqual(response.status_code, 200)
+
+    def test_filtered_changelist_within_budget(self):
+        url = reverse('admin:activities_trainingactivity_changelist')
+        self.client.get(url, SERVER_NAME='localhost')
+        with self.assertNumQueries(admin.site._registry[TrainingActivity].changelist_query_budget):
+            response = self.client.get(url, {'status__exact': 'APPROVED'}, SERVER_NAME='localhost')
+        self.assertEqual(response.context['cl'].result_count, 30)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        sector = create_locations()
+        fellow = create_fellow('ann@example.com', sector)
+        for status in ('PENDING', 'APPROVED', 'APPROVED'):
+            create_activity(fellow, status=status)
+
+    def count(self, queryset, estimate):
+        with mock.patch.object(admin_utils, 'estimate_row_count', return_value=estimate) as estimated:
+            count = admin_utils.EstimatedCountPaginator(queryset, 10).count
+        return count, estimated.called
+
+    def test_unfiltered_large_table_is_estimated(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.count(TrainingActivity.objects.all(), 250000), (250000, True))
+
+    def test_small_or_unknown_estimates_count_exactly(self):
+        self.assertEqual(self.count(TrainingActivity.objects.all(), 500), (3, True))
+        self.assertEqual(self.count(TrainingActivity.objects.all(), None), (3, True))
+
+    def test_filtered_queryset_counts_exactly(self):
+        with self.assertNumQueries(1):
+            count = self.count(TrainingActivity.objects.filter(status='APPROVED'), 250000)
+        self.assertEqual(count, (2, False))
+
+    def test_sqlite_has_no_estimate(self):
+        if connection.vendor == 'sqlite':
+            self.assertIsNone(admin_utils.estimate_row_count(TrainingActivity))
+
+
+class ChoicesCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.sector = create_locations()
+        self.mentor = create_mentor('mentor@example.com', first_name='Jean', last_name='M')
+
+    def warm(self):
+        return (choices.sector_options(), choices.district_options(), choices.mentor_options(),
+                choices.sector_rows(), choices.district_rows())
+
+    def test_warm_options_cost_no_query(self):
+        self.warm()
+        with self.assertNumQueries(0):
+            sectors, districts, mentors, _, _ = self.warm()
+            choices.sector_options(district_id=self.sector.district_id)
+            choices.district_options(province_id=self.sector.district.province_id)
+        self.assertEqual(sectors.choices, [(self.sector.id, 'Gitega Sector')])
+        self.assertEqual(districts.choices, [(self.sector.district_id, 'Nyarugenge (Kigali)')])
+        self.assertEqual(mentors.choices, [(self.mentor.id, 'Mentor: Jean M')])
+
+    def test_cached_field_renders_without_queries(self):
+        field = choices.CachedModelChoiceField(choices.sector_options, queryset=Sector.objects.all())
+        self.warm()
+        with self.assertNumQueries(0):
+            html = field.widget.render('sector', self.sector.id)
+        self.assertIn(f'<option value="{self.sector.id}" selected>Gitega Sector</option>', html)
+
+    def test_location_change_invalidates_the_lists(self):
+        self.warm()
+        district = self.sector.district
+        district.name = 'Kicukiro'
+        district.save()
+        create_locations('Kimisagara', 'Kicukiro')
+
+        self.assertEqual([label for _, label in choices.sector_options().choices],
+                         ['Gitega Sector', 'Kimisagara Sector'])
+        self.assertEqual(choices.district_options().choices, [(district.id, 'Kicukiro (Kigali)')])
+        self.assertEqual(len(choices.sector_rows(district_id=district.id)), 2)
+
+    def test_mentor_change_invalidates_the_list(self):
+        self.warm()
+        self.mentor.user.first_name = 'Joseph'
+        self.mentor.user.save()
+        self.assertEqual(choices.mentor_options().choices, [(self.mentor.id, 'Mentor: Joseph M')])
+
+        create_mentor('other@example.com', first_name='Alice', last_name='A')
+        self.assertEqual(len(choices.mentor_options()), 2)
+
+
+class VersionedCacheTagTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.renders = 0
+
+    def render_count(self):
+        self.renders += 1
+        return self.renders
+
+    def render(self, source, **context):
+        template = Template('{% load fragment_cache %}' + source)
+        return template.render(Context({'render_count': self.render_count, **context}))
+
+    def test_served_from_cache_until_the_version_changes(self):
+        source = "{% versioned_cache 'totals' 'activities' role %}[{{ render_count }}]{% endversioned_cache %}"
+        self.assertEqual(self.render(source, role='MENTOR'), '[1]')
+        self.assertEqual(self.render(source, role='MENTOR'), '[1]')
+        # Other vary-on values get their own fragment
+        self.assertEqual(self.render(source, role='FELLOW'), '[2]')
+
+        bump_data_version('activities')
+        self.assertEqual(self.render(source, role='MENTOR'), '[3]')
+        self.assertEqual(self.render(source, role='MENTOR'), '[3]')
+
+        series = metrics.snapshot('fragment_render_ms')['fragment_render_ms']
+        self.assertEqual((series['totals miss']['count'], series['totals hit']['count']), (3, 2))
+
+    def test_fellow_fragments_follow_their_fellow(self):
+        fellow = create_fellow('ann@example.com', create_locations())
+        other = create_fellow('bob@example.com', create_locations())
+        source = ("{% versioned_cache 'dashboard' fellow_id|fellow_dataset %}"
+                  "[{{ render_count }}]{% endversioned_cache %}")
+        self.assertEqual(self.render(source, fellow_id=fellow.pk), '[1]')
+        self.assertEqual(self.render(source, fellow_id=other.pk), '[2]')
+
+        other.university = 'UR Huye'
+        other.save()
+        self.assertEqual(self.render(source, fellow_id=fellow.pk), '[1]')
+        self.assertEqual(self.render(source, fellow_id=other.pk), '[3]')
+
+    def test_dataset_is_required(self):
+        with self.assertRaises(TemplateSyntaxError):
+            self.render("{% versioned_cache 'totals' %}x{% endversioned_cache %}")
@@ -16,5 +16,6 @@ urlpatterns = [
     
     # --- 3. Reporting (HTML/File Downloads) ---
     path('summary/', views.impact_summary, name='impact_summary'),
+    path('summary/async/', views.impact_summary_async, name='impact_summary_async'),
     path('export/csv/', views.export_activities_csv, name='api-export-csv'),
 ]
\ No newline at end of file
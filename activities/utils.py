@@ -1,35 +1,33 @@
-from django.db.models import Sum, Count
-from django.db.models.functions import TruncMonth 
-from .models import TrainingActivity
+from django.core.cache import cache
+
+from .analytics import build_program_metrics, program_metrics_queries, run_queries
+
+
+# --- DATA VERSIONS ---
+# A counter per dataset ('fellows', 'activities', ...) bumped on every write.
+# Cached results embed the version in their key, so a write makes them unreachable
+# (no need to track and delete individual keys).
+
+DATA_VERSION_KEY = 'data_version:{}'
+
+def get_data_version(name):
+    """Returns the current version number of a dataset (starts at 1)."""
+    return cache.get_or_set(DATA_VERSION_KEY.format(name), 1, timeout=None)
+
+def bump_data_version(name):
+    """Invalidates every cache entry built from this dataset."""
+    key = DATA_VERSION_KEY.format(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Key missing (first write or evicted): restart from a fresh value
+        cache.set(key, 2, timeout=None)
+
+def fellow_dataset(fellow_id):
+    """Dataset name for one fellow's activities and counters (dashboard fragments)."""
+    return f'fellow:{fellow_id}'
+
 
 def get_program_metrics():
-    approved_activities = TrainingActivity.objects.filter(status='APPROVED')
-    
-    # --- Monthly Trends for Chart.js ---
-    # Grouping by month and summing farmers
-    monthly_trends = list(approved_activities.annotate(
-        month=TruncMonth('date')
-    ).values('month').annotate(
-        total=Sum('number_of_farmers_trained')
-    ).order_by('month'))
-
-    return {
-        'total_farmers': approved_activities.aggregate(
-            Sum('number_of_farmers_trained')
-        )['number_of_farmers_trained__sum'] or 0,
-        
-        'total_sessions': approved_activities.count(),
-        
-        'active_sectors_count': approved_activities.values('sector').distinct().count(),
-        
-        'province_reach': list(approved_activities.values(
-            'sector__district__province__name'
-        ).annotate(
-            total_farmers=Sum('number_of_farmers_trained'),
-            session_count=Count('id')
-        ).order_by('-total_farmers')),
-
-        # --- New Fields for API/Charts ---
-        'chart_labels': [item['month'].strftime('%b %Y') for item in monthly_trends],
-        'chart_values': [item['total'] for item in monthly_trends],
-    }
\ No newline at end of file
+    """Program-wide approved-activity metrics (queries live in activities/analytics.py)."""
+    return build_program_metrics(run_queries(program_metrics_queries()))
@@ -1,46 +1,55 @@
-import csv
+from django.core.paginator import Paginator
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.db.models import Sum, Count, Q, Avg, Case, When, Value, IntegerField
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
+from django.utils.functional import SimpleLazyObject
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 
 # DRF Imports
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 
 # Models, Forms, and Serializers
-from .models import TrainingActivity
+from .models import ReportSnapshot, TrainingActivity, TrainingActivityRecord
 from .forms import ActivityReportForm
-from .serializers import TrainingActivitySerializer
-from .permissions import IsOwnerOrMentor
+from .serializers import BulkReviewSerializer, TrainingActivitySerializer, TrainingActivityListReader
+from .fieldsets import FieldsetViewMixin
+from .filters import TrainingActivityFilter
+from .metrics import metrics
+from .exports import filtered_activities, write_activities_csv
+from .analytics import (
+    arun_queries, run_queries,
+    impact_summary_queries, build_impact_summary,
+    program_metrics_queries, build_program_metrics,
+)
+from .permissions import IsOwnerOrMentor, IsReviewer
+from .reviews import GROUPINGS, latency_report, review_pending
+from .idempotency import idempotent
+from .duplicates import duplicates_of, has_likely_duplicate, likely_duplicate_ids
+from accounts.roles import get_user_role
+from accounts.authentication import aauthenticate_api_request
+from accounts.throttling import AnalyticsRateThrottle, athrottle_wait, throttle_view, throttled_response
 from locations.models import Sector, Village 
 from fellows.models import Fellow 
 from locations.models import District  
+from mentors.models import Mentor
 
 # --- 1. HELPER: MENTOR/COORDINATOR CHECK ---
 
 def is_mentor(user):
     """
     Gatekeeper: Returns True if the user is an Admin, Mentor, or Coordinator.
+    Reads the request-scoped role (staff flags, Mentor profile and UserProfile
+    role are resolved together in one query).
     """
-    if not user.is_authenticated:
-        return False
-        
-    # 1. Check for Django Admin (is_staff/is_superuser)
-    if user.is_staff or user.is_superuser:
-        return True
-        
-    # 2. Check for Mentor profile
-    if hasattr(user, 'mentor'):
-        return True
-        
-    # 3. Check for Coordinator role in UserProfile
-    if hasattr(user, 'userprofile') and user.userprofile.role in ['ADMIN', 'COORDINATOR']:
-        return True
-        
-    return False
+    return get_user_role(user).is_mentor
 
 # --- 2. FELLOW WEB VIEWS (HTML) ---
 
@@ -63,9 +72,8 @@ def fellow_dashboard_view(request):
     ).order_by('status_priority', '-date')
 
     context = {
-        'total_trained': activities.filter(status='APPROVED').aggregate(
-            Sum('number_of_farmers_trained')
-        )['number_of_farmers_trained__sum'] or 0,
+        # Denormalized counter on Fellow (see activities/counters.py)
+        'total_trained': fellow_profile.farmers_trained,
         'recent_activities': activities[:10],
         'fellow': fellow_profile
     }
@@ -87,8 +95,16 @@ def submit_activity_view(request):
             activity.sector = fellow_profile.assigned_sector
             
             if activity.sector:
+                activity.review_actor = request.user  # recorded on the review event
                 activity.save()
                 messages.success(request, "Training activity submitted successfully!")
+                # Same fellow, date, village, topic and farmers (fingerprint index lookup)
+                duplicate_ids = likely_duplicate_ids(activity)
+                if duplicate_ids:
+                    messages.warning(request, (
+                        "This looks like a report you already submitted (#{}). "
+                        "It is flagged for your mentor as a possible duplicate."
+                    ).format(', #'.join(map(str, duplicate_ids))))
                 return redirect('all_activities')
             else:
                 messages.error(request, "Your account has no assigned sector. Contact an Admin.")
@@ -116,6 +132,7 @@ def edit_report_view(request, pk):
                 updated_report.status = 'PENDING'
                 updated_report.is_resubmitted = True
             
+            updated_report.review_actor = request.user  # recorded on the review event
             updated_report.save()
             messages.success(request, "Report updated and resubmitted!")
             return redirect('all_activities')
@@ -128,11 +145,45 @@ def edit_report_view(request, pk):
         'report': report 
     })
 
+# Allowed ?sort= values for HTML activity tables (backed by the (fellow|status, -date) indexes)
+ACTIVITY_SORTS = {
+    '-date': ('-date', '-id'),
+    'date': ('date', 'id'),
+}
+
 @login_required
 def all_activities_view(request):
-    """Tabular list of all activities for the logged-in Fellow."""
-    activities = TrainingActivity.objects.filter(fellow__user=request.user).order_by('-date')
-    return render(request, 'activities/all_activities.html', {'activities': activities})
+    """
+    Paginated list of the logged-in Fellow's activities.
+    Supports ?q= (topic/village), ?status=, ?sort= and ?page=; ?partial=1 renders only the table.
+    """
+    role = get_user_role(request.user)
+    activities = TrainingActivity.objects.filter(fellow_id=role.fellow_id).only(
+        'id', 'date', 'village_name', 'training_topic', 'status'
+    )
+
+    search = request.GET.get('q', '').strip()
+    status = request.GET.get('status')
+    if search:
+        activities = activities.filter(
+            Q(training_topic__icontains=search) | Q(village_name__icontains=search)
+        )
+    if status in TrainingActivity.Status.values:
+        activities = activities.filter(status=status)
+
+    sort = request.GET.get('sort', '-date')
+    activities = activities.order_by(*ACTIVITY_SORTS.get(sort, ACTIVITY_SORTS['-date']))
+
+    page_obj = Paginator(activities, 20).get_page(request.GET.get('page'))
+    context = {
+        'activities': page_obj,
+        'page_obj': page_obj,
+        'status_choices': TrainingActivity.Status.choices,
+    }
+
+    if request.GET.get('partial'):
+        return render(request, 'activities/_activity_table.html', context)
+    return render(request, 'activities/all_activities.html', context)
 
 @login_required
 def activity_detail_view(request, pk):
@@ -150,12 +201,54 @@ def activity_detail_view(request, pk):
 @login_required
 @user_passes_test(is_mentor)
 def mentor_dashboard_view(request):
-    """Review dashboard for Mentors to see PENDING logs."""
-    pending_reports = TrainingActivity.objects.filter(status='PENDING').order_by('-date')
-    return render(request, 'activities/mentor_dashboard.html', {
-        'pending_reports': pending_reports,
-        'total_pending': pending_reports.count(),
+    """
+    Review dashboard for Mentors to see PENDING logs (paginated).
+    Supports ?q= (fellow name/topic), ?district=, ?mentor=, ?sort= and ?page=;
+    ?partial=1 renders only the pending table.
+    """
+    pending_reports = TrainingActivity.objects.filter(status='PENDING').select_related(
+        'fellow__user', 'sector__district'
+    ).only(
+        'id', 'date', 'training_topic',
+        'fellow__user__first_name', 'fellow__user__last_name', 'fellow__user__email',
+        'sector__district__name',
+    ).annotate(likely_duplicate=has_likely_duplicate())
+
+    search = request.GET.get('q', '').strip()
+    district_id = request.GET.get('district')
+    mentor_id = request.GET.get('mentor')
+
+    if search:
+        pending_reports = pending_reports.filter(
+            Q(training_topic__icontains=search)
+            | Q(fellow__user__first_name__icontains=search)
+            | Q(fellow__user__last_name__icontains=search)
+        )
+    if district_id and district_id.isdigit():
+        pending_reports = pending_reports.filter(sector__district_id=district_id)
+    if mentor_id and mentor_id.isdigit():
+        pending_reports = pending_reports.filter(fellow__mentor_id=mentor_id)
+
+    sort = request.GET.get('sort', '-date')
+    pending_reports = pending_reports.order_by(*ACTIVITY_SORTS.get(sort, ACTIVITY_SORTS['-date']))
+
+    page_obj = Paginator(pending_reports, 20).get_page(request.GET.get('page'))
+    context = {
+        'pending_reports': page_obj,
+        'page_obj': page_obj,
+        'total_pending': page_obj.paginator.count,
+    }
+
+    if request.GET.get('partial'):
+        return render(request, 'activities/_pending_table.html', context)
+
+    context.update({
+        'districts': District.objects.only('id', 'name').order_by('name'),
+        'mentors': Mentor.objects.select_related('user').only(
+            'id', 'user__first_name', 'user__last_name'
+        ).order_by('user__last_name'),
     })
+    return render(request, 'activities/mentor_dashboard.html', context)
 
 @login_required
 @user_passes_test(is_mentor)
@@ -181,145 +274,154 @@ def review_report_view(request, pk):
             # If rejected/revision, clear approval metadata so it doesn't show in CSV
             activity.approved_by = None
             
+        activity.review_actor = request.user  # recorded on the review event
         activity.save()
         return redirect('mentor_dashboard')
-    
-    return render(request, 'activities/review_report.html', {'report': activity})
+
+    duplicates = duplicates_of(activity).only('id', 'date', 'status', 'village_name', 'created_at').order_by('id')
+    return render(request, 'activities/review_report.html', {'report': activity, 'duplicates': duplicates})
 
 
 # --- 4. ANALYTICS & CSV EXPORT ---
 
 @login_required
 @user_passes_test(is_mentor)
+@throttle_view('export')
 def export_activities_csv(request):
-    # 1. Start with all activities and optimize for performance
-    # select_related('approved_by') pulls the User object who reviewed the report
-    activities = TrainingActivity.objects.all().select_related(
-        'fellow__user', 
-        'sector__district__province',
-        'approved_by'
-    )
+    # Same rows as the background export task (activities/exports.py)
+    activities = filtered_activities(request.GET.get('search'), request.GET.get('district'))
 
-    # 2. CAPTURE ACTIVE FILTERS (Matches Impact Summary View)
-    search_query = request.GET.get('search')
-    district_id = request.GET.get('district')
-
-    if search_query:
-        activities = activities.filter(training_topic__icontains=search_query)
-    
-    if district_id:
-        activities = activities.filter(sector__district_id=district_id)
-
-    # 3. Apply Final Ordering
-    activities = activities.order_by('-date')
-    
-    # 4. Create CSV Response
     response = HttpResponse(content_type='text/csv')
     response['Content-Disposition'] = 'attachment; filename="b2r_filtered_impact_report.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'Fellow Name', 'Date', 'Topic', 'Province', 'District', 'Sector', 
-        'Village', 'Farmers Trained', 'Duration', 'Status', 
-        'Approved By (Name)', 'Approved By (Email)', 
-        'Challenges', 'Success Stories', 'Mentor Comments'
-    ])
-    
-    for activity in activities:
-        # Resolve village name based on approval status
-        village_display = activity.verified_village if activity.status == 'APPROVED' and activity.verified_village else activity.village_name
-        
-        # Pull Mentor Details correctly
-        
-        mentor_name = activity.approved_by.get_full_name() if activity.approved_by else "Pending"
-        mentor_email = activity.approved_by.email if activity.approved_by else "N/A"
-
-        writer.writerow([
-            activity.fellow.user.get_full_name(),
-            activity.date,
-            activity.training_topic,
-            activity.sector.district.province.name if activity.sector.district.province else "N/A",
-            activity.sector.district.name,
-            activity.sector.name,
-            village_display,
-            activity.number_of_farmers_trained,
-            activity.duration,
-            activity.get_status_display(),
-            mentor_name,
-            mentor_email,
-            activity.challenges_notes or "",
-            activity.success_stories or "",
-            activity.mentor_comments or ""
-        ])
-        
+    write_activities_csv(response, activities)
     return response
 
 @login_required
 def impact_summary(request):
     """HTML page showing filtered high-level program statistics."""
-    approved_data = TrainingActivity.objects.filter(status='APPROVED')
-
-    search_query = request.GET.get('search')
-    district_id = request.GET.get('district')
-
-    if search_query:
-        approved_data = approved_data.filter(training_topic__icontains=search_query)
-
-    if district_id:
-        approved_data = approved_data.filter(sector__district_id=district_id)
-
-    total_stats = approved_data.aggregate(
-        total_farmers=Sum('number_of_farmers_trained'),
-        total_sessions=Count('id'),
-        avg_reach=Avg('number_of_farmers_trained')
-    )
-
-    topic_data = approved_data.values('training_topic').annotate(
-        total=Count('id')
-    ).order_by('-total')[:5]
-
+    queries = impact_summary_queries(request.GET.get('search'), request.GET.get('district'))
     context = {
-        'total_farmers': total_stats['total_farmers'] or 0,
-        'total_sessions': total_stats['total_sessions'] or 0,
-        'avg_reach': round(total_stats['avg_reach'] or 0, 1),
-        'geographic_data': approved_data.values('sector__district__name').annotate(
-            farmers=Sum('number_of_farmers_trained'),
-            sessions=Count('id')
-        ).order_by('-farmers'),
-        'topic_data': topic_data,
-        'districts': District.objects.all().order_by('name'),
+        # Lazy: the aggregates only run when a cached fragment misses (the page's
+        # fragments are keyed on the 'activities' data version and the filters)
+        'summary': SimpleLazyObject(lambda: build_impact_summary(run_queries(queries))),
+        'districts': District.objects.only('id', 'name').order_by('name'),
     }
     return render(request, 'activities/impact_summary.html', context)
 
 
 # --- 5. REST API VIEWS (JSON) ---
 
-class TrainingActivityViewSet(viewsets.ModelViewSet):
+FELLOW_NAME_SOURCES = {
+    'only': ['fellow', 'fellow__user', 'fellow__user__first_name', 'fellow__user__last_name'],
+    'related': ['fellow__user'],
+}
+
+
+class TrainingActivityViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
+    """
+    /api/activities/logs/
+    Supports sparse fieldsets on list/retrieve, e.g.
+    ?fields=id,date,training_topic,status  and  ?expand=fellow,sector,success_stories
+    Index-backed filters and ordering: see activities/filters.py.
+    Create and bulk review accept an Idempotency-Key header (activities/idempotency.py).
+    """
     serializer_class = TrainingActivitySerializer
     permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TrainingActivityFilter
+
+    # Sparse fieldsets (see activities/fieldsets.py)
+    default_fields = TrainingActivityListReader.DEFAULT_FIELDS
+    expandable_fields = TrainingActivityListReader.EXPANDABLE_FIELDS
+    extra_fields = TrainingActivityListReader.EXTRA_FIELDS
+    # Columns/joins per output field, used to project the retrieve query
+    field_sources = {
+        'fellow': {'only': ['fellow'], 'expanded': {
+            'only': FELLOW_NAME_SOURCES['only'] + ['fellow__university', 'fellow__status'],
+            'related': FELLOW_NAME_SOURCES['related'],
+        }},
+        'fellow_name': FELLOW_NAME_SOURCES,
+        'sector': {'only': ['sector']},
+        'district_name': {
+            'only': ['sector', 'sector__district', 'sector__district__name'],
+            'related': ['sector__district'],
+        },
+        'duration_hours': {'only': ['duration']},
+        'status_label': {'only': ['status']},
+        **{name: {'only': [name]} for name in (
+            'date', 'village_name', 'training_topic', 'training_method', 'duration',
+            'number_of_farmers_trained', 'status', 'is_resubmitted', 'mentor_comments',
+            'photos', 'created_at', 'challenges_notes', 'success_stories', 'verified_village',
+        )},
+    }
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_staff or user.is_superuser or hasattr(user, 'mentor'):
-            return TrainingActivity.objects.all().select_related(
+        role = get_user_role(self.request.user)
+        if role.is_mentor:
+            queryset = TrainingActivity.objects.all().select_related(
                 'fellow__user', 'sector__district'
             ).order_by('-date')
-        return TrainingActivity.objects.filter(fellow__user=user)
+        else:
+            # Fellows only see their own logs (filter on the resolved id, no join on user)
+            queryset = TrainingActivity.objects.filter(fellow_id=role.fellow_id)
+        if self.action == 'retrieve':
+            # Only load the columns/joins the requested fields need
+            queryset = self.project(queryset)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """
+        GET /api/activities/logs/
+        Read-optimized: values() rows + DB-computed names instead of model instances.
+        Same JSON shape as TrainingActivitySerializer; ?fields= also narrows the SELECT.
+        """
+        reader = TrainingActivityListReader(request, self.get_fieldset())
+        rows = reader.get_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(reader.serialize(page))
+        return Response(reader.serialize(rows))
+
+    @idempotent('activities:create')
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        # Likely double submission (web form + app): ids of the reports with the same fingerprint
+        response.data['possible_duplicates'] = self.possible_duplicates
+        return response
 
     def perform_create(self, serializer):
-        # Checks for either fellow or fellow_profile depending on the model setup
-        if hasattr(self.request.user, 'fellow'):
-            serializer.save(fellow=self.request.user.fellow)
-        elif hasattr(self.request.user, 'fellow_profile'):
-            serializer.save(fellow=self.request.user.fellow_profile)
+        # Attach the logged-in Fellow using the request-scoped role
+        role = get_user_role(self.request.user)
+        if role.fellow_id:
+            serializer.save(fellow_id=role.fellow_id)
         else:
             serializer.save()
+        self.possible_duplicates = likely_duplicate_ids(serializer.instance)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsReviewer])
+    @idempotent('activities:review')
+    def review(self, request):
+        """
+        POST /api/activities/logs/review/  (reviewers only)
+        {"ids": [...], "status": "APPROVED" | "REVISION", "mentor_comments": "..."}
+        Reviews the listed reports that are still pending; the others are reported as skipped.
+        """
+        serializer = BulkReviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        reviewed = review_pending(data['ids'], data['status'], request.user, data['mentor_comments'])
+        return Response({
+            'status': data['status'],
+            'reviewed': reviewed,
+            'skipped': sorted(set(data['ids']) - set(reviewed)),
+        })
 
 class ImpactReportDataAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [AnalyticsRateThrottle]
     
     def get(self, request):
-        data = TrainingActivity.objects.filter(status='APPROVED').values(
+        data = TrainingActivityRecord.objects.filter(status='APPROVED').values(
             'sector__district__name'
         ).annotate(
             sessions=Count('id'),
@@ -329,9 +431,10 @@ class ImpactReportDataAPIView(APIView):
 
 class DashboardStatsAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [AnalyticsRateThrottle]
 
     def get(self, request):
-        stats = TrainingActivity.objects.aggregate(
+        stats = TrainingActivityRecord.objects.aggregate(
             pending=Count('id', filter=Q(status='PENDING')),
             total_farmers=Sum('number_of_farmers_trained', filter=Q(status='APPROVED')) or 0
         )
@@ -339,9 +442,10 @@ class DashboardStatsAPIView(APIView):
 
 class FellowPerformanceAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [AnalyticsRateThrottle]
 
     def get(self, request):
-        performance_data = TrainingActivity.objects.filter(status='APPROVED').values(
+        performance_data = TrainingActivityRecord.objects.filter(status='APPROVED').values(
             'fellow__user__first_name', 
             'fellow__user__last_name',
             'fellow__assigned_sector__name' 
@@ -350,4 +454,106 @@ class FellowPerformanceAPIView(APIView):
             session_count=Count('id')
         ).order_by('-total_impact')
 
-        return Response({"leaderboard": list(performance_data)})
\ No newline at end of file
+        return Response({"leaderboard": list(performance_data)})
+
+class ProgramMetricsAPIView(APIView):
+    """GET /api/activities/program-metrics/ - totals, province reach and monthly chart series."""
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [AnalyticsRateThrottle]
+
+    def get(self, request):
+        return Response(build_program_metrics(run_queries(program_metrics_queries())))
+
+
+class ReviewLatencyAPIView(APIView):
+    """
+    GET /api/activities/review-latency/?by=mentor|district  (reviewers only)
+    Time to first review, average queue wait, revision cycles and wait / pending-age
+    histograms per assigned mentor (default) or district, read from the running
+    totals kept by activities/reviews.py (no scan of the review history).
+    """
+    permission_classes = [IsReviewer]
+    throttle_classes = [AnalyticsRateThrottle]
+
+    def get(self, request):
+        by = request.query_params.get('by', 'mentor')
+        if by not in GROUPINGS:
+            raise ValidationError(f"by must be one of: {', '.join(GROUPINGS)}.")
+        return Response({'by': by, 'rows': latency_report(by)})
+
+
+class MetricsAPIView(APIView):
+    """
+    GET /api/activities/metrics/  (staff only)
+    In-process metrics of THIS worker, e.g. payload_bytes per endpoint (full vs sparse)
+    or fragment_render_ms per cached template fragment (hit vs miss).
+    ?metric=<name> returns one metric only; ?reset=1 clears them after reading.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        snapshot = metrics.snapshot(request.query_params.get('metric'))
+        if request.query_params.get('reset') in ('1', 'true'):
+            metrics.reset()
+        return Response(snapshot)
+
+
+class ReportSnapshotListAPIView(APIView):
+    """
+    GET /api/activities/snapshots/
+    Frozen reporting periods (activities/snapshots.py), newest first, without their
+    documents: label, period, content hash.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        rows = ReportSnapshot.objects.values(
+            'id', 'label', 'period_start', 'period_end', 'content_hash', 'schema_version', 'created_at',
+        )
+        return Response({'results': list(rows)})
+
+
+class ReportSnapshotAPIView(APIView):
+    """
+    GET /api/activities/snapshots/<id>/
+    The frozen document of a closed period: one primary-key fetch, no aggregation.
+    The content hash is the ETag, so If-None-Match answers 304 without a body.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        data, content_hash = get_object_or_404(
+            ReportSnapshot.objects.values_list('data', 'content_hash'), pk=pk
+        )
+        etag = f'"{content_hash}"'
+        if request.headers.get('If-None-Match') == etag:
+            return Response(status=304, headers={'ETag': etag})
+        return Response(data, headers={'ETag': etag})
+
+
+# --- 6. ASYNC ANALYTICS (served concurrently under ASGI) ---
+# Same data as impact_summary / ProgramMetricsAPIView, but the independent aggregates
+# run at the same time over separate connections (see activities/analytics.py).
+
+@login_required
+async def impact_summary_async(request):
+    """HTML impact summary; its three aggregates run concurrently."""
+    queries = impact_summary_queries(request.GET.get('search'), request.GET.get('district'))
+    context = {
+        'summary': build_impact_summary(await arun_queries(queries)),
+        'districts': District.objects.only('id', 'name').order_by('name'),
+    }
+    # Template rendering touches request.user_role (ORM), so it runs in the sync thread
+    return await sync_to_async(render)(request, 'activities/impact_summary.html', context)
+
+
+@require_GET
+async def program_metrics_async(request):
+    """GET /api/activities/async/program-metrics/ (session or JWT); five queries run concurrently."""
+    user = await aauthenticate_api_request(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    wait = await athrottle_wait(request, user, 'analytics')
+    if wait:
+        return throttled_response(wait)
+    return JsonResponse(build_program_metrics(await arun_queries(program_metrics_queries())))
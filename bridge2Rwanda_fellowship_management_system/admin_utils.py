@@ -0,0 +1,86 @@
+"""
+Shared helpers that keep admin changelists at a constant number of queries,
+whatever the table size.
+
+- EstimatedCountPaginator: on an unfiltered changelist over a large table, uses the
+  database's row estimate instead of a full COUNT(*) scan.
+- cached_choices_filter(): a related-field sidebar filter whose choices come from a
+  cached option list (activities/choices.py) instead of one query per page, plus
+  one more per choice when __str__ walks a foreign key (District -> province,
+  Mentor -> user).
+
+Usage:
+    class TrainingActivityAdmin(admin.ModelAdmin):
+        paginator = EstimatedCountPaginator
+        show_full_result_count = False
+        list_filter = (('sector__district', cached_choices_filter(district_options)),)
+"""
+
+# bridge2Rwanda_fellowship_management_system/admin_utils.py
+
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+# Below this many (estimated) rows an exact COUNT(*) is cheap and exact
+EXACT_COUNT_BELOW = 10000
+
+
+# --- 1. ESTIMATED COUNTS ---
+
+def estimate_row_count(model, using='default'):
+    """
+    The planner's row estimate for a model's table (no scan), or None when the
+    backend has none (SQLite) or the table was never analysed.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+        params = [connection.ops.quote_name(table)]
+    elif connection.vendor == 'mysql':
+        sql = ('SELECT table_rows FROM information_schema.tables '
+               'WHERE table_schema = DATABASE() AND table_name = %s')
+        params = [table]
+    else:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Counts exactly whenever the changelist is filtered or searched (those counts
+    use the indexes); only the unfiltered first view of a large table is estimated.
+    Pair with ModelAdmin.show_full_result_count = False, which drops the second
+    "N total" COUNT(*) the admin runs on filtered pages.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= EXACT_COUNT_BELOW:
+                return estimate
+        return super().count
+
+
+# --- 2. SIDEBAR FILTERS ---
+
+def cached_choices_filter(provider):
+    """A RelatedFieldListFilter whose choices are provider().choices (no query when cached)."""
+
+    class CachedChoicesFieldListFilter(admin.RelatedFieldListFilter):
+
+        def field_choices(self, field, request, model_admin):
+            return provider().choices
+
+    return CachedChoicesFieldListFilter
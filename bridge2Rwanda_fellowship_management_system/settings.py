@@ -49,6 +49,7 @@ INSTALLED_APPS = [
     'crispy_forms',
     'crispy_bootstrap5',
     'rest_framework_simplejwt.token_blacklist',
+    'django_filters',
     
     # My Capstone apps
     'accounts.apps.AccountsConfig',
@@ -56,16 +57,19 @@ INSTALLED_APPS = [
     'fellows.apps.FellowsConfig',
     'activities.apps.ActivitiesConfig',
     'mentors',
+    'taskqueue.apps.TaskqueueConfig',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'activities.middleware.PayloadSizeMiddleware',  # X-Payload-Bytes + per-endpoint size metrics
     'whitenoise.middleware.WhiteNoiseMiddleware',  # ADDED: Serves static files in production
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware', # Ensure CORS is handled
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.UserRoleMiddleware',  # Resolves role/fellow/mentor once per request
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -99,6 +103,57 @@ DATABASES = {
     )
 }
 
+# --- ASYNC ANALYTICS ---
+# Worker threads (= extra DB connections per process) used by the async analytics
+# views to run independent aggregates concurrently (activities/analytics.py).
+ANALYTICS_QUERY_WORKERS = int(os.environ.get('ANALYTICS_QUERY_WORKERS', 8))
+
+# --- CACHE ---
+# Local memory by default. With several gunicorn workers, point this at a shared
+# backend (e.g. CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache,
+# CACHE_LOCATION=b2r_cache after `manage.py createcachetable`) so data-version
+# invalidation is seen by every worker.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'b2r-fms'),
+    }
+}
+
+# Upper bound for the cached location hierarchy (locations/utils.py): how long a
+# worker may serve it after a location edit made in another worker (LocMemCache
+# is per process; a shared backend sees the 'locations' version bump at once).
+LOCATION_CACHE_TIMEOUT = int(os.environ.get('LOCATION_CACHE_TIMEOUT', 300))
+
+# Upper bound for {% versioned_cache %} template fragments (activities/templatetags).
+# Fragments are invalidated by data-version bumps; the timeout only caps memory use.
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', 24 * 3600))
+
+# --- Email & Notification Outbox (activities/outbox.py) ---
+# Review notifications are queued in the outbox and sent as digests by
+# `python manage.py dispatch_notifications`; nothing is sent on the request path.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False').lower() == 'true'
+EMAIL_FILE_PATH = os.environ.get('EMAIL_FILE_PATH', BASE_DIR / 'sent_emails')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'B2R Fellowship <no-reply@bridge2rwanda.org>')
+# Public base URL for links in emails (e.g. the set-password link of account invitations)
+SITE_URL = os.environ.get('SITE_URL', 'http://localhost:8000')
+# Failed sends are retried after 1, 2, 4, ... x the base delay (capped), then given up
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 6))
+OUTBOX_RETRY_BASE_SECONDS = int(os.environ.get('OUTBOX_RETRY_BASE_SECONDS', 60))
+OUTBOX_RETRY_MAX_SECONDS = int(os.environ.get('OUTBOX_RETRY_MAX_SECONDS', 3600))
+
+# --- Background Tasks (taskqueue app) ---
+# Tasks are stored in the database and run by `python manage.py run_task_worker`.
+# Eager mode runs them in-process at enqueue time (tests, local development).
+TASKQUEUE_EAGER = os.environ.get('TASKQUEUE_EAGER', 'False').lower() == 'true'
+# Default seconds a claimed task may run before it is considered lost and retried
+TASKQUEUE_LEASE_SECONDS = int(os.environ.get('TASKQUEUE_LEASE_SECONDS', 15 * 60))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -131,12 +186,47 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWT auth that builds the user from signed role claims on read-only requests
+        'accounts.authentication.RoleClaimsJWTAuthentication',
+    ),
+    # Per-role token buckets (accounts/throttling.py); rates in API_THROTTLE_RATES
+    'DEFAULT_THROTTLE_CLASSES': (
+        'accounts.throttling.RoleRateThrottle',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10
 }
 
+# --- API Throttling (accounts/throttling.py) ---
+# 'N/period' = a burst of N requests, refilled at N per period; None = unthrottled.
+# Buckets are per worker process. ANON is keyed by client IP.
+API_THROTTLE_ENABLED = os.environ.get('API_THROTTLE_ENABLED', 'True').lower() == 'true'
+API_THROTTLE_RATES = {
+    'api': {
+        'ADMIN': None, 'COORDINATOR': '600/min', 'MENTOR': '300/min',
+        'FELLOW': '120/min', 'VIEWER': '60/min', 'ANON': '30/min',
+    },
+    # Dashboard, impact, leaderboard, program metrics, review latency, sector coverage
+    'analytics': {
+        'ADMIN': None, 'COORDINATOR': '60/min', 'MENTOR': '30/min',
+        'FELLOW': '20/min', 'VIEWER': '20/min', 'ANON': '5/min',
+    },
+    'export': {
+        'ADMIN': '30/hour', 'COORDINATOR': '20/hour', 'MENTOR': '10/hour',
+        'FELLOW': '5/hour', 'VIEWER': '5/hour', 'ANON': '1/hour',
+    },
+}
+# Trusted reverse proxies in front of the app (X-Forwarded-For hops); 0 = use REMOTE_ADDR
+API_THROTTLE_NUM_PROXIES = int(os.environ.get('API_THROTTLE_NUM_PROXIES', '0'))
+
+# --- Idempotency Keys (activities/idempotency.py) ---
+# Hours a stored response is replayed for a retried create/review with the same key
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+
+# --- Activity Archive (activities/archive.py) ---
+# Approved reports of COMPLETED fellows older than this move to the archive table
+ACTIVITY_ARCHIVE_AFTER_DAYS = int(os.environ.get('ACTIVITY_ARCHIVE_AFTER_DAYS', 2 * 365))
+
 # --- JWT Settings ---
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
@@ -144,8 +234,29 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY, 
+    # Embed role, fellow_id and mentor_id claims; re-resolved on every refresh/rotation
+    "TOKEN_OBTAIN_SERIALIZER": "accounts.tokens.RoleTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "accounts.tokens.RoleTokenRefreshSerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "accounts.tokens.FilteredTokenBlacklistSerializer",
 }
 
+# --- Token Blacklist Filter (accounts/blacklist.py) ---
+# Max seconds before this worker sees tokens blacklisted by another worker (0 = always check)
+TOKEN_BLACKLIST_FILTER_SYNC_SECONDS = int(os.environ.get('TOKEN_BLACKLIST_FILTER_SYNC_SECONDS', '5'))
+# Ids below the last seen one re-scanned on each sync (rows committed out of id order)
+TOKEN_BLACKLIST_FILTER_SYNC_OVERLAP = int(os.environ.get('TOKEN_BLACKLIST_FILTER_SYNC_OVERLAP', '1000'))
+TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS = 3600
+TOKEN_BLACKLIST_FILTER_ERROR_RATE = 0.001
+
+# --- Role Resolution ---
+# Seconds a resolved role (role, fellow_id, mentor_id) is shared across requests.
+# 0 disables the cross-request cache; roles are then resolved once per request.
+ROLE_CACHE_TIMEOUT = int(os.environ.get('ROLE_CACHE_TIMEOUT', '0'))
+# Stateless JWT reads check the account is still active through a cache entry of
+# this lifetime: a deactivation in another worker takes effect within it
+# (immediately in the worker that saved the user).
+ACCOUNT_STATE_CACHE_SECONDS = int(os.environ.get('ACCOUNT_STATE_CACHE_SECONDS', '30'))
+
 # --- Authentication Redirect Settings ---
 LOGIN_REDIRECT_URL = 'smart_redirect'
 LOGOUT_REDIRECT_URL = 'login' 
@@ -0,0 +1,81 @@
+"""
+Shared fixtures for the app test suites (`python manage.py test`).
+
+Users are inserted with bulk_create, which sends no post_save: the two
+profile-creating User receivers (accounts/models.py and accounts/signals.py)
+would otherwise both insert a UserProfile for the same user. The profile, and
+the Fellow or Mentor row when needed, are created explicitly instead.
+
+Usage:
+    from bridge2Rwanda_fellowship_management_system.test_utils import (
+        create_user, create_locations, create_fellow, create_mentor, create_activity,
+    )
+
+    sector = create_locations()
+    fellow = create_fellow('ann@example.com', sector)
+"""
+
+# bridge2Rwanda_fellowship_management_system/test_utils.py
+
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+
+from accounts.models import UserProfile
+from fellows.models import Fellow
+from locations.models import District, Province, Sector
+from mentors.models import Mentor
+
+
+def create_user(username, role='FELLOW', password='pw', **fields):
+    user = User(username=username, email=fields.pop('email', username), **fields)
+    user.set_password(password)
+    User.objects.bulk_create([user])
+    user = User.objects.get(username=username)
+    UserProfile.objects.create(user=user, role=role)
+    return user
+
+
+def create_locations(sector_name='Gitega', district_name='Nyarugenge', province_name='Kigali'):
+    """One Province > District > Sector branch (reused when the names already exist); returns the sector."""
+    province, _ = Province.objects.get_or_create(name=province_name, defaults={'code': province_name[:4]})
+    district, _ = District.objects.get_or_create(
+        name=district_name, province=province, defaults={'code': district_name[:6]},
+    )
+    sector, _ = Sector.objects.get_or_create(name=sector_name, district=district, defaults={'code': sector_name[:6]})
+    return sector
+
+
+def create_mentor(username, **fields):
+    user = create_user(username, role='MENTOR', **fields)
+    return Mentor.objects.create(user=user, organization='B2R', expertise_area='Agronomy', phone_number='0788000000')
+
+
+def create_fellow(username, sector, mentor=None, **fields):
+    user = create_user(username, first_name=fields.pop('first_name', 'Ann'), last_name=fields.pop('last_name', 'F'))
+    return Fellow.objects.create(
+        user=user,
+        assigned_sector=sector,
+        mentor=mentor,
+        university='UR',
+        degree_field='Agronomy',
+        graduation_year=2022,
+        fellowship_start_date=date(2024, 1, 1),
+        **fields
+    )
+
+
+def create_activity(fellow, **fields):
+    from activities.models import TrainingActivity
+
+    values = {
+        'date': date(2025, 1, 15),
+        'sector': fellow.assigned_sector,
+        'village_name': 'Nyamata',
+        'number_of_farmers_trained': 20,
+        'training_topic': 'Mulching',
+        'training_method': 'workshop',
+        'duration': timedelta(hours=1),
+    }
+    values.update(fields)
+    return TrainingActivity.objects.create(fellow=fellow, **values)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, reverse_lazy
 from django.contrib.auth import views as auth_views
 from django.conf import settings
 from django.conf.urls.static import static
@@ -15,6 +15,11 @@ urlpatterns = [
     # --Web Authentication (Login/Logout) ---
     path('accounts/login/', auth_views.LoginView.as_view(template_name='accounts/login.html'), name='login'),
     path('accounts/logout/', auth_views.LogoutView.as_view(next_page='login'), name='logout'),
+    # One-time set-password link emailed to fellows created by bulk onboarding
+    path('accounts/set-password/done/', auth_views.PasswordResetCompleteView.as_view(
+        template_name='accounts/password_set_done.html'), name='password_set_done'),
+    path('accounts/set-password/<uidb64>/<token>/', auth_views.PasswordResetConfirmView.as_view(
+        template_name='accounts/password_set.html', success_url=reverse_lazy('password_set_done')), name='password_set'),
 
     # 1. Authentication App Logic
     path('api/auth/', include('accounts.urls')),
@@ -0,0 +1,165 @@
+"""
+Pre-fork warm-up for gunicorn (called from gunicorn.conf.py when preload_app is on).
+
+With --preload the master imports the application (ASGI or WSGI) once. warm_up() then does
+the work every worker would otherwise repeat on its first requests:
+
+1. Resolve the URL conf: import every view module, compile every route regex and
+   build the reverse() lookup tables.
+2. Load the cached location hierarchy (with the local-memory cache, workers inherit
+   the filled cache; with a shared cache it is filled before the first request).
+3. Compile the project's templates into the cached template loader.
+4. Close the master's database connections (a socket must never be shared by
+   forked workers) and gc.freeze() everything created so far.
+
+gc.freeze() moves the warmed objects to a permanent generation the collector never
+walks, so collections in the workers don't write to (and un-share) those pages:
+they stay shared copy-on-write between all workers.
+
+Each step is timed; failures are logged and skipped so a cold database or a broken
+template never stops the server from booting.
+
+Usage:
+    gunicorn                                     # application and hooks from gunicorn.conf.py
+    python manage.py audit_imports --warm-up     # measure it without gunicorn
+"""
+
+# bridge2Rwanda_fellowship_management_system/warmup.py
+
+import gc
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+# --- 1. URLS ---
+
+def _walk_patterns(patterns):
+    for pattern in patterns:
+        yield pattern
+        if hasattr(pattern, 'url_patterns'):
+            yield from _walk_patterns(pattern.url_patterns)
+
+
+def resolve_urls():
+    from django.urls import get_resolver
+
+    resolver = get_resolver()
+    count = 0
+    for pattern in _walk_patterns(resolver.url_patterns):
+        pattern.pattern.regex  # compiled on first access, then cached on the pattern
+        count += 1
+    resolver.reverse_dict  # builds the reverse()/{% url %} lookup tables
+    return count
+
+
+# --- 2. LOCATION HIERARCHY ---
+
+def load_location_hierarchy():
+    from locations.utils import get_sector_hierarchy
+
+    return len(get_sector_hierarchy())
+
+
+# --- 3. TEMPLATES ---
+
+def project_template_names():
+    """Names of the .html templates shipped by this project (not Django's or DRF's)."""
+    from django.template.utils import get_app_template_dirs
+
+    base_dir = Path(settings.BASE_DIR).resolve()
+    directories = [Path(directory) for engine in settings.TEMPLATES for directory in engine.get('DIRS', [])]
+    directories += [Path(directory) for directory in get_app_template_dirs('templates')]
+
+    names = set()
+    for directory in directories:
+        directory = directory.resolve()
+        if base_dir not in directory.parents or not directory.is_dir():
+            continue
+        names.update(path.relative_to(directory).as_posix() for path in directory.rglob('*.html'))
+    return sorted(names)
+
+
+def compile_templates():
+    from django.template.loader import get_template
+
+    names = project_template_names()
+    for name in names:
+        get_template(name)  # kept compiled by the cached template loader
+    return len(names)
+
+
+# --- 4. WARM-UP ---
+
+WARM_UP_STEPS = [
+    ('urls', resolve_urls),
+    ('location_hierarchy', load_location_hierarchy),
+    ('templates', compile_templates),
+]
+
+
+def warm_up(freeze=True):
+    """Runs the warm-up steps; returns {step: {'ms': ..., 'items': ...}}."""
+    report = {}
+    for name, step in WARM_UP_STEPS:
+        started = time.perf_counter()
+        try:
+            items = step()
+        except Exception:
+            logger.exception('Warm-up step %s failed; workers will do it lazily.', name)
+            items = None
+        report[name] = {'ms': round((time.perf_counter() - started) * 1000, 1), 'items': items}
+
+    # Forked workers must open their own connections
+    connections.close_all()
+    if freeze:
+        gc.collect()
+        gc.freeze()
+        report['gc_frozen_objects'] = gc.get_freeze_count()
+    return report
+
+
+# --- 5. MEMORY MEASUREMENT ---
+
+def process_memory(pid='self'):
+    """
+    Memory of a process in KiB:
+        rss      resident pages (shared pages counted in full)
+        pss      proportional share (shared pages divided between the processes using them)
+        private  pages used by this process only (what it really adds)
+    pss/private come from /proc/<pid>/smaps_rollup (Linux); elsewhere only the peak
+    RSS of the current process is available (nothing on Windows).
+    """
+    path = f'/proc/{pid}/smaps_rollup'
+    if os.path.exists(path):
+        values = {}
+        with open(path) as smaps:
+            for line in smaps:
+                key, _, rest = line.partition(':')
+                if key in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty'):
+                    values[key] = int(rest.split()[0])
+        return {
+            'rss': values.get('Rss'),
+            'pss': values.get('Pss'),
+            'private': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0),
+        }
+    try:
+        import resource  # not available on Windows
+    except ImportError:
+        return {'rss': None, 'pss': None, 'private': None}
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {'rss': peak // 1024 if sys.platform == 'darwin' else peak, 'pss': None, 'private': None}
+
+
+def format_memory(memory):
+    return ', '.join(
+        f'{key} {value / 1024:.1f} MiB' for key, value in memory.items() if value is not None
+    ) or 'n/a'
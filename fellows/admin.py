@@ -1,4 +1,7 @@
 from django.contrib import admin
+
+from bridge2Rwanda_fellowship_management_system.admin_utils import cached_choices_filter
+from activities.choices import mentor_options
 from .models import Fellow
 
 @admin.register(Fellow)
@@ -13,9 +16,12 @@ class FellowAdmin(admin.ModelAdmin):
         'status', 
     )
     
+    show_full_result_count = False
+    changelist_query_budget = 5
+
     # 2. Added 'mentor' to filters
     list_filter = (
-        'mentor', # Allows you to filter fellows by their mentor
+        ('mentor', cached_choices_filter(mentor_options)), # Allows you to filter fellows by their mentor
         'status', 
         'training_completed', 
         'assigned_sector__district__province', 
@@ -28,6 +34,9 @@ class FellowAdmin(admin.ModelAdmin):
         'user__email', 
     )
     
+    # Search-as-you-type widgets instead of <select>s loading every user / mentor / sector
+    autocomplete_fields = ('user', 'mentor', 'assigned_sector')
+
     # 3. CRITICAL: Adding 'mentor' to the Edit Page sections
     fieldsets = (
         ('Personal Info', {
@@ -45,6 +54,14 @@ class FellowAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        # Name, mentor name and "Sector (District (Province))" come pre-joined for the
+        # changelist, the change form and autocomplete results (__str__ prints the
+        # user's name). A select_related here also replaces list_select_related.
+        return super().get_queryset(request).select_related(
+            'user', 'mentor__user', 'assigned_sector__district__province'
+        )
+
     def get_email(self, obj):
         return obj.user.email
     get_email.short_description = 'Email'
@@ -1,6 +1,8 @@
 from django import forms
 from django.contrib.auth.models import User
 from .models import Fellow
+from activities.choices import CachedModelChoiceField, PrerenderedSelect, sector_options
+from locations.models import Sector
 
 class FellowForm(forms.ModelForm):
     """
@@ -21,13 +23,17 @@ class FellowForm(forms.ModelForm):
         required=True,
         widget=forms.EmailInput(attrs={'class': 'form-control', 'placeholder': 'Enter email address'})
     )
+    # Options come from the cached sector list (activities/choices.py), not a table scan per render
+    assigned_sector = CachedModelChoiceField(
+        sector_options, queryset=Sector.objects.all(),
+        widget=PrerenderedSelect(attrs={'class': 'form-select'}),
+    )
 
     class Meta:
         model = Fellow
         # Fields from the Fellow model
         fields = ['assigned_sector', 'status']
         widgets = {
-            'assigned_sector': forms.Select(attrs={'class': 'form-select'}),
             'status': forms.Select(attrs={'class': 'form-select'}),
         }
 
@@ -81,4 +87,36 @@ class FellowForm(forms.ModelForm):
 
         if commit:
             fellow.save()
-        return fellow
\ No newline at end of file
+        return fellow
+
+class FellowRosterRowForm(forms.Form):
+    """
+    Validates ONE row of a bulk onboarding roster (CSV/XLSX).
+    Sector and mentor are given by code/email and resolved in bulk by fellows.onboarding.
+    """
+    email = forms.EmailField()
+    first_name = forms.CharField(max_length=100)
+    last_name = forms.CharField(max_length=100)
+    university = forms.CharField(max_length=100)
+    degree_field = forms.CharField(max_length=100)
+    graduation_year = forms.IntegerField(min_value=1950, max_value=2100)
+    sector_code = forms.CharField(max_length=10)
+    fellowship_start_date = forms.DateField()
+    fellowship_end_date = forms.DateField(required=False)
+    status = forms.ChoiceField(choices=Fellow.Status.choices, required=False)
+    mentor_email = forms.EmailField(required=False)
+    password = forms.CharField(required=False)
+
+    def clean_email(self):
+        return self.cleaned_data['email'].strip().lower()
+
+    def clean_status(self):
+        return self.cleaned_data.get('status') or Fellow.Status.ACTIVE
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start = cleaned_data.get('fellowship_start_date')
+        end = cleaned_data.get('fellowship_end_date')
+        if start and end and end < start:
+            self.add_error('fellowship_end_date', "End date cannot be before the start date.")
+        return cleaned_data
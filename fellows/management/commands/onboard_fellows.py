@@ -0,0 +1,65 @@
+"""
+Bulk-onboards a cohort of fellows from a CSV or XLSX roster.
+
+Expected columns (header row, case-insensitive):
+    email, first_name, last_name, university, degree_field, graduation_year,
+    sector_code, fellowship_start_date
+Optional columns:
+    fellowship_end_date, status, mentor_email, password
+
+Rows without a password get an unusable one and are emailed a one-time
+set-password link (ACCOUNT_INVITE outbox message, sent by dispatch_notifications).
+
+Usage:
+    python manage.py onboard_fellows cohort_2026.xlsx
+    python manage.py onboard_fellows cohort_2026.csv --dry-run
+    python manage.py onboard_fellows cohort_2026.csv --workers 4
+"""
+
+# fellows/management/commands/onboard_fellows.py
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from fellows.onboarding import RosterError, read_roster, onboard_fellows
+
+
+class Command(BaseCommand):
+    help = 'Creates Users, UserProfiles and Fellows in bulk from a CSV/XLSX roster file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the .csv or .xlsx roster.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Validate the roster and print the report without creating anything.')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Password-hashing processes (default: number of CPUs).')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'Roster file not found at {path}')
+
+        started = time.monotonic()
+        with open(path, 'rb') as f:
+            try:
+                records = read_roster(f, path)
+            except RosterError as exc:
+                raise CommandError(str(exc))
+
+        self.stdout.write(self.style.NOTICE(f'Processing {len(records)} roster rows...'))
+        workers = options['workers'] or os.cpu_count() or 1
+        result = onboard_fellows(records, dry_run=options['dry_run'], workers=workers)
+
+        for entry in result['rows']:
+            if entry['status'] == 'error':
+                self.stdout.write(self.style.ERROR(f"Row {entry['row']} ({entry['email']}): {'; '.join(entry['errors'])}"))
+            elif entry.get('invited'):
+                self.stdout.write(f"Row {entry['row']} ({entry['email']}): created, set-password link queued")
+
+        elapsed = time.monotonic() - started
+        verb = 'would be created' if options['dry_run'] else 'created'
+        self.stdout.write(self.style.SUCCESS(f'\n--- Onboarding Complete ({elapsed:.1f}s) ---'))
+        self.stdout.write(self.style.SUCCESS(f"Fellows {verb}: {result['valid']}"))
+        self.stdout.write(self.style.SUCCESS(f"Rows with errors: {result['failed']}"))
@@ -0,0 +1,80 @@
+"""
+Detects and repairs drift in the denormalized Fellow activity counters
+(pending/revision/approved counts, farmers trained, training time, last activity date).
+
+The counters are kept up to date on every ORM save/delete (activities/counters.py);
+drift can only come from writes that bypass them (queryset.update(), bulk_create,
+raw SQL, restored backups). Fellows are checked in primary-key batches, each with
+one grouped aggregate query, and drifted rows are fixed with bulk_update.
+
+Usage:
+    python manage.py reconcile_fellow_counters
+    python manage.py reconcile_fellow_counters --dry-run
+    python manage.py reconcile_fellow_counters --batch-size 200
+"""
+
+# fellows/management/commands/reconcile_fellow_counters.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from activities.counters import (
+    COUNTER_FIELDS, EMPTY_COUNTERS, expected_counters, invalidate_fellow_fragments,
+)
+from fellows.models import Fellow
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the denormalized Fellow activity counters and fixes any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Fellows checked per aggregate query (default: 500).')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report drift, change nothing.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        checked = drifted = 0
+        last_id = 0
+
+        while True:
+            with transaction.atomic():
+                # Locking the batch makes concurrent activity saves wait for the fix and
+                # then apply their F() delta on top of it, instead of being overwritten.
+                fellows = Fellow.objects.filter(pk__gt=last_id).order_by('pk').only('pk', *COUNTER_FIELDS)
+                if not options['dry_run']:
+                    fellows = fellows.select_for_update()
+                fellows = list(fellows[:batch_size])
+                if not fellows:
+                    break
+                last_id = fellows[-1].pk
+                checked += len(fellows)
+
+                expected = expected_counters([fellow.pk for fellow in fellows])
+                to_fix = []
+                for fellow in fellows:
+                    values = expected.get(fellow.pk, EMPTY_COUNTERS)
+                    diff = {
+                        field: (getattr(fellow, field), values[field])
+                        for field in COUNTER_FIELDS if getattr(fellow, field) != values[field]
+                    }
+                    if not diff:
+                        continue
+                    drifted += 1
+                    self.stdout.write(f'Fellow {fellow.pk}: ' + ', '.join(
+                        f'{field} {stored} -> {actual}' for field, (stored, actual) in diff.items()
+                    ))
+                    for field, (_, actual) in diff.items():
+                        setattr(fellow, field, actual)
+                    to_fix.append(fellow)
+
+                if to_fix and not options['dry_run']:
+                    Fellow.objects.bulk_update(to_fix, COUNTER_FIELDS)
+                    for fellow in to_fix:
+                        invalidate_fellow_fragments(fellow.pk)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.NOTICE(f'{drifted} of {checked} fellows have drifted counters.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Checked {checked} fellows, fixed {drifted}.'))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fellows', '0003_fellow_mentor'),
+        ('locations', '0002_village'),
+        ('mentors', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fellow',
+            index=models.Index(fields=['status'], name='fellow_status_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:52
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+def backfill_counters(apps, schema_editor):
+    """Initial values for the new counters, from one grouped query over the activities."""
+    Fellow = apps.get_model('fellows', 'Fellow')
+    TrainingActivity = apps.get_model('activities', 'TrainingActivity')
+
+    approved = Q(status='APPROVED')
+    rows = TrainingActivity.objects.values('fellow_id').annotate(
+        pending=Count('id', filter=Q(status='PENDING')),
+        revision=Count('id', filter=Q(status='REVISION')),
+        approved=Count('id', filter=approved),
+        farmers=Sum('number_of_farmers_trained', filter=approved),
+        duration=Sum('duration', filter=approved),
+        last_date=Max('date'),
+    ).order_by()
+
+    for row in rows:
+        Fellow.objects.filter(pk=row['fellow_id']).update(
+            pending_count=row['pending'],
+            revision_count=row['revision'],
+            approved_count=row['approved'],
+            farmers_trained=row['farmers'] or 0,
+            training_seconds=int(row['duration'].total_seconds()) if row['duration'] else 0,
+            last_activity_date=row['last_date'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fellows', '0004_fellow_fellow_status_idx'),
+        ('activities', '0008_api_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fellow',
+            name='approved_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='fellow',
+            name='farmers_trained',
+            field=models.PositiveIntegerField(default=0, help_text='Farmers reached by approved sessions.'),
+        ),
+        migrations.AddField(
+            model_name='fellow',
+            name='last_activity_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='fellow',
+            name='pending_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='fellow',
+            name='revision_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='fellow',
+            name='training_seconds',
+            field=models.PositiveIntegerField(default=0, help_text='Duration of approved sessions.'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fellows', '0005_fellow_activity_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fellow',
+            name='approved_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='fellow',
+            name='farmers_trained',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Farmers reached by approved sessions.'),
+        ),
+        migrations.AlterField(
+            model_name='fellow',
+            name='last_activity_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='fellow',
+            name='pending_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='fellow',
+            name='revision_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='fellow',
+            name='training_seconds',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Duration of approved sessions.'),
+        ),
+    ]
@@ -59,7 +59,42 @@ class Fellow(models.Model):
     )
     
     training_completed = models.BooleanField(default=False)
-    
+
+    # --- Denormalized activity counters ---
+    # Maintained with F() updates on every activity create/edit/review/delete
+    # (activities/counters.py); `manage.py reconcile_fellow_counters` repairs drift.
+    # Not editable, and left out of full saves (see save()).
+    pending_count = models.PositiveIntegerField(default=0, editable=False)
+    revision_count = models.PositiveIntegerField(default=0, editable=False)
+    approved_count = models.PositiveIntegerField(default=0, editable=False)
+    farmers_trained = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Farmers reached by approved sessions."
+    )
+    training_seconds = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Duration of approved sessions."
+    )
+    last_activity_date = models.DateField(null=True, blank=True, editable=False)
+
+    COUNTER_FIELDS = (
+        'pending_count', 'revision_count', 'approved_count',
+        'farmers_trained', 'training_seconds', 'last_activity_date',
+    )
+
+    def save(self, *args, **kwargs):
+        """
+        A full save of an existing fellow (profile form, admin, API) writes every
+        column except the counters: the instance's copies may be older than an
+        F() update committed since it was loaded, and writing them back would
+        undo that submission or review. Callers naming update_fields explicitly
+        are left alone.
+        """
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     # --- Helper Methods ---
     
     @property
@@ -69,6 +104,11 @@ class Fellow(models.Model):
             return f"{self.user.first_name} {self.user.last_name}"
         return "Unknown Fellow"
 
+    @property
+    def training_hours(self):
+        """Approved training time in hours (from the training_seconds counter)."""
+        return round(self.training_seconds / 3600, 1)
+
     @property
     def assigned_district(self):
         """Helper to get the District via the assigned Sector."""
@@ -84,5 +124,9 @@ class Fellow(models.Model):
 
     class Meta:
         ordering = ['user__last_name', 'user__first_name']
+        indexes = [
+            # Status filter on the fellow management list and statistics
+            models.Index(fields=['status'], name='fellow_status_idx'),
+        ]
         verbose_name = "Fellow"
         verbose_name_plural = "Fellows"
\ No newline at end of file
@@ -0,0 +1,290 @@
+"""
+Bulk fellow onboarding from a roster file (CSV or XLSX).
+
+Pipeline:
+1. Parse the roster into dict rows (openpyxl is only imported for .xlsx files).
+   An unreadable file (wrong encoding, corrupt workbook) raises RosterError.
+2. Validate each row with FellowRosterRowForm; resolve sectors by code, mentors by
+   email and existing accounts (case-insensitively) with ONE query each.
+3. Hash the passwords given in the roster. In-process by default (web requests);
+   `manage.py onboard_fellows --workers N` uses a process pool (PBKDF2 is CPU-bound).
+   Rows without a password get an unusable one and an ACCOUNT_INVITE outbox
+   message: the fellow is emailed a one-time set-password link, no password is
+   ever returned.
+4. bulk_create Users, UserProfiles, Fellows and invitations in ONE transaction.
+   bulk_create does not send post_save, so the per-user signal handlers are not
+   fired. Users created meanwhile by a concurrent import (unique username) are
+   reported as duplicates and the remaining rows are retried.
+5. Return a per-row report.
+"""
+
+# fellows/onboarding.py
+
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from zipfile import BadZipFile
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from accounts.models import UserProfile
+from activities.models import OutboxMessage
+from activities.outbox import invite_message
+from activities.utils import bump_data_version
+from locations.models import Sector
+from mentors.models import Mentor
+from .forms import FellowRosterRowForm
+from .models import Fellow
+
+# Below this many passwords, starting worker processes costs more than it saves
+PARALLEL_HASH_THRESHOLD = 8
+
+# Rounds of "drop the rows a concurrent import just created, then retry"
+CREATE_ATTEMPTS = 3
+
+
+class RosterError(ValueError):
+    """The roster file can't be read at all (reported as one file-level error)."""
+
+
+# --- 1. PARSING ---
+
+def _normalise_header(value):
+    return str(value or '').strip().lower().replace(' ', '_')
+
+
+def read_roster(file_obj, filename):
+    """Returns a list of {column: value} dicts from a CSV or XLSX roster; raises RosterError."""
+    if filename.lower().endswith('.xlsx'):
+        # Lazy import: openpyxl is only needed on this (rare) path
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+
+        try:
+            workbook = load_workbook(file_obj, read_only=True, data_only=True)
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [_normalise_header(cell) for cell in next(rows, [])]
+            records = [dict(zip(header, row)) for row in rows if any(cell not in (None, '') for cell in row)]
+            workbook.close()
+        except (BadZipFile, InvalidFileException, KeyError, OSError) as exc:
+            raise RosterError(f'{filename} is not a readable .xlsx workbook ({type(exc).__name__}).')
+        return records
+
+    content = file_obj.read()
+    if isinstance(content, bytes):
+        try:
+            content = content.decode('utf-8-sig')
+        except UnicodeDecodeError as exc:
+            raise RosterError(f'{filename} is not UTF-8 encoded (byte {exc.start}); save it as "CSV UTF-8".')
+    try:
+        reader = csv.DictReader(io.StringIO(content))
+        reader.fieldnames = [_normalise_header(name) for name in reader.fieldnames or []]
+        return [row for row in reader if any((value or '').strip() for value in row.values())]
+    except csv.Error as exc:
+        raise RosterError(f'{filename}: line {reader.line_num} is not valid CSV ({exc}).')
+
+
+def _clean_raw_row(raw):
+    """Prepares spreadsheet values for form validation (dates, numbers, case)."""
+    data = {}
+    for key, value in raw.items():
+        if value is None:
+            value = ''
+        elif hasattr(value, 'date') and callable(value.date):
+            value = value.date().isoformat()  # XLSX datetime cells
+        elif hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        elif isinstance(value, float) and value.is_integer():
+            value = int(value)
+        data[key] = str(value).strip()
+    data['status'] = data.get('status', '').upper()
+    return data
+
+
+# --- 2. PASSWORD HASHING ---
+
+def _init_hash_worker():
+    # Needed when workers are spawned (not forked): configure Django in the child
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bridge2Rwanda_fellowship_management_system.settings')
+        django.setup()
+
+
+def _hash_password(raw_password):
+    return make_password(raw_password)
+
+
+def hash_passwords(raw_passwords, workers=None):
+    """
+    Hashes passwords, preserving order; None gives an unusable password.
+    In-process unless `workers` > 1: web requests must not start process pools.
+    """
+    if not workers or workers == 1 or len(raw_passwords) < PARALLEL_HASH_THRESHOLD:
+        return [make_password(raw) for raw in raw_passwords]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_hash_worker) as pool:
+        return list(pool.map(_hash_password, raw_passwords, chunksize=4))
+
+
+# --- 3. ONBOARDING ---
+
+def onboard_fellows(records, dry_run=False, workers=None):
+    """
+    Validates and creates fellows from parsed roster rows.
+    Returns {'created': int, 'valid': int, 'failed': int, 'rows': [per-row report]}.
+    Row numbers are 1-based spreadsheet lines (header = line 1).
+    """
+    report = []
+    valid = []
+
+    # --- Validate every row ---
+    for index, raw in enumerate(records, start=2):
+        form = FellowRosterRowForm(_clean_raw_row(raw))
+        entry = {'row': index, 'email': (raw.get('email') or '').strip(), 'status': 'error', 'errors': []}
+        report.append(entry)
+        if form.is_valid():
+            valid.append((entry, form.cleaned_data))
+        else:
+            entry['errors'] = [f"{field}: {msg}" for field, msgs in form.errors.items() for msg in msgs]
+
+    # --- Resolve lookups in bulk (one query each) ---
+    emails = [data['email'] for _, data in valid]
+    sector_codes = {data['sector_code'] for _, data in valid}
+    mentor_emails = {data['mentor_email'].lower() for _, data in valid if data['mentor_email']}
+
+    sectors = {s.code: s.id for s in Sector.objects.filter(code__in=sector_codes).only('id', 'code')}
+    mentors = {
+        email.lower(): mentor_id
+        for mentor_id, email in Mentor.objects.filter(
+            user__email__in=mentor_emails
+        ).values_list('id', 'user__email')
+    }
+    taken = taken_emails(emails)
+
+    to_create = []
+    seen = set()
+    for entry, data in valid:
+        errors = []
+        if data['email'] in taken:
+            errors.append("email: A user with this email already exists.")
+        if data['email'] in seen:
+            errors.append("email: Duplicate email in this roster.")
+        if data['sector_code'] not in sectors:
+            errors.append(f"sector_code: Unknown sector code '{data['sector_code']}'.")
+        if data['mentor_email'] and data['mentor_email'].lower() not in mentors:
+            errors.append(f"mentor_email: No mentor with email '{data['mentor_email']}'.")
+        seen.add(data['email'])
+
+        if errors:
+            entry['errors'] = errors
+        else:
+            to_create.append((entry, data))
+
+    if dry_run or not to_create:
+        for entry, _ in to_create:
+            entry['status'] = 'valid'
+        return _summarise(report)
+
+    # --- Hash the given passwords (unusable + invitation for the others) ---
+    hashed = hash_passwords([data['password'] or None for _, data in to_create], workers=workers)
+    rows = [(entry, data, password_hash) for (entry, data), password_hash in zip(to_create, hashed)]
+
+    # --- Create everything in one transaction, without per-row signals ---
+    for _ in range(CREATE_ATTEMPTS):
+        try:
+            user_ids, fellow_ids = _create(rows, sectors, mentors)
+            break
+        except IntegrityError:
+            # A concurrent import created some of these users after our check
+            conflicts = taken_emails([data['email'] for _, data, _ in rows])
+            if not conflicts:
+                raise
+            for entry, data, _ in rows:
+                if data['email'] in conflicts:
+                    entry['errors'] = ["email: A user with this email already exists."]
+            rows = [row for row in rows if row[1]['email'] not in conflicts]
+            if not rows:
+                return _summarise(report)
+    else:
+        raise IntegrityError('Roster rows kept conflicting with concurrent imports.')
+
+    # bulk_create skips post_save, so cached fellow statistics are invalidated by hand
+    bump_data_version('fellows')
+
+    for entry, data, _ in rows:
+        entry['status'] = 'created'
+        entry['fellow_id'] = fellow_ids.get(user_ids[data['email']])
+        entry['invited'] = not data['password']
+
+    return _summarise(report)
+
+
+def taken_emails(emails):
+    """Lower-cased emails already used as a username or email (case-insensitive, one query)."""
+    emails = {email.lower() for email in emails}
+    taken = set()
+    for username, email in User.objects.annotate(
+        username_lower=Lower('username'), email_lower=Lower('email'),
+    ).filter(
+        Q(username_lower__in=emails) | Q(email_lower__in=emails)
+    ).values_list('username_lower', 'email_lower'):
+        taken.update(value for value in (username, email) if value in emails)
+    return taken
+
+
+def _create(rows, sectors, mentors):
+    """Inserts users, profiles, fellows and invitations; returns ({email: user_id}, {user_id: fellow_id})."""
+    with transaction.atomic():
+        User.objects.bulk_create([
+            User(
+                username=data['email'],
+                email=data['email'],
+                first_name=data['first_name'],
+                last_name=data['last_name'],
+                password=password_hash,
+            )
+            for _, data, password_hash in rows
+        ])
+        # Re-read ids: not every backend (e.g. MySQL) returns them from bulk_create
+        user_ids = dict(User.objects.filter(username__in=[d['email'] for _, d, _ in rows]).values_list('username', 'id'))
+
+        UserProfile.objects.bulk_create([
+            UserProfile(user_id=user_ids[data['email']], role=UserProfile.Role.FELLOW)
+            for _, data, _ in rows
+        ])
+        Fellow.objects.bulk_create([
+            Fellow(
+                user_id=user_ids[data['email']],
+                university=data['university'],
+                degree_field=data['degree_field'],
+                graduation_year=data['graduation_year'],
+                assigned_sector_id=sectors[data['sector_code']],
+                mentor_id=mentors.get(data['mentor_email'].lower()) if data['mentor_email'] else None,
+                fellowship_start_date=data['fellowship_start_date'],
+                fellowship_end_date=data['fellowship_end_date'],
+                status=data['status'],
+            )
+            for _, data, _ in rows
+        ])
+        fellow_ids = dict(Fellow.objects.filter(user_id__in=user_ids.values()).values_list('user_id', 'id'))
+        # Passwordless accounts: emailed a set-password link by the outbox dispatcher
+        OutboxMessage.objects.bulk_create([
+            invite_message(user_ids[data['email']]) for _, data, _ in rows if not data['password']
+        ])
+    return user_ids, fellow_ids
+
+
+def _summarise(report):
+    return {
+        'created': sum(1 for entry in report if entry['status'] == 'created'),
+        'valid': sum(1 for entry in report if entry['status'] in ('created', 'valid')),
+        'failed': sum(1 for entry in report if entry['status'] == 'error'),
+        'rows': report,
+    }
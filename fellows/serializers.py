@@ -1,9 +1,24 @@
 # fellows/serializers.py
 from rest_framework import serializers
+from activities.fieldsets import FieldsetSerializerMixin
+from activities.serializers import SectorSummaryField
 from .models import Fellow
 
 
-class FellowSerializer(serializers.ModelSerializer):
+class FellowUserSerializer(serializers.Serializer):
+    """Nested account for ?expand=user."""
+    id = serializers.IntegerField(read_only=True)
+    username = serializers.CharField(read_only=True)
+    email = serializers.EmailField(read_only=True)
+
+
+class FellowMentorSerializer(serializers.Serializer):
+    """Nested mentor for ?expand=mentor."""
+    id = serializers.IntegerField(read_only=True)
+    full_name = serializers.ReadOnlyField(source='get_full_name')
+
+
+class FellowSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     # 1. Pull names from the User model via the 'user' relationship
     first_name = serializers.CharField(source='user.first_name', read_only=True)
     last_name = serializers.CharField(source='user.last_name', read_only=True)
@@ -38,6 +53,17 @@ class FellowSerializer(serializers.ModelSerializer):
         
         read_only_fields = ('user',)
 
+        # Sparse fieldsets (see activities/fieldsets.py)
+        expanded_fields = {
+            'assigned_sector': lambda: SectorSummaryField(source='assigned_sector_id'),
+            'user': lambda: FellowUserSerializer(read_only=True),
+            'mentor': lambda: FellowMentorSerializer(read_only=True, allow_null=True),
+        }
+        # Not part of the default payload; sent with ?fields=mentor or ?expand=mentor
+        extra_fields = {
+            'mentor': lambda: serializers.PrimaryKeyRelatedField(read_only=True),
+        }
+
     def create(self, validated_data):
         
         user_instance = validated_data.pop('user', None)
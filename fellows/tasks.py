@@ -0,0 +1,17 @@
+"""Background tasks of the fellows app (see taskqueue/)."""
+
+# fellows/tasks.py
+
+from io import StringIO
+
+from django.core.management import call_command
+
+from taskqueue.registry import task
+
+
+@task(cron='45 3 * * *')
+def reconcile_fellow_counters():
+    """Nightly check (and repair) of the denormalized Fellow activity counters."""
+    output = StringIO()
+    call_command('reconcile_fellow_counters', stdout=output)
+    return output.getvalue()[-2000:]
@@ -1,3 +1,327 @@
-from django.test import TestCase
+import io
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.forms import modelform_factory
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.throttling import buckets
+from activities.models import OutboxMessage
+from activities.outbox import dispatch_due
+from bridge2Rwanda_fellowship_management_system.test_utils import (
+    create_activity, create_fellow, create_locations, create_mentor, create_user,
+)
+from . import onboarding
+from .forms import FellowForm
+from .models import Fellow
+from .onboarding import RosterError, onboard_fellows, read_roster
+
+HEADER = 'email,first_name,last_name,university,degree_field,graduation_year,sector_code,fellowship_start_date,password\n'
+
+
+def roster(*rows):
+    return (HEADER + ''.join(f'{row}\n' for row in rows)).encode()
+
+
+def row(email, password=''):
+    return f'{email},Ann,Uwase,UR,Agronomy,2023,GIT,2026-01-05,{password}'
+
+
+class RosterReadingTests(TestCase):
+    def test_non_utf8_csv_is_a_roster_error(self):
+        with self.assertRaisesMessage(RosterError, 'not UTF-8'):
+            read_roster(io.BytesIO(roster(row('ann@example.com')).replace(b'Uwase', b'Uwas\xe9')), 'cohort.csv')
+
+    def test_corrupt_xlsx_is_a_roster_error(self):
+        with self.assertRaisesMessage(RosterError, 'not a readable .xlsx'):
+            read_roster(io.BytesIO(b'not a zip file'), 'cohort.xlsx')
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', SITE_URL='https://fms.example.org')
+class OnboardingTests(TestCase):
+    def setUp(self):
+        buckets.clear()
+        self.sector = create_locations()
+        self.sector.code = 'GIT'
+        self.sector.save()
+        self.client = APIClient()
+        self.client.force_authenticate(create_user('coordinator@example.com', role='COORDINATOR'))
+
+    def upload(self, content, name='cohort.csv'):
+        return self.client.post(
+            '/api/fellows/onboard/', {'file': SimpleUploadedFile(name, content)}, format='multipart',
+        )
+
+    def test_passwordless_rows_get_an_invitation_not_a_password(self):
+        response = self.upload(roster(row('ann@example.com'), row('bob@example.com', 'S3cret-pass!')))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'], 2)
+        self.assertNotIn('password', response.content.decode().lower())
+
+        ann = User.objects.get(username='ann@example.com')
+        self.assertFalse(ann.has_usable_password())
+        self.assertTrue(User.objects.get(username='bob@example.com').check_password('S3cret-pass!'))
+        self.assertEqual(
+            list(OutboxMessage.objects.values_list('recipient_id', 'kind')),
+            [(ann.id, OutboxMessage.Kind.ACCOUNT_INVITE)],
+        )
+
+    def test_invitation_link_sets_the_password(self):
+        self.upload(roster(row('ann@example.com')))
+        dispatch_due()
+        self.assertEqual(len(mail.outbox), 1)
+        link = next(line for line in mail.outbox[0].body.splitlines() if 'set-password' in line).strip()
+        self.assertTrue(link.startswith('https://fms.example.org/accounts/set-password/'))
+
+        # The view swaps the token for a session and redirects to the form
+        form_url = self.client.get(link.removeprefix('https://fms.example.org')).url
+        response = self.client.post(form_url, {'new_password1': 'Kigali-2026!x', 'new_password2': 'Kigali-2026!x'})
+        self.assertRedirects(response, '/accounts/set-password/done/')
+        self.assertTrue(User.objects.get(username='ann@example.com').check_password('Kigali-2026!x'))
+
+    def test_unreadable_file_is_a_400(self):
+        response = self.upload(b'\xff\xfe\x00garbage', 'cohort.csv')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['file'], 'cohort.csv')
+
+        response = self.upload(b'PK\x03\x04 broken', 'cohort.xlsx')
+        self.assertEqual(response.status_code, 400)
+
+    def test_existing_username_matches_case_insensitively(self):
+        create_user('Ann@Example.com')
+        result = onboard_fellows(read_roster(io.BytesIO(roster(row('ann@example.com'))), 'cohort.csv'))
+        self.assertEqual(result['created'], 0)
+        self.assertIn('already exists', result['rows'][0]['errors'][0])
+
+    def test_users_created_by_a_concurrent_import_are_reported_as_duplicates(self):
+        records = read_roster(io.BytesIO(roster(row('ann@example.com'), row('bob@example.com'))), 'cohort.csv')
+        real_hash = onboarding.hash_passwords
+
+        def hash_then_lose_the_race(*args, **kwargs):
+            # Another import commits ann@ between our duplicate check and our insert
+            create_user('ann@example.com')
+            return real_hash(*args, **kwargs)
+
+        with mock.patch.object(onboarding, 'hash_passwords', hash_then_lose_the_race):
+            result = onboard_fellows(records)
+
+        self.assertEqual(result['created'], 1)
+        self.assertEqual([entry['status'] for entry in result['rows']], ['error', 'created'])
+        self.assertIn('already exists', result['rows'][0]['errors'][0])
+        self.assertTrue(Fellow.objects.filter(user__username='bob@example.com').exists())
+
+    def test_web_requests_hash_in_process(self):
+        with mock.patch.object(onboarding, 'ProcessPoolExecutor') as pool:
+            self.upload(roster(*(row(f'f{i}@example.com', f'Pass-{i}-word!') for i in range(10))))
+        pool.assert_not_called()
+
+
+class FellowStatisticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        buckets.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(create_user('coordinator@example.com', role='COORDINATOR'))
+
+    def test_same_named_districts_and_mentors_stay_apart(self):
+        north = create_locations('Gitega', 'Gasabo', 'Kigali')
+        south = create_locations('Gitega', 'Gasabo', 'Southern')
+        mentor_a = create_mentor('a@example.com', first_name='Jean', last_name='M')
+        mentor_b = create_mentor('b@example.com', first_name='Jean', last_name='M')
+        create_fellow('f1@example.com', north, mentor_a)
+        create_fellow('f2@example.com', north, mentor_a)
+        create_fellow('f3@example.com', south, mentor_b)
+
+        stats = self.client.get('/api/fellows/statistics/').json()
+
+        districts = stats['district_breakdown']
+        self.assertEqual(
+            sorted((d['id'], d['name'], d['total']) for d in districts.values()),
+            [(north.district_id, 'Gasabo', 2), (south.district_id, 'Gasabo', 1)],
+        )
+        self.assertEqual(districts[str(north.district_id)]['ACTIVE'], 2)
+        self.assertEqual(
+            {key: m['total'] for key, m in stats['mentor_breakdown'].items()},
+            {str(mentor_a.id): 2, str(mentor_b.id): 1},
+        )
+        self.assertEqual(stats['geographic_distribution'], {
+            f'Gasabo (#{north.district_id})': 2, f'Gasabo (#{south.district_id})': 1,
+        })
+        self.assertEqual(stats['program_overview']['total_fellows'], 3)
+
+    def test_unassigned_fellows(self):
+        create_fellow('f1@example.com', None)
+        stats = self.client.get('/api/fellows/statistics/').json()
+        self.assertEqual(stats['district_breakdown']['unassigned']['name'], 'Unassigned')
+        self.assertEqual(stats['mentor_breakdown']['unassigned']['total'], 1)
+
+    def test_renamed_mentor_and_district_refresh_the_cache(self):
+        sector = create_locations()
+        mentor = create_mentor('a@example.com', first_name='Jean', last_name='M')
+        create_fellow('f1@example.com', sector, mentor)
+        self.client.get('/api/fellows/statistics/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/fellows/statistics/')
+
+        mentor.user.first_name = 'Joseph'
+        mentor.user.save()
+        district = sector.district
+        district.name = 'Kicukiro'
+        district.save()
+
+        stats = self.client.get('/api/fellows/statistics/').json()
+        self.assertEqual(stats['mentor_breakdown'][str(mentor.id)]['name'], 'Joseph M')
+        self.assertEqual(stats['district_breakdown'][str(district.id)]['name'], 'Kicukiro')
+
+
+class FellowActivitiesTests(TestCase):
+    def setUp(self):
+        buckets.clear()
+        self.fellow = create_fellow('ann@example.com', create_locations())
+        create_activity(self.fellow)
+        self.client = APIClient()
+        self.client.force_authenticate(create_user('coordinator@example.com', role='COORDINATOR'))
+
+    def get(self, **params):
+        return self.client.get(f'/api/fellows/{self.fellow.id}/activities/', params)
+
+    def test_impossible_date_is_a_400(self):
+        response = self.get(date_from='2025-02-30')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('date_from', response.json())
+
+    def test_malformed_date_is_a_400(self):
+        response = self.get(date_to='15/01/2025')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('date_to', response.json())
+
+    def test_date_range_filters(self):
+        self.assertEqual(self.get(date_from='2025-01-01', date_to='2025-01-31').json()['count'], 1)
+        self.assertEqual(self.get(date_from='2025-02-01').json()['count'], 0)
+
+    def test_pages_newest_first(self):
+        for day in range(1, 12):
+            create_activity(self.fellow, date=date(2025, 2, day))
+        first = self.get().json()
+        self.assertEqual(first['count'], 12)
+        self.assertEqual(len(first['results']), 10)
+        self.assertEqual(first['results'][0]['date'], '2025-02-11')
+        self.assertIsNotNone(first['next'])
+
+        second = self.get(page=2).json()
+        self.assertEqual([row['date'] for row in second['results']], ['2025-02-01', '2025-01-15'])
+        self.assertIsNone(second['next'])
+        self.assertEqual(self.get(page=3).status_code, 404)
+
+    def test_unknown_status_is_a_400(self):
+        response = self.get(status='DONE')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('status', response.json())
+
+    def test_monthly_summary(self):
+        create_activity(self.fellow, date=date(2025, 1, 20), status='APPROVED', number_of_farmers_trained=5)
+        months = self.get(summary=1).json()['months']
+        self.assertEqual(months, [{
+            'month': '2025-01', 'sessions': 2, 'approved_sessions': 1,
+            'farmers_trained': 25, 'approved_farmers': 5, 'duration_hours': 2.0,
+        }])
+
+
+class FellowListViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sector = create_locations()
+        for index in range(30):
+            create_fellow(f'fellow{index:02d}@example.com', sector,
+                          status=Fellow.Status.COMPLETED if index < 3 else Fellow.Status.ACTIVE)
+        cls.coordinator = create_user('coordinator@example.com', role='COORDINATOR', is_staff=True)
+
+    def setUp(self):
+        self.client.force_login(self.coordinator)
+
+    def get(self, **params):
+        return self.client.get(reverse('fellow_list'), params, SERVER_NAME='localhost')
+
+    def test_full_page_and_pagination(self):
+        response = self.get()
+        self.assertTemplateUsed(response, 'fellows/fellow_list.html')
+        self.assertEqual(len(response.context['fellows']), 25)
+        self.assertEqual(response.context['page_obj'].paginator.count, 30)
+        self.assertEqual(len(self.get(page=2).context['fellows']), 5)
+
+    def test_partial_renders_only_the_table(self):
+        response = self.get(partial=1, status=Fellow.Status.COMPLETED)
+        self.assertTemplateUsed(response, 'fellows/_fellow_table.html')
+        self.assertTemplateNotUsed(response, 'fellows/fellow_list.html')
+        self.assertEqual(response.context['page_obj'].paginator.count, 3)
+        self.assertNotContains(response, '<html')
+
+    def test_query_count_does_not_grow_with_the_page(self):
+        self.get(partial=1, status=Fellow.Status.COMPLETED)
+        with CaptureQueriesContext(connection) as small:
+            self.get(partial=1, status=Fellow.Status.COMPLETED)
+        with CaptureQueriesContext(connection) as full:
+            self.get(partial=1)
+        self.assertEqual(len(full), len(small))
+
+
+class FellowCounterTests(TestCase):
+    def setUp(self):
+        self.sector = create_locations()
+        self.fellow = create_fellow('ann@example.com', self.sector)
+
+    def counters(self):
+        return Fellow.objects.values(*Fellow.COUNTER_FIELDS).get(pk=self.fellow.pk)
+
+    def test_submission_review_and_delete_update_the_counters(self):
+        activity = create_activity(self.fellow)
+        self.assertEqual(self.counters()['pending_count'], 1)
+
+        activity.status = 'APPROVED'
+        activity.save()
+        counters = self.counters()
+        self.assertEqual((counters['pending_count'], counters['approved_count']), (0, 1))
+        self.assertEqual((counters['farmers_trained'], counters['training_seconds']), (20, 3600))
+        self.assertEqual(str(counters['last_activity_date']), '2025-01-15')
+
+        activity.delete()
+        self.assertEqual(self.counters()['approved_count'], 0)
+        self.assertIsNone(self.counters()['last_activity_date'])
+
+    def test_profile_form_saved_alongside_a_submission_keeps_the_counters(self):
+        # The form loads the fellow, then a report is submitted before the form is saved
+        form = FellowForm(
+            {'first_name': 'Ann', 'last_name': 'F', 'email': 'ann@example.com',
+             'assigned_sector': self.sector.id, 'status': 'ON_LEAVE'},
+            instance=Fellow.objects.get(pk=self.fellow.pk),
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        create_activity(self.fellow)
+        form.save()
+
+        self.assertEqual(self.counters()['pending_count'], 1)
+        self.assertEqual(Fellow.objects.get(pk=self.fellow.pk).status, 'ON_LEAVE')
+
+    def test_counters_are_not_editable(self):
+        form_class = modelform_factory(Fellow, fields='__all__')
+        self.assertTrue(set(Fellow.COUNTER_FIELDS).isdisjoint(form_class.base_fields))
+
+    def test_explicit_update_fields_still_write_counters(self):
+        self.fellow.pending_count = 7
+        self.fellow.save(update_fields=['pending_count'])
+        self.assertEqual(self.counters()['pending_count'], 7)
+
+    def test_reconcile_repairs_drift(self):
+        create_activity(self.fellow)
+        Fellow.objects.filter(pk=self.fellow.pk).update(pending_count=5)
+        call_command('reconcile_fellow_counters', stdout=io.StringIO())
+        self.assertEqual(self.counters()['pending_count'], 1)
@@ -1,9 +1,15 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.db.models import Case, When, Value, IntegerField, Count, Sum
+from django.core.paginator import Paginator
+from django.db.models import Case, When, Value, IntegerField, Count, Sum, Q
+from django.db.models.functions import TruncMonth
+from django.utils.dateparse import parse_date
 from rest_framework import viewsets
+from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
@@ -12,13 +18,21 @@ from .models import Fellow
 from .serializers import FellowSerializer
 from .forms import FellowForm
 from activities.models import TrainingActivity
+from locations.models import District
+from mentors.models import Mentor
 from activities.serializers import TrainingActivitySerializer
+from activities.utils import get_data_version
+from activities.fieldsets import FieldsetViewMixin
+from django.core.cache import cache
+from accounts.roles import get_user_role
+from accounts.permissions import IsCoordinatorOrReadOnly
+from accounts.throttling import AnalyticsRateThrottle
 
 # --- SECURITY UTILITIES ---
 
 def is_admin_or_coordinator(user):
     """Checks if the user has administrative or coordinator privileges."""
-    return user.is_staff or user.groups.filter(name='Coordinator').exists()
+    return get_user_role(user).is_admin_or_coordinator
 
 
 # --- FELLOW WEB VIEWS (For Fellows) ---
@@ -31,12 +45,13 @@ def fellow_register_view(request):
 def dashboard_view(request):
     """Fellow web dashboard with activity list and stats."""
     # Redirect Mentors to their specific dashboard
-    if hasattr(request.user, 'userprofile') and request.user.userprofile.role == 'MENTOR':
+    if get_user_role(request.user).role == 'MENTOR':
         return redirect('mentor_dashboard')
 
     try:
-        fellow = request.user.fellow_profile
-    except AttributeError:
+        # One query: counters live on the row, location names come pre-joined
+        fellow = Fellow.objects.select_related('user', 'assigned_sector__district').get(user_id=request.user.id)
+    except Fellow.DoesNotExist:
         # If staff, take them to admin; otherwise, they need a profile
         if request.user.is_staff:
             return redirect('/admin/')
@@ -56,13 +71,14 @@ def dashboard_view(request):
         priority=priority_order
     ).order_by('priority', '-date')
 
-    # Aggregate statistics for the dashboard cards
+    # Dashboard cards read the denormalized counters on Fellow (no aggregate queries)
     stats = {
-        'to_fix': activities_queryset.filter(status='REVISION').count(),
-        'pending': activities_queryset.filter(status='PENDING').count(),
-        'approved': activities_queryset.filter(status='APPROVED').count(),
-        'total_trained': activities_queryset.filter(status='APPROVED').aggregate(
-            total=Sum('number_of_farmers_trained'))['total'] or 0
+        'to_fix': fellow.revision_count,
+        'pending': fellow.pending_count,
+        'approved': fellow.approved_count,
+        'total_trained': fellow.farmers_trained,
+        'training_hours': fellow.training_hours,
+        'last_activity_date': fellow.last_activity_date,
     }
 
     return render(request, 'fellows/dashboard.html', {
@@ -74,11 +90,65 @@ def dashboard_view(request):
 
 # --- ADMIN/COORDINATOR VIEWS (Fellow Management CRUD) ---
 
+# Allowed ?sort= values for the fellow table (each maps to indexed/PK columns)
+FELLOW_SORTS = {
+    '-id': ('-id',),
+    'id': ('id',),
+    'name': ('user__last_name', 'user__first_name'),
+    '-name': ('-user__last_name', '-user__first_name'),
+    'status': ('status', '-id'),
+}
+
 @user_passes_test(is_admin_or_coordinator)
 def fellow_list_view(request):
-    """READ: Displays a management table of all fellows."""
-    fellows = Fellow.objects.all().order_by('-id')
-    return render(request, 'fellows/fellow_list.html', {'fellows': fellows})
+    """
+    READ: Displays a paginated management table of fellows.
+    Supports ?q= (name/email), ?status=, ?district=, ?mentor=, ?sort= and ?page=.
+    With ?partial=1 only the table fragment is rendered (used by the page's AJAX paging).
+    """
+    fellows = Fellow.objects.select_related(
+        'user', 'assigned_sector__district'
+    ).only(
+        'id', 'status',
+        'user__first_name', 'user__last_name', 'user__email',
+        'assigned_sector__name', 'assigned_sector__district__name',
+    )
+
+    search = request.GET.get('q', '').strip()
+    status = request.GET.get('status')
+    district_id = request.GET.get('district')
+    mentor_id = request.GET.get('mentor')
+
+    if search:
+        fellows = fellows.filter(
+            Q(user__first_name__icontains=search)
+            | Q(user__last_name__icontains=search)
+            | Q(user__email__icontains=search)
+        )
+    if status in Fellow.Status.values:
+        fellows = fellows.filter(status=status)
+    if district_id and district_id.isdigit():
+        fellows = fellows.filter(assigned_sector__district_id=district_id)
+    if mentor_id and mentor_id.isdigit():
+        fellows = fellows.filter(mentor_id=mentor_id)
+
+    sort = request.GET.get('sort', '-id')
+    fellows = fellows.order_by(*FELLOW_SORTS.get(sort, FELLOW_SORTS['-id']))
+
+    page_obj = Paginator(fellows, 25).get_page(request.GET.get('page'))
+    context = {'fellows': page_obj, 'page_obj': page_obj}
+
+    if request.GET.get('partial'):
+        return render(request, 'fellows/_fellow_table.html', context)
+
+    context.update({
+        'status_choices': Fellow.Status.choices,
+        'districts': District.objects.only('id', 'name').order_by('name'),
+        'mentors': Mentor.objects.select_related('user').only(
+            'id', 'user__first_name', 'user__last_name'
+        ).order_by('user__last_name'),
+    })
+    return render(request, 'fellows/fellow_list.html', context)
 
 @user_passes_test(is_admin_or_coordinator)
 def fellow_create_view(request):
@@ -128,43 +198,247 @@ def fellow_delete_view(request, pk):
 
 # --- API VIEWSET (For Mobile App / External Systems) ---
 
-class FellowViewSet(viewsets.ModelViewSet):
-    """API ViewSet for Fellow management returning JSON."""
+USER_NAME_SOURCES = {'only': ['user', 'user__first_name', 'user__last_name'], 'related': ['user']}
+
+
+class FellowViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
+    """
+    API ViewSet for Fellow management returning JSON.
+    List/retrieve support ?fields=id,full_name,status and ?expand=assigned_sector,mentor,user.
+    """
     queryset = Fellow.objects.all()
     serializer_class = FellowSerializer
     permission_classes = [IsAuthenticated]
 
-    @action(detail=False, methods=['get'])
+    # Sparse fieldsets (see activities/fieldsets.py)
+    default_fields = FellowSerializer.Meta.fields
+    expandable_fields = ('assigned_sector', 'mentor', 'user')
+    extra_fields = ('mentor',)
+    field_sources = {
+        'full_name': USER_NAME_SOURCES,
+        'first_name': USER_NAME_SOURCES,
+        'last_name': USER_NAME_SOURCES,
+        'assigned_sector_name': {
+            'only': ['assigned_sector', 'assigned_sector__name'], 'related': ['assigned_sector'],
+        },
+        'user': {'only': ['user'], 'expanded': {
+            'only': ['user', 'user__username', 'user__email'], 'related': ['user'],
+        }},
+        'mentor': {'only': ['mentor'], 'expanded': {
+            'only': ['mentor', 'mentor__user', 'mentor__user__first_name', 'mentor__user__last_name'],
+            'related': ['mentor__user'],
+        }},
+        **{name: {'only': [name]} for name in (
+            'university', 'degree_field', 'graduation_year', 'assigned_sector', 'status',
+            'training_completed', 'fellowship_start_date', 'fellowship_end_date',
+        )},
+    }
+
+    def get_queryset(self):
+        # list/retrieve: only the columns/joins the requested fields need
+        return self.project(super().get_queryset())
+
+    @action(detail=False, methods=['get'], throttle_classes=[AnalyticsRateThrottle])
     def statistics(self, request):
-        """GET /api/fellows/statistics/"""
-        queryset = self.get_queryset()
-        status_breakdown = {choice[0]: 0 for choice in Fellow.Status.choices}
-        status_counts = queryset.values('status').annotate(total=Count('id'))
-        
-        for item in status_counts:
-            status_breakdown[item['status']] = item['total']
+        """
+        GET /api/fellows/statistics/  (optional ?activities=1)
+        Status x province x district x mentor cross-tab from ONE conditional-aggregation
+        query; all other breakdowns are rolled up from its rows. With ?activities=1 the
+        approved sessions and farmers reached are joined into the same query.
+        Cached until the fellow, mentor, location (or activity) data version changes:
+        mentor and district names are part of the breakdowns.
+        """
+        include_activities = request.query_params.get('activities') in ('1', 'true')
+
+        # v2: breakdowns keyed by id (same-named districts or mentors stay apart)
+        cache_key = 'fellows:statistics:v2:f{}:m{}:l{}:a{}'.format(
+            get_data_version('fellows'),
+            get_data_version('mentors'),
+            get_data_version('locations'),
+            get_data_version('activities') if include_activities else '-',
+        )
+        stats = cache.get(cache_key)
+        if stats is None:
+            stats = self.build_statistics(include_activities)
+            cache.set(cache_key, stats, timeout=None)
+        return Response(stats)
+
+    def build_statistics(self, include_activities):
+        statuses = Fellow.Status.values
+
+        # distinct=True keeps fellow counts exact when the activities join multiplies rows
+        aggregates = {
+            'total': Count('id', distinct=True),
+            **{status: Count('id', distinct=True, filter=Q(status=status)) for status in statuses},
+        }
+        if include_activities:
+            # activity_records: live and archived reports (activities/archive.py)
+            approved = Q(activity_records__status='APPROVED')
+            aggregates['approved_sessions'] = Count('activity_records', filter=approved)
+            aggregates['farmers_reached'] = Sum('activity_records__number_of_farmers_trained', filter=approved)
+
+        rows = self.get_queryset().values(
+            'assigned_sector__district__province_id', 'assigned_sector__district__province__name',
+            'assigned_sector__district_id', 'assigned_sector__district__name',
+            'mentor_id', 'mentor__user__first_name', 'mentor__user__last_name',
+        ).annotate(**aggregates).order_by()
+
+        metrics = statuses + (['approved_sessions', 'farmers_reached'] if include_activities else [])
 
-        district_counts = queryset.values('assigned_sector__district__name').annotate(total=Count('id'))
+        def add(bucket, key, name, row):
+            # Grouped by id: two districts or mentors with the same name stay apart
+            totals = bucket.setdefault(
+                'unassigned' if key is None else str(key),
+                {'id': key, 'name': name, 'total': 0, **{metric: 0 for metric in metrics}},
+            )
+            totals['total'] += row['total']
+            for metric in metrics:
+                totals[metric] += row[metric] or 0
 
+        cross_tab = []
+        overview, provinces, districts, mentors = {}, {}, {}, {}
+        for row in rows:
+            province_id = row['assigned_sector__district__province_id']
+            district_id = row['assigned_sector__district_id']
+            province = row['assigned_sector__district__province__name'] or 'Unassigned'
+            district = row['assigned_sector__district__name'] or 'Unassigned'
+            mentor = (
+                f"{row['mentor__user__first_name']} {row['mentor__user__last_name']}"
+                if row['mentor_id'] else 'Unassigned'
+            )
+            cross_tab.append({
+                'province_id': province_id,
+                'province': province,
+                'district_id': district_id,
+                'district': district,
+                'mentor_id': row['mentor_id'],
+                'mentor': mentor,
+                'total': row['total'],
+                **{metric: row[metric] or 0 for metric in metrics},
+            })
+            add(overview, 'all', 'All', row)
+            add(provinces, province_id, province, row)
+            add(districts, district_id, district, row)
+            add(mentors, row['mentor_id'], mentor, row)
+
+        # Kept for existing clients: district name -> fellow count ("name (#id)" if two share a name)
+        names = [totals['name'] for totals in districts.values()]
+        geographic_distribution = {
+            (totals['name'] if names.count(totals['name']) == 1 else f"{totals['name']} (#{totals['id']})"): totals['total']
+            for totals in districts.values()
+        }
+
+        program = overview.get('all', {'total': 0, **{metric: 0 for metric in metrics}})
         stats = {
             'program_overview': {
-                'total_fellows': queryset.count(),
-                'status_breakdown': status_breakdown
+                'total_fellows': program['total'],
+                'status_breakdown': {status: program[status] for status in statuses},
             },
-            'geographic_distribution': {
-                item['assigned_sector__district__name'] or 'Unassigned': item['total'] 
-                for item in district_counts
-            }
+            'geographic_distribution': geographic_distribution,
+            # {id (or 'unassigned'): {'id', 'name', 'total', <status>..., <activity metrics>}}
+            'province_breakdown': provinces,
+            'district_breakdown': districts,
+            'mentor_breakdown': mentors,
+            'cross_tab': cross_tab,
         }
-        return Response(stats)
+        if include_activities:
+            stats['program_overview']['approved_sessions'] = program['approved_sessions']
+            stats['program_overview']['farmers_reached'] = program['farmers_reached']
+        return stats
 
     @action(detail=True, methods=['get'])
     def activities(self, request, pk=None):
-        """GET /api/fellows/{id}/activities/"""
+        """
+        GET /api/fellows/{id}/activities/
+        Paginated log history. Filters: ?status=, ?date_from=YYYY-MM-DD, ?date_to=YYYY-MM-DD.
+        ?summary=1 returns per-month aggregates instead of raw rows.
+        """
         fellow = self.get_object()
         activities = TrainingActivity.objects.filter(fellow=fellow)
-        serializer = TrainingActivitySerializer(activities, many=True)
-        return Response(serializer.data)
+
+        status_filter = request.query_params.get('status')
+        if status_filter:
+            if status_filter not in TrainingActivity.Status.values:
+                raise ValidationError({'status': f"Must be one of {', '.join(TrainingActivity.Status.values)}."})
+            activities = activities.filter(status=status_filter)
+
+        for param, lookup in (('date_from', 'date__gte'), ('date_to', 'date__lte')):
+            value = request.query_params.get(param)
+            if value:
+                try:
+                    # None: not YYYY-MM-DD; ValueError: well-formed but no such day (2025-02-30)
+                    parsed = parse_date(value)
+                except ValueError:
+                    parsed = None
+                if parsed is None:
+                    raise ValidationError({param: "Use a valid date in the YYYY-MM-DD format."})
+                activities = activities.filter(**{lookup: parsed})
+
+        if request.query_params.get('summary') in ('1', 'true'):
+            monthly = activities.annotate(month=TruncMonth('date')).values('month').annotate(
+                sessions=Count('id'),
+                approved_sessions=Count('id', filter=Q(status='APPROVED')),
+                farmers_trained=Sum('number_of_farmers_trained'),
+                approved_farmers=Sum('number_of_farmers_trained', filter=Q(status='APPROVED')),
+                total_duration=Sum('duration'),
+            ).order_by('-month')
+
+            return Response({
+                'fellow_id': fellow.id,
+                'months': [
+                    {
+                        'month': row['month'].strftime('%Y-%m'),
+                        'sessions': row['sessions'],
+                        'approved_sessions': row['approved_sessions'],
+                        'farmers_trained': row['farmers_trained'] or 0,
+                        'approved_farmers': row['approved_farmers'] or 0,
+                        'duration_hours': round(row['total_duration'].total_seconds() / 3600, 2)
+                        if row['total_duration'] else 0.0,
+                    }
+                    for row in monthly
+                ],
+            })
+
+        # Pre-join what the serializer reads; skip text columns it never outputs
+        activities = activities.select_related(
+            'fellow__user', 'sector__district'
+        ).defer(
+            'challenges_notes', 'success_stories', 'verified_village'
+        ).order_by('-date', '-id')
+
+        page = self.paginate_queryset(activities)
+        serializer = TrainingActivitySerializer(page, many=True, context={'request': request})
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False, methods=['post'],
+        parser_classes=[MultiPartParser],
+        permission_classes=[IsAuthenticated, IsCoordinatorOrReadOnly],
+    )
+    def onboard(self, request):
+        """
+        POST /api/fellows/onboard/  (multipart: file=<roster.csv|roster.xlsx>, dry_run=1 optional)
+        Bulk-creates a cohort and returns a per-row report. Fellows without a password
+        column are emailed a set-password link (no password is returned). Passwords
+        are hashed in this process: no pool is started inside a web worker.
+        """
+        roster = request.FILES.get('file')
+        if roster is None:
+            return Response({'detail': "Upload the roster as 'file'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Lazy import: the roster pipeline (csv/openpyxl parsing) is only needed on
+        # this rare path, so workers don't pay for it at boot
+        from .onboarding import RosterError, read_roster, onboard_fellows
+
+        try:
+            records = read_roster(roster, roster.name)
+        except RosterError as exc:
+            return Response({'detail': str(exc), 'file': roster.name}, status=status.HTTP_400_BAD_REQUEST)
+        dry_run = request.data.get('dry_run') in ('1', 'true', 'True')
+        result = onboard_fellows(records, dry_run=dry_run)
+
+        response_status = status.HTTP_201_CREATED if result['created'] else status.HTTP_200_OK
+        return Response(result, status=response_status)
 
     def perform_create(self, serializer):
         """Assign the user when creating via API."""
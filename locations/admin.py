@@ -1,33 +1,65 @@
 from django.contrib import admin
+from django.db.models import Count
+
+from bridge2Rwanda_fellowship_management_system.admin_utils import cached_choices_filter
+from activities.choices import CachedModelChoiceField, district_options
 from .models import Province, District, Sector
 
+# Counts are annotated on the changelist query (one GROUP BY) instead of one
+# COUNT query per row, and __str__/column lookups across FKs are pre-joined.
+# show_full_result_count = False drops the admin's second COUNT(*) per page.
+
 @admin.register(Province)
 class ProvinceAdmin(admin.ModelAdmin):
     list_display = ('name', 'code', 'district_count')
     search_fields = ('name', 'code')
+    show_full_result_count = False
+    changelist_query_budget = 4
 
-    def district_count(self, obj):
+    def get_queryset(self, request):
         # Uses related_name='districts' from the District model
-        return obj.districts.count()
+        return super().get_queryset(request).annotate(district_total=Count('districts'))
+
+    def district_count(self, obj):
+        return obj.district_total
     district_count.short_description = 'Number of Districts'
+    district_count.admin_order_field = 'district_total'
 
 @admin.register(District)
 class DistrictAdmin(admin.ModelAdmin):
     list_display = ('name', 'province', 'sector_count', 'code')
     list_filter = ('province',)
     search_fields = ('name', 'code')
+    show_full_result_count = False
+    changelist_query_budget = 5
+
+    def get_queryset(self, request):
+        # __str__ prints the province; sectors use related_name='sectors'
+        return super().get_queryset(request).select_related('province').annotate(
+            sector_total=Count('sectors')
+        )
 
     def sector_count(self, obj):
-        #  Uses related_name='sectors' from the Sector model
-        return obj.sectors.count()
+        return obj.sector_total
     sector_count.short_description = 'Number of Sectors'
+    sector_count.admin_order_field = 'sector_total'
 
 @admin.register(Sector)
 class SectorAdmin(admin.ModelAdmin):
     list_display = ('name', 'district', 'get_province', 'code')
-    list_filter = ('district__province', 'district')
+    list_filter = ('district__province', ('district', cached_choices_filter(district_options)))
+    list_select_related = ('district__province',)
     search_fields = ('name', 'code')
+    show_full_result_count = False
+    changelist_query_budget = 5
 
     def get_province(self, obj):
         return obj.district.province.name
-    get_province.short_description = 'Province'
\ No newline at end of file
+    get_province.short_description = 'Province'
+    get_province.admin_order_field = 'district__province__name'
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'district':
+            # District.__str__ prints the province: options come from the cached district list
+            return CachedModelChoiceField(district_options, queryset=District.objects.all(), **kwargs)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
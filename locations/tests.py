@@ -1,3 +1,110 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.throttling import buckets
+from activities.utils import bump_data_version
+from bridge2Rwanda_fellowship_management_system.test_utils import (
+    create_activity, create_fellow, create_user,
+)
+from .models import Province, District, Sector
+from .utils import get_sector_hierarchy
+
+
+class SectorHierarchyCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.province = Province.objects.create(name='Kigali', code='01')
+        self.district = District.objects.create(name='Nyarugenge', province=self.province, code='0101')
+        self.sector = Sector.objects.create(name='Gitega', district=self.district, code='S1')
+
+    def test_cached_after_first_read(self):
+        get_sector_hierarchy()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_sector_hierarchy()[self.sector.id]['district'], 'Nyarugenge')
+
+    def test_location_write_bumps_version(self):
+        get_sector_hierarchy()
+        self.sector.name = 'Gitega II'
+        self.sector.save()
+        self.assertEqual(get_sector_hierarchy()[self.sector.id]['sector_name'], 'Gitega II')
+
+    def test_version_bump_from_another_worker(self):
+        # Another worker's write only reaches this one through the data version
+        get_sector_hierarchy()
+        Sector.objects.filter(pk=self.sector.pk).update(name='Renamed')
+        bump_data_version('locations')
+        self.assertEqual(get_sector_hierarchy()[self.sector.id]['sector_name'], 'Renamed')
+
+    @override_settings(LOCATION_CACHE_TIMEOUT=0)
+    def test_entries_expire(self):
+        get_sector_hierarchy()
+        Sector.objects.filter(pk=self.sector.pk).update(name='Renamed')
+        self.assertEqual(get_sector_hierarchy()[self.sector.id]['sector_name'], 'Renamed')
+
+
+class SectorCoverageBatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        buckets.clear()
+        kigali = Province.objects.create(name='Kigali', code='01')
+        east = Province.objects.create(name='East', code='05')
+        self.nyarugenge = District.objects.create(name='Nyarugenge', province=kigali, code='0101')
+        bugesera = District.objects.create(name='Bugesera', province=east, code='0501')
+        self.gitega = Sector.objects.create(name='Gitega', district=self.nyarugenge, code='S1')
+        self.kimisagara = Sector.objects.create(name='Kimisagara', district=self.nyarugenge, code='S2')
+        self.nyamata = Sector.objects.create(name='Nyamata', district=bugesera, code='S3')
+
+        fellow = create_fellow('fellow1', self.gitega)
+        create_activity(fellow, number_of_farmers_trained=80, status='APPROVED')
+        create_activity(fellow, number_of_farmers_trained=40, status='APPROVED')
+        create_activity(fellow, number_of_farmers_trained=500)  # pending: not counted
+        create_activity(fellow, sector=self.nyamata, number_of_farmers_trained=10,
+                        status='APPROVED')
+
+        self.client = APIClient()
+        self.client.force_authenticate(create_user('viewer', role='ADMIN'))
+        self.url = reverse('api-sector-coverage-batch')
+
+    def coverage(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_all_sectors(self):
+        rows = {row['sector_id']: row for row in self.coverage()}
+        self.assertEqual(set(rows), {self.gitega.id, self.kimisagara.id, self.nyamata.id})
+        self.assertEqual(rows[self.gitega.id], {
+            'sector_id': self.gitega.id, 'sector_name': 'Gitega',
+            'district': 'Nyarugenge', 'province': 'Kigali',
+            'total_farmers_trained': 120, 'total_sessions': 2, 'coverage_level': 'High',
+        })
+        self.assertEqual(rows[self.kimisagara.id]['total_sessions'], 0)
+        self.assertEqual(rows[self.nyamata.id]['coverage_level'], 'Active')
+
+    def test_filters(self):
+        ids = f'{self.gitega.id},{self.nyamata.id}'
+        self.assertEqual([r['sector_id'] for r in self.coverage(ids=ids)], [self.nyamata.id, self.gitega.id])
+        self.assertEqual(
+            sorted(r['sector_id'] for r in self.coverage(district_id=self.nyarugenge.id)),
+            sorted([self.gitega.id, self.kimisagara.id]),
+        )
+        self.assertEqual([r['sector_id'] for r in self.coverage(province_id=self.nyamata.district.province_id)],
+                         [self.nyamata.id])
+
+    def test_compact(self):
+        data = self.coverage(compact=1, ids=str(self.gitega.id))
+        self.assertEqual(data['columns'][0], 'sector_id')
+        self.assertEqual(data['rows'], [[self.gitega.id, 'Gitega', 'Nyarugenge', 'Kigali', 120, 2, 'High']])
+
+    def test_non_integer_ids_rejected(self):
+        self.assertEqual(self.client.get(self.url, {'ids': '1,x'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'district_id': 'abc'}).status_code, 400)
+
+    def test_one_query_with_warm_hierarchy(self):
+        self.coverage()  # warms the hierarchy and the cached role
+        with self.assertNumQueries(1):
+            self.coverage()
+        with self.assertNumQueries(1):
+            self.coverage(ids=str(self.gitega.id))
@@ -9,6 +9,7 @@ urlpatterns = [
     path('provinces/', views.ProvinceListView.as_view(), name='api-provinces'),
     path('districts/', views.DistrictListView.as_view(), name='api-districts'),
     path('sectors/', views.SectorListView.as_view(), name='api-sectors'),
+    path('sectors/coverage/', views.SectorCoverageBatchAPIView.as_view(), name='api-sector-coverage-batch'),
     path('sectors/<int:id>/coverage/', views.SectorCoverageAPIView.as_view(), name='api-sector-coverage'),
 
     # 2. Existing AJAX Paths (Required for your HTML Forms)
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Sector
+
+# Cache key for the flattened Province > District > Sector hierarchy, versioned by
+# the 'locations' data version (bumped by activities/signals.py on every location
+# write), like the fellow statistics and dashboard fragments. With a shared cache
+# backend every worker sees the bump at once; with the per-process LocMemCache the
+# other workers only notice when their copy expires (LOCATION_CACHE_TIMEOUT).
+HIERARCHY_CACHE_KEY = 'locations:sector_hierarchy:v{}'
+
+
+def build_sector_hierarchy():
+    """
+    Flattens the location tree into a {sector_id: row} dictionary
+    using ONE joined query (no per-row lazy loads for district/province).
+    """
+    rows = Sector.objects.values(
+        'id', 'name', 'code',
+        'district_id', 'district__name',
+        'district__province_id', 'district__province__name',
+    ).order_by('district__province__name', 'district__name', 'name')
+
+    return {
+        row['id']: {
+            'sector_id': row['id'],
+            'sector_name': row['name'],
+            'sector_code': row['code'],
+            'district_id': row['district_id'],
+            'district': row['district__name'],
+            'province_id': row['district__province_id'],
+            'province': row['district__province__name'],
+        }
+        for row in rows
+    }
+
+
+def get_sector_hierarchy():
+    """Returns the cached sector hierarchy, building it on a cache miss."""
+    from activities.utils import get_data_version
+
+    return cache.get_or_set(
+        HIERARCHY_CACHE_KEY.format(get_data_version('locations')),
+        build_sector_hierarchy,
+        timeout=settings.LOCATION_CACHE_TIMEOUT,
+    )
+
@@ -1,13 +1,17 @@
-from django.shortcuts import get_object_or_404
+from django.http import Http404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.db.models import Sum, Count
 
-from .models import Province, District, Sector
-from activities.models import TrainingActivity
+from .models import Province
+from .utils import get_sector_hierarchy
+from activities.choices import district_rows, sector_rows
+from activities.models import TrainingActivityRecord
 from rest_framework.reverse import reverse
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from accounts.throttling import AnalyticsRateThrottle
 
 # --- 1. Province API ---
 class ProvinceListView(APIView):
@@ -20,65 +24,146 @@ class ProvinceListView(APIView):
 
 # --- 2. District API ---
 class DistrictListView(APIView):
+    """Served from the cached district list (activities/choices.py): no query per request."""
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         # This checks both DRF query_params AND standard GET params
         province_id = request.query_params.get('province_id') or request.GET.get('province_id')
-        districts = District.objects.all()
-        
-        if province_id:
-            districts = districts.filter(province_id=province_id)
-            
-        data = districts.values('id', 'name', 'province_id', 'province__name')
-        return Response(list(data))
+        try:
+            return Response(district_rows(province_id or None))
+        except ValueError:
+            raise ValidationError("province_id must be an integer.")
 
 # --- 3. Sector API ---
 class SectorListView(APIView):
+    """Served from the cached location hierarchy: no query per request."""
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         # This checks both DRF query_params AND standard GET params
         district_id = request.query_params.get('district_id') or request.GET.get('district_id')
-        sectors = Sector.objects.all()
-        
-        if district_id:
-            sectors = sectors.filter(district_id=district_id)
-            
-        data = sectors.values('id', 'name', 'district_id', 'district__name')
-        return Response(list(data))
+        try:
+            return Response(sector_rows(district_id or None))
+        except ValueError:
+            raise ValidationError("district_id must be an integer.")
 
 # --- 4. Sector Coverage API ---
+
+def get_coverage_level(total_farmers):
+    """Coverage metric for B2R stakeholders, shared by the single and batch endpoints."""
+    return "High" if total_farmers > 100 else "Active"
+
+
 class SectorCoverageAPIView(APIView):
     """
     GET /api/locations/sectors/{id}/coverage/
     Aggregates approved training impact data for a specific sector.
     """
     permission_classes = [IsAuthenticated]
+    throttle_classes = [AnalyticsRateThrottle]
 
     def get(self, request, id):
-        sector = get_object_or_404(Sector, id=id)
+        # District/Province names come from the cached hierarchy instead of lazy loads
+        sector = get_sector_hierarchy().get(id)
+        if sector is None:
+            raise Http404("Sector not found.")
         
-        # Calculate impact from the TrainingActivity model
-        impact_stats = TrainingActivity.objects.filter(
-            sector=sector, 
+        # Calculate impact from the live and archived training activities
+        impact_stats = TrainingActivityRecord.objects.filter(
+            sector_id=id, 
             status='APPROVED'
         ).aggregate(
             total_farmers=Sum('number_of_farmers_trained'),
             total_sessions=Count('id')
         )
 
+        total_farmers = impact_stats['total_farmers'] or 0
         return Response({
-            "sector_id": sector.id,
-            "sector_name": sector.name,
-            "district": sector.district.name,
-            "province": sector.district.province.name,
-            "total_farmers_trained": impact_stats['total_farmers'] or 0,
+            "sector_id": sector['sector_id'],
+            "sector_name": sector['sector_name'],
+            "district": sector['district'],
+            "province": sector['province'],
+            "total_farmers_trained": total_farmers,
             "total_sessions": impact_stats['total_sessions'] or 0,
             # Calculated coverage metric for B2R stakeholders
-            "coverage_level": "High" if (impact_stats['total_farmers'] or 0) > 100 else "Active"
+            "coverage_level": get_coverage_level(total_farmers)
         })
 
+# --- 5. Batch Sector Coverage API ---
+class SectorCoverageBatchAPIView(APIView):
+    """
+    GET /api/locations/sectors/coverage/
+    Returns coverage for every sector (or a filtered set) in one request.
+
+    Optional query params:
+    - ids=1,2,3       : only these sectors
+    - district_id=ID  : only sectors of one district
+    - province_id=ID  : only sectors of one province
+    - compact=1       : {"columns": [...], "rows": [[...], ...]} instead of a list of objects
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [AnalyticsRateThrottle]
+
+    COLUMNS = [
+        'sector_id', 'sector_name', 'district', 'province',
+        'total_farmers_trained', 'total_sessions', 'coverage_level',
+    ]
+
+    def get_sectors(self, request):
+        """Filters the cached hierarchy in memory (no location queries)."""
+        sectors = list(get_sector_hierarchy().values())
+
+        ids = request.query_params.get('ids')
+        district_id = request.query_params.get('district_id')
+        province_id = request.query_params.get('province_id')
+
+        try:
+            if ids:
+                wanted = {int(pk) for pk in ids.split(',') if pk.strip()}
+                sectors = [s for s in sectors if s['sector_id'] in wanted]
+            if district_id:
+                sectors = [s for s in sectors if s['district_id'] == int(district_id)]
+            if province_id:
+                sectors = [s for s in sectors if s['province_id'] == int(province_id)]
+        except ValueError:
+            raise ValidationError("ids, district_id and province_id must be integers.")
+        return sectors
+
+    def get(self, request):
+        sectors = self.get_sectors(request)
+
+        # ONE grouped query for all requested sectors
+        activities = TrainingActivityRecord.objects.filter(status='APPROVED')
+        if len(sectors) < len(get_sector_hierarchy()):
+            activities = activities.filter(sector_id__in=[s['sector_id'] for s in sectors])
+
+        impact_by_sector = {
+            row['sector_id']: row
+            for row in activities.values('sector_id').annotate(
+                total_farmers=Sum('number_of_farmers_trained'),
+                total_sessions=Count('id')
+            ).order_by()
+        }
+
+        rows = []
+        for sector in sectors:
+            impact = impact_by_sector.get(sector['sector_id'], {})
+            total_farmers = impact.get('total_farmers') or 0
+            rows.append([
+                sector['sector_id'],
+                sector['sector_name'],
+                sector['district'],
+                sector['province'],
+                total_farmers,
+                impact.get('total_sessions') or 0,
+                get_coverage_level(total_farmers),
+            ])
+
+        if request.query_params.get('compact') in ('1', 'true'):
+            return Response({'columns': self.COLUMNS, 'rows': rows})
+        return Response([dict(zip(self.COLUMNS, row)) for row in rows])
+
 # API/ endpoints listing
 
 @api_view(['GET'])
@@ -98,6 +183,7 @@ def api_root_view(request, format=None):
         # Note: This is a detail endpoint, so we use a dummy ID (like 1) 
         # just to show the structure to recruiters.
         'sector-coverage-example': reverse('api-sector-coverage', kwargs={'id': 1}, request=request, format=format),
+        'sector-coverage-batch': reverse('api-sector-coverage-batch', request=request, format=format),
     })
 
 
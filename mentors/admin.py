@@ -5,4 +5,12 @@ from .models import Mentor
 @admin.register(Mentor)
 class MentorAdmin(admin.ModelAdmin):
     list_display = ('get_full_name', 'organization', 'expertise_area', 'joined_date')
-    search_fields = ('user__first_name', 'user__last_name', 'organization')
\ No newline at end of file
+    search_fields = ('user__first_name', 'user__last_name', 'organization')
+    # Stable order for the changelist and autocomplete pagination
+    ordering = ('user__last_name', 'user__first_name')
+    show_full_result_count = False
+    changelist_query_budget = 4
+
+    def get_queryset(self, request):
+        # __str__ and get_full_name print the user's name (changelist and autocomplete)
+        return super().get_queryset(request).select_related('user')
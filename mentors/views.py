@@ -7,6 +7,7 @@ from django.contrib.auth.decorators import login_required
 
 from accounts.models import UserProfile
 from activities.models import TrainingActivity
+from activities.duplicates import has_likely_duplicate
 from .forms import MentorRegistrationForm
 from .models import Mentor
 
@@ -54,7 +55,7 @@ def mentor_dashboard(request):
     pending_reports = TrainingActivity.objects.filter(
         fellow__mentor=mentor, 
         status='PENDING'
-    ).order_by('-date')
+    ).annotate(likely_duplicate=has_likely_duplicate()).order_by('-date')
     
     recent_history = TrainingActivity.objects.filter(
         fellow__mentor=mentor
@@ -79,6 +80,7 @@ def review_activity(request, pk):
         if status in ['APPROVED', 'REVISION']:
             report.status = status
             report.mentor_comments = comments
+            report.review_actor = request.user  # recorded on the review event
             report.save()
             messages.success(request, f"Report for {report.fellow.get_full_name} has been {status.lower()}.")
             return redirect('mentor_dashboard')
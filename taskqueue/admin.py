@@ -0,0 +1,46 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from bridge2Rwanda_fellowship_management_system.admin_utils import EstimatedCountPaginator
+from .models import PeriodicSchedule, Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    """Queue inspection; tasks are created by code (registry.py) and run by run_task_worker."""
+    list_display = ('name', 'status', 'priority', 'run_at', 'attempts', 'wait_ms', 'duration_ms', 'locked_by')
+    list_filter = ('status',)
+    search_fields = ('name',)
+    ordering = ('-created_at', '-id')
+    readonly_fields = (
+        'name', 'args', 'kwargs', 'status', 'attempts', 'max_attempts', 'locked_by', 'locked_until',
+        'result', 'last_error', 'created_at', 'started_at', 'finished_at', 'wait_ms', 'duration_ms', 'schedule',
+    )
+    actions = ('requeue',)
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    changelist_query_budget = 4
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Run selected failed tasks again')
+    def requeue(self, request, queryset):
+        updated = queryset.filter(status=Task.Status.FAILED).update(
+            status=Task.Status.QUEUED, run_at=timezone.now(), attempts=0, last_error='',
+        )
+        self.message_user(request, f'{updated} task(s) queued again.')
+
+
+@admin.register(PeriodicSchedule)
+class PeriodicScheduleAdmin(admin.ModelAdmin):
+    """Schedules come from @task(cron=...); only enabling/disabling is done here."""
+    list_display = ('task_name', 'cron', 'enabled', 'next_run_at', 'last_run_at')
+    list_editable = ('enabled',)
+    readonly_fields = ('task_name', 'cron', 'next_run_at', 'last_run_at')
+    show_full_result_count = False
+    changelist_query_budget = 4
+
+    def has_add_permission(self, request):
+        return False
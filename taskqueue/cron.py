@@ -0,0 +1,91 @@
+"""
+Minimal cron expressions for periodic tasks (no third-party dependency).
+
+    CronSchedule('*/5 * * * *').next_after(now)    every 5 minutes
+    CronSchedule('30 2 * * *').next_after(now)     every day at 02:30
+    CronSchedule('0 8 * * 1-5').next_after(now)    weekdays at 08:00
+
+Five fields: minute hour day-of-month month day-of-week (0 or 7 = Sunday), each
+`*`, a number, a range `a-b`, a step `*/n` or `a-b/n`, or a comma list of those.
+As in classic cron, when both day fields are restricted a day matching EITHER runs.
+Times are evaluated in settings.TIME_ZONE.
+"""
+
+# taskqueue/cron.py
+
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+FIELDS = (
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day', 1, 31),
+    ('month', 1, 12),
+    ('weekday', 0, 7),
+)
+
+
+def parse_field(text, low, high):
+    """The set of values one cron field allows; ValueError on bad syntax."""
+    values = set()
+    for part in text.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f'Bad step in {text!r}.')
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(bound) for bound in part.split('-', 1))
+        else:
+            start = end = int(part)
+            if step != 1:
+                end = high
+        if not low <= start <= end <= high:
+            raise ValueError(f'{text!r} is outside {low}-{high}.')
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+
+    def __init__(self, expression):
+        parts = expression.split()
+        if len(parts) != len(FIELDS):
+            raise ValueError(f'{expression!r}: a cron expression has {len(FIELDS)} fields.')
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            parse_field(part, low, high) for part, (_, low, high) in zip(parts, FIELDS)
+        )
+        # cron counts Sunday as 0 (or 7), Python's weekday() as 6
+        self.weekdays = {(day - 1) % 7 for day in weekdays}
+        self.any_day = parts[2] == '*'
+        self.any_weekday = parts[4] == '*'
+
+    def day_matches(self, day):
+        if day.month not in self.months:
+            return False
+        in_days, in_weekdays = day.day in self.days, day.weekday() in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_after(self, moment):
+        """The first matching minute strictly after `moment` (an aware datetime)."""
+        local = timezone.localtime(moment).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = local.date()
+        for _ in range(366 * 5):  # every combination recurs within a few years
+            if self.day_matches(day):
+                same_day = day == local.date()
+                for hour in sorted(self.hours):
+                    if same_day and hour < local.hour:
+                        continue
+                    for minute in sorted(self.minutes):
+                        if same_day and hour == local.hour and minute < local.minute:
+                            continue
+                        return timezone.make_aware(datetime(day.year, day.month, day.day, hour, minute))
+            day += timedelta(days=1)
+        raise ValueError(f'{self.expression!r} never matches.')
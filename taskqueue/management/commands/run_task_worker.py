@@ -0,0 +1,123 @@
+"""
+Background task worker: claims queued tasks from the database and runs them in a
+thread or process pool, and enqueues the periodic (cron) schedules when due.
+
+Any number of workers can run at once, on one or several machines: claims use
+SELECT ... FOR UPDATE SKIP LOCKED where the database supports it, and conditional
+UPDATEs everywhere (taskqueue/queue.py). SIGTERM / Ctrl-C stop claiming and let the
+running tasks finish.
+
+    --pool thread     (default) I/O-bound tasks: email, exports, DB rollups
+    --pool process    CPU-bound tasks (e.g. image processing); each child process
+                      boots Django once and keeps its own DB connection
+    --burst           run until the queue is empty, then exit (cron jobs, CI)
+
+Usage:
+    python manage.py run_task_worker
+    python manage.py run_task_worker --concurrency 8
+    python manage.py run_task_worker --pool process --concurrency 2
+    python manage.py run_task_worker --burst --no-schedules
+"""
+
+# taskqueue/management/commands/run_task_worker.py
+
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from taskqueue.queue import claim, enqueue_due_schedules, requeue_expired, run_claimed, sync_schedules
+from taskqueue import process
+from taskqueue.registry import registered_tasks
+
+
+class Command(BaseCommand):
+    help = 'Runs queued background tasks and periodic schedules.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help='Tasks run at the same time (default: 4).')
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread',
+                            help='Run tasks in threads (default) or processes.')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait when the queue is empty (default: 1).')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once no task is queued or running.')
+        parser.add_argument('--no-schedules', action='store_true',
+                            help='Do not enqueue periodic schedules from this worker.')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        concurrency = options['concurrency']
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        if not options['no_schedules']:
+            sync_schedules()
+
+        if options['pool'] == 'process':
+            # No DB connection may be shared with the children
+            connections.close_all()
+            # Spawned children start from scratch and boot Django once (taskqueue/process.py)
+            pool = ProcessPoolExecutor(
+                concurrency, mp_context=multiprocessing.get_context('spawn'), initializer=process.setup,
+            )
+            entry_point = process.run_claimed
+        else:
+            pool = ThreadPoolExecutor(concurrency, thread_name_prefix='task')
+            entry_point = run_claimed
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Worker {worker_id}: {options['pool']} pool of {concurrency}, {len(registered_tasks())} registered tasks."
+        ))
+        running = {}  # future -> task
+        try:
+            while not self.stopping:
+                now = timezone.now()
+                if not options['no_schedules']:
+                    enqueue_due_schedules(now)
+                requeue_expired(now)
+
+                for future in [future for future in running if future.done()]:
+                    self.report(running.pop(future), future)
+
+                claimed = claim(worker_id, concurrency - len(running), now) if len(running) < concurrency else []
+                for task in claimed:
+                    try:
+                        running[pool.submit(entry_point, task.pk, worker_id)] = task
+                    except BrokenProcessPool:
+                        # A child died (e.g. killed by the OOM killer): stop; the claims
+                        # still held expire and are retried by another worker
+                        self.stderr.write('The process pool is broken: stopping the worker.')
+                        self.stopping = True
+                        break
+
+                if options['burst'] and not claimed and not running:
+                    break
+                if not claimed:
+                    close_old_connections()
+                    time.sleep(options['poll_interval'])
+        finally:
+            pool.shutdown(wait=True)
+            for future, task in running.items():
+                self.report(task, future)
+        self.stdout.write('Worker stopped.')
+
+    def stop(self, signum, frame):
+        self.stdout.write('Stopping: finishing the running tasks...')
+        self.stopping = True
+
+    def report(self, task, future):
+        try:
+            status = future.result()
+        except Exception as exc:
+            status = f'crashed ({exc})'
+        self.stdout.write(f'{timezone.now():%H:%M:%S} {task.name} #{task.pk}: {status}')
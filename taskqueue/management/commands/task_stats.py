@@ -0,0 +1,62 @@
+"""
+Task timing metrics from the task table: per task name, runs by status, average
+and maximum run time, average queue wait; plus the periodic schedules.
+
+One grouped aggregate query over the recent tasks (index task_name_created_idx).
+
+Usage:
+    python manage.py task_stats
+    python manage.py task_stats --hours 1
+"""
+
+# taskqueue/management/commands/task_stats.py
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max, Q
+from django.utils import timezone
+
+from taskqueue.models import PeriodicSchedule, Task
+
+
+class Command(BaseCommand):
+    help = 'Reports task counts, run times and queue waits per task name.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=24,
+                            help='Only tasks created in the last N hours (default: 24).')
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(hours=options['hours'])
+        rows = Task.objects.filter(created_at__gte=since).values('name').annotate(
+            **{status.lower(): Count('id', filter=Q(status=status)) for status in Task.Status.values},
+            avg_ms=Avg('duration_ms'),
+            max_ms=Max('duration_ms'),
+            avg_wait_ms=Avg('wait_ms'),
+            retried=Count('id', filter=Q(attempts__gt=1)),
+        ).order_by('name')
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Tasks of the last {options['hours']:g} hours"))
+        self.stdout.write(
+            f"  {'task':<48} {'queued':>6} {'run':>4} {'ok':>5} {'failed':>6} {'retried':>7} "
+            f"{'avg_ms':>9} {'max_ms':>9} {'wait_ms':>9}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"  {row['name']:<48} {row['queued']:>6} {row['running']:>4} {row['succeeded']:>5} "
+                f"{row['failed']:>6} {row['retried']:>7} {self.ms(row['avg_ms'])} {self.ms(row['max_ms'])} "
+                f"{self.ms(row['avg_wait_ms'])}"
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nPeriodic schedules'))
+        for schedule in PeriodicSchedule.objects.all():
+            state = '' if schedule.enabled else ' (disabled)'
+            last = f'{schedule.last_run_at:%Y-%m-%d %H:%M}' if schedule.last_run_at else 'never'
+            self.stdout.write(
+                f'  {schedule.task_name:<48} {schedule.cron:<15} next {schedule.next_run_at:%Y-%m-%d %H:%M}, '
+                f'last {last}{state}'
+            )
+
+    def ms(self, value):
+        return f'{value:>9.1f}' if value is not None else f"{'-':>9}"
@@ -0,0 +1,84 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    One queued call of a registered @task function (taskqueue/registry.py).
+    Claimed by workers with SELECT ... FOR UPDATE SKIP LOCKED, or a conditional
+    UPDATE on backends without it (taskqueue/queue.py).
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = 'QUEUED', 'Queued'
+        RUNNING = 'RUNNING', 'Running'
+        SUCCEEDED = 'SUCCEEDED', 'Succeeded'
+        FAILED = 'FAILED', 'Failed'
+
+    # Registered task name, e.g. 'activities.tasks.rebuild_review_stats'
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    # Higher runs first among due tasks
+    priority = models.SmallIntegerField(default=0)
+    # Not run before this time (delayed tasks and retry backoff)
+    run_at = models.DateTimeField(default=timezone.now)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+
+    # Claim: which worker runs it, and until when (a crashed worker's tasks are requeued after)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    # Outcome
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    # Timing metrics: queue wait (run_at -> start) and run time of the last attempt
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    wait_ms = models.FloatField(null=True, blank=True)
+    duration_ms = models.FloatField(null=True, blank=True)
+
+    # The periodic schedule that enqueued it, if any
+    schedule = models.ForeignKey(
+        'PeriodicSchedule',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='tasks'
+    )
+
+    class Meta:
+        indexes = [
+            # The workers' claim scan: due QUEUED tasks
+            models.Index(fields=['status', 'run_at'], name='task_due_idx'),
+            # Per-task statistics (task_stats) and the admin log
+            models.Index(fields=['name', '-created_at'], name='task_name_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.get_status_display()})"
+
+
+class PeriodicSchedule(models.Model):
+    """
+    A cron schedule of a registered task, declared with @task(cron='...') and
+    synced on worker start. Workers enqueue it when next_run_at is due; the
+    conditional UPDATE of next_run_at makes exactly one worker do so per run.
+    """
+    task_name = models.CharField(max_length=200, unique=True)
+    cron = models.CharField(max_length=100, help_text="Five cron fields, e.g. '30 2 * * *'.")
+    enabled = models.BooleanField(default=True)
+    next_run_at = models.DateTimeField()
+    last_run_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['task_name']
+
+    def __str__(self):
+        return f"{self.task_name} ({self.cron})"
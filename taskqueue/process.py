@@ -0,0 +1,22 @@
+"""
+Entry points for the worker's process pool (run_task_worker --pool process).
+
+Spawned children unpickle these functions by module path before Django is set
+up, so this module must not import models at import time: setup() boots Django
+once per child, run_claimed() imports the queue lazily.
+"""
+
+# taskqueue/process.py
+
+
+def setup():
+    """Pool initializer: the settings module comes from the parent's environment."""
+    import django
+
+    django.setup()
+
+
+def run_claimed(task_id, worker_id):
+    from .queue import run_claimed
+
+    return run_claimed(task_id, worker_id)
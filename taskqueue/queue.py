@@ -0,0 +1,233 @@
+"""
+Database-backed task queue: enqueue, claim, execute, retry, periodic schedules.
+
+Claiming (claim()):
+    Due QUEUED tasks are selected highest priority / oldest first and moved to
+    RUNNING with a conditional UPDATE (... WHERE status = 'QUEUED'), so a task is
+    only ever claimed once. On PostgreSQL / MySQL 8 the candidates are also locked
+    with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent workers pick disjoint
+    tasks instead of racing for the same rows; SQLite (no row locks, serialized
+    writes) relies on the conditional UPDATE alone.
+
+Failures:
+    An exception requeues the task after retry_delay x 1, 2, 4, ... seconds until
+    max_attempts, then marks it FAILED with the traceback. A claim expires after the
+    task's timeout (TASKQUEUE_LEASE_SECONDS by default); requeue_expired() treats a
+    task whose worker died or hung past it as a failed attempt.
+
+Metrics:
+    Every run stores wait_ms (due -> started) and duration_ms on the Task row
+    (aggregated by `python manage.py task_stats`) and observes task_duration_ms /
+    task_wait_ms in the worker's metrics registry (activities/metrics.py).
+
+Schedules:
+    sync_schedules() writes the @task(cron=...) declarations to PeriodicSchedule;
+    enqueue_due_schedules() queues each due one once (a conditional UPDATE of
+    next_run_at elects one worker) and skips a run while the previous one is
+    still queued or running. Missed runs are not caught up: the next run is
+    computed from now.
+"""
+
+# taskqueue/queue.py
+
+import json
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from activities.metrics import metrics
+from .cron import CronSchedule
+from .models import PeriodicSchedule, Task
+from .registry import get_task, registered_tasks
+
+# Cap on the exponential retry delay
+MAX_RETRY_DELAY = timedelta(hours=6)
+
+
+# --- 1. ENQUEUE ---
+
+def enqueue(name, args=(), kwargs=None, run_at=None, priority=None, schedule=None):
+    """Queues a registered task (one INSERT); runs it at once in eager mode."""
+    definition = get_task(name)
+    task = Task.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs or {},
+        run_at=run_at or timezone.now(),
+        priority=definition.priority if priority is None else priority,
+        max_attempts=definition.max_attempts,
+        schedule=schedule,
+    )
+    if settings.TASKQUEUE_EAGER:
+        run_eagerly(task)
+    return task
+
+
+def run_eagerly(task):
+    """Runs a task in-process until it succeeds or fails for good (retries without waiting)."""
+    while task.status != Task.Status.SUCCEEDED and task.status != Task.Status.FAILED:
+        if not _mark_running(task, 'eager', timezone.now()):
+            return task
+        execute(task, 'eager')
+    return task
+
+
+# --- 2. CLAIM ---
+
+def _lease(task):
+    try:
+        timeout = get_task(task.name).timeout
+    except KeyError:
+        timeout = None
+    return timedelta(seconds=timeout or settings.TASKQUEUE_LEASE_SECONDS)
+
+
+def _mark_running(task, worker_id, now):
+    """QUEUED -> RUNNING if nobody else claimed it first; updates the instance."""
+    changes = {
+        'status': Task.Status.RUNNING,
+        'locked_by': worker_id,
+        'locked_until': now + _lease(task),
+        'started_at': now,
+        'attempts': task.attempts + 1,
+    }
+    claimed = Task.objects.filter(pk=task.pk, status=Task.Status.QUEUED, attempts=task.attempts).update(**changes)
+    if claimed:
+        for field, value in changes.items():
+            setattr(task, field, value)
+    return bool(claimed)
+
+
+def claim(worker_id, limit, now=None):
+    """Claims up to `limit` due tasks for this worker and returns them (RUNNING)."""
+    now = now or timezone.now()
+    due = Task.objects.filter(status=Task.Status.QUEUED, run_at__lte=now).order_by('-priority', 'run_at', 'id')
+
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        candidates = list(due[:limit])
+        return [task for task in candidates if _mark_running(task, worker_id, now)]
+
+
+def requeue_expired(now=None):
+    """Tasks whose claim expired (worker died or hung) count as a failed attempt."""
+    now = now or timezone.now()
+    expired = Task.objects.filter(status=Task.Status.RUNNING, locked_until__lt=now)
+    error = 'Claim expired: the worker stopped or the task ran past its timeout.'
+    retried = expired.filter(attempts__lt=F('max_attempts')).update(
+        status=Task.Status.QUEUED, run_at=now, locked_by='', locked_until=None, last_error=error,
+    )
+    failed = expired.update(
+        status=Task.Status.FAILED, finished_at=now, locked_by='', locked_until=None, last_error=error,
+    )
+    return retried + failed
+
+
+# --- 3. EXECUTE ---
+
+def _json_result(value):
+    try:
+        return json.loads(json.dumps(value, cls=DjangoJSONEncoder))
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+def retry_delay(definition, attempts):
+    delay = timedelta(seconds=definition.retry_delay * 2 ** max(attempts - 1, 0))
+    return min(delay, MAX_RETRY_DELAY)
+
+
+def execute(task, worker_id):
+    """Runs a claimed (RUNNING) task and records its outcome and timing."""
+    started = time.perf_counter()
+    wait_ms = max((task.started_at - task.run_at).total_seconds() * 1000, 0)
+    outcome = {'locked_by': '', 'locked_until': None, 'wait_ms': round(wait_ms, 1)}
+    try:
+        definition = get_task(task.name)
+    except KeyError:
+        definition = None
+        outcome.update(status=Task.Status.FAILED, last_error=f'Unknown task {task.name!r}.')
+    else:
+        try:
+            result = definition.func(*task.args, **task.kwargs)
+        except Exception:
+            outcome['last_error'] = traceback.format_exc()[-5000:]
+            if task.attempts < task.max_attempts:
+                outcome.update(
+                    status=Task.Status.QUEUED,
+                    run_at=timezone.now() + retry_delay(definition, task.attempts),
+                )
+            else:
+                outcome['status'] = Task.Status.FAILED
+        else:
+            outcome.update(status=Task.Status.SUCCEEDED, result=_json_result(result), last_error='')
+
+    duration_ms = (time.perf_counter() - started) * 1000
+    outcome.update(finished_at=timezone.now(), duration_ms=round(duration_ms, 1))
+    # Only the claim holder may record the outcome (an expired claim may have been requeued)
+    Task.objects.filter(pk=task.pk, status=Task.Status.RUNNING, locked_by=worker_id).update(**outcome)
+    for field, value in outcome.items():
+        setattr(task, field, value)
+
+    metrics.observe('task_duration_ms', f"{task.name} {outcome['status'].lower()}", duration_ms)
+    metrics.observe('task_wait_ms', task.name, wait_ms)
+    return task
+
+
+def run_claimed(task_id, worker_id):
+    """Pool entry point (thread or process): runs one claimed task by id."""
+    try:
+        task = Task.objects.get(pk=task_id)
+        return execute(task, worker_id).status
+    finally:
+        # Each pool thread has its own connection: don't leave it open between tasks
+        connections.close_all()
+
+
+# --- 4. PERIODIC SCHEDULES ---
+
+def sync_schedules(now=None):
+    """
+    Creates/updates a PeriodicSchedule per @task(cron=...), disables the removed ones.
+    A declared schedule found disabled (its task was removed, then declared again) is
+    re-enabled from now on: its old next_run_at would otherwise fire at once.
+    """
+    now = now or timezone.now()
+    declared = {name: d.cron for name, d in registered_tasks().items() if d.cron}
+    existing = {schedule.task_name: schedule for schedule in PeriodicSchedule.objects.all()}
+
+    for name, cron in declared.items():
+        schedule = existing.get(name)
+        if schedule is None:
+            PeriodicSchedule.objects.get_or_create(task_name=name, defaults={
+                'cron': cron, 'next_run_at': CronSchedule(cron).next_after(now),
+            })
+        elif schedule.cron != cron or not schedule.enabled:
+            PeriodicSchedule.objects.filter(pk=schedule.pk).update(
+                cron=cron, enabled=True, next_run_at=CronSchedule(cron).next_after(now),
+            )
+    PeriodicSchedule.objects.exclude(task_name__in=declared).update(enabled=False)
+
+
+def enqueue_due_schedules(now=None):
+    """Queues every due schedule exactly once across workers; returns the tasks queued."""
+    now = now or timezone.now()
+    queued = []
+    for schedule in PeriodicSchedule.objects.filter(enabled=True, next_run_at__lte=now):
+        next_run_at = CronSchedule(schedule.cron).next_after(now)
+        elected = PeriodicSchedule.objects.filter(pk=schedule.pk, next_run_at=schedule.next_run_at).update(
+            next_run_at=next_run_at, last_run_at=now,
+        )
+        if not elected:
+            continue
+        if schedule.tasks.filter(status__in=[Task.Status.QUEUED, Task.Status.RUNNING]).exists():
+            continue  # the previous run is still pending: don't pile up
+        queued.append(enqueue(schedule.task_name, schedule=schedule))
+    return queued
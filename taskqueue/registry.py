@@ -0,0 +1,78 @@
+"""
+Task registration.
+
+    # activities/tasks.py  (every installed app's tasks.py is imported at startup)
+    from taskqueue.registry import task
+
+    @task(max_attempts=5, cron='15 3 * * *')
+    def rebuild_review_stats():
+        ...
+
+    rebuild_review_stats.delay()                     # queue it now
+    rebuild_review_stats.enqueue(kwargs={...}, run_at=later, priority=10)
+    rebuild_review_stats()                           # plain call, runs inline
+
+Arguments and return values are stored as JSON. With TASKQUEUE_EAGER = True
+(tests, local development) delay()/enqueue() run the task at once, in-process,
+through the same code path as a worker (attempts, retries, timing are recorded).
+"""
+
+# taskqueue/registry.py
+
+from .cron import CronSchedule
+
+_registry = {}
+
+
+class TaskDefinition:
+
+    def __init__(self, func, name, max_attempts, retry_delay, timeout, cron, priority):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        # Seconds before the first retry; doubled on every further attempt
+        self.retry_delay = retry_delay
+        # Seconds a run may take before its claim expires and it is retried (None: TASKQUEUE_LEASE_SECONDS)
+        self.timeout = timeout
+        self.cron = cron
+        self.priority = priority
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return self.enqueue(args=args, kwargs=kwargs)
+
+    def enqueue(self, args=(), kwargs=None, run_at=None, priority=None):
+        from .queue import enqueue
+
+        return enqueue(self.name, args=args, kwargs=kwargs, run_at=run_at, priority=priority)
+
+    def __repr__(self):
+        return f'<task {self.name}>'
+
+
+def task(func=None, *, name=None, max_attempts=3, retry_delay=30, timeout=None, cron=None, priority=0):
+    """Registers a function as a background task (usable as @task or @task(...))."""
+    if cron is not None:
+        CronSchedule(cron)  # fail at import time on a bad expression
+
+    def register(func):
+        definition = TaskDefinition(
+            func, name or f'{func.__module__}.{func.__name__}',
+            max_attempts, retry_delay, timeout, cron, priority,
+        )
+        _registry[definition.name] = definition
+        return definition
+
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    """The registered TaskDefinition; KeyError if no installed app defines it."""
+    return _registry[name]
+
+
+def registered_tasks():
+    return dict(_registry)
@@ -0,0 +1,128 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import PeriodicSchedule, Task
+from .queue import claim, enqueue, enqueue_due_schedules, execute, requeue_expired, sync_schedules
+from .registry import get_task, task
+
+
+@task(name='taskqueue.tests.add', max_attempts=2, retry_delay=10)
+def add(a, b):
+    return a + b
+
+
+@task(name='taskqueue.tests.broken', max_attempts=2, retry_delay=10)
+def broken():
+    raise RuntimeError('boom')
+
+
+@task(name='taskqueue.tests.nightly', cron='30 2 * * *')
+def nightly():
+    return 'done'
+
+
+@override_settings(TASKQUEUE_EAGER=False, TASKQUEUE_LEASE_SECONDS=60)
+class ClaimAndRetryTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+
+    def test_claim_takes_due_tasks_once_highest_priority_first(self):
+        low = enqueue('taskqueue.tests.add', args=(1, 2), run_at=self.now)
+        high = enqueue('taskqueue.tests.add', args=(3, 4), run_at=self.now, priority=5)
+        enqueue('taskqueue.tests.add', args=(5, 6), run_at=self.now + timedelta(hours=1))
+
+        claimed = claim('w1', 10, self.now)
+        self.assertEqual([t.pk for t in claimed], [high.pk, low.pk])
+        self.assertEqual(claim('w2', 10, self.now), [])
+
+        low.refresh_from_db()
+        self.assertEqual((low.status, low.locked_by, low.attempts), (Task.Status.RUNNING, 'w1', 1))
+        self.assertEqual(low.locked_until, self.now + timedelta(seconds=60))
+
+    def test_success_records_the_result(self):
+        enqueue('taskqueue.tests.add', args=(1, 2), run_at=self.now)
+        task_ = execute(claim('w1', 1, self.now)[0], 'w1')
+        task_.refresh_from_db()
+        self.assertEqual((task_.status, task_.result, task_.locked_by), (Task.Status.SUCCEEDED, 3, ''))
+
+    def test_failure_is_retried_with_backoff_then_failed(self):
+        enqueue('taskqueue.tests.broken', run_at=self.now)
+        first = execute(claim('w1', 1, self.now)[0], 'w1')
+        first.refresh_from_db()
+        self.assertEqual(first.status, Task.Status.QUEUED)
+        self.assertIn('RuntimeError: boom', first.last_error)
+        self.assertGreaterEqual(first.run_at, self.now + timedelta(seconds=10))
+        self.assertEqual(claim('w1', 1, self.now), [])  # not due yet
+
+        second = execute(claim('w1', 1, first.run_at)[0], 'w1')
+        second.refresh_from_db()
+        self.assertEqual((second.status, second.attempts), (Task.Status.FAILED, 2))
+
+    def test_expired_claims_are_requeued_until_max_attempts(self):
+        enqueue('taskqueue.tests.add', args=(1, 2), run_at=self.now)
+        claimed = claim('w1', 1, self.now)[0]
+        later = self.now + timedelta(seconds=61)
+
+        self.assertEqual(requeue_expired(later), 1)
+        claimed.refresh_from_db()
+        self.assertEqual((claimed.status, claimed.locked_by), (Task.Status.QUEUED, ''))
+
+        # The hung worker finishing late cannot overwrite the requeued task
+        execute(claimed, 'w1')
+        self.assertEqual(Task.objects.get(pk=claimed.pk).status, Task.Status.QUEUED)
+
+        claim('w2', 1, later)
+        self.assertEqual(requeue_expired(later + timedelta(seconds=61)), 1)
+        self.assertEqual(Task.objects.get(pk=claimed.pk).status, Task.Status.FAILED)
+
+    def test_unexpired_claims_are_left_alone(self):
+        enqueue('taskqueue.tests.add', args=(1, 2), run_at=self.now)
+        claim('w1', 1, self.now)
+        self.assertEqual(requeue_expired(self.now + timedelta(seconds=30)), 0)
+
+
+@override_settings(TASKQUEUE_EAGER=False)
+class ScheduleTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.declared = {'taskqueue.tests.nightly': get_task('taskqueue.tests.nightly')}
+
+    def sync(self, now=None):
+        with mock.patch('taskqueue.queue.registered_tasks', return_value=self.declared):
+            sync_schedules(now or self.now)
+        return PeriodicSchedule.objects.get(task_name='taskqueue.tests.nightly')
+
+    def test_removed_task_is_disabled_and_reenabled_when_declared_again(self):
+        self.sync()
+        declared, self.declared = self.declared, {}
+        self.assertFalse(self.sync().enabled)
+
+        self.declared = declared
+        later = self.now + timedelta(days=30)
+        schedule = self.sync(later)
+        self.assertTrue(schedule.enabled)
+        self.assertGreater(schedule.next_run_at, later)
+
+    def test_one_run_per_due_time_across_workers(self):
+        schedule = self.sync()
+        due = schedule.next_run_at
+        # Worker B read the due schedule before worker A moved next_run_at
+        stale = list(PeriodicSchedule.objects.filter(enabled=True, next_run_at__lte=due))
+        real_filter = PeriodicSchedule.objects.filter
+
+        self.assertEqual(len(enqueue_due_schedules(due)), 1)
+        with mock.patch.object(PeriodicSchedule.objects, 'filter',
+                               side_effect=lambda *args, **kwargs: stale if 'enabled' in kwargs else real_filter(*args, **kwargs)):
+            self.assertEqual(enqueue_due_schedules(due), [])
+        self.assertEqual(Task.objects.filter(schedule=schedule).count(), 1)
+
+    def test_run_is_skipped_while_the_previous_one_is_queued(self):
+        schedule = self.sync()
+        enqueue_due_schedules(schedule.next_run_at)
+        schedule.refresh_from_db()
+        self.assertEqual(enqueue_due_schedules(schedule.next_run_at), [])
+        self.assertEqual(Task.objects.filter(schedule=schedule).count(), 1)
+        self.assertEqual(PeriodicSchedule.objects.get(pk=schedule.pk).last_run_at, schedule.next_run_at)